@@ -0,0 +1,15 @@
+# bench_import.py
+
+
+class Import:
+    """Import times in a fresh interpreter, which asv times with
+    `timeraw_` benchmarks."""
+
+    def timeraw_import_monaco(self):
+        return "import monaco"
+
+    def timeraw_import_sim(self):
+        return "from monaco import Sim"
+
+    def timeraw_import_plot(self):
+        return "from monaco import plot"
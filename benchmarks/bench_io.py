@@ -0,0 +1,75 @@
+# bench_io.py
+import shutil
+import pathlib
+import tempfile
+import numpy as np
+from monaco.mc_sim import load_sim
+from monaco.mc_enums import SimStorage
+from monaco.results_store import export_var_arrays
+from .common import NCASES, NINVARS, SEED, make_sim
+
+
+class SaveLoad:
+    params = (NCASES, [SimStorage.PICKLE, SimStorage.MANIFEST])
+    param_names = ['ncases', 'simstorage']
+
+    def setup(self, ncases, simstorage):
+        self.tmpdir = tempfile.mkdtemp()
+        self.sim = make_sim(ncases, ninvars=10, savesimdata=True, resultsdir=self.tmpdir,
+                            simstorage=simstorage)
+        self.sim.runSim()
+
+    def teardown(self, ncases, simstorage):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def time_saveSimToFile(self, ncases, simstorage):
+        self.sim.saveSimToFile()
+
+    def time_load_sim(self, ncases, simstorage):
+        load_sim(self.sim.filepath)
+
+
+class ExportImport:
+    params = (NCASES, NINVARS, ['.csv', '.json', '.npy', '.npz'])
+    param_names = ['ncases', 'ninvars', 'suffix']
+
+    def setup(self, ncases, ninvars, suffix):
+        self.tmpdir = tempfile.mkdtemp()
+        self.sim = make_sim(ncases, ninvars, resultsdir=self.tmpdir)
+        self.sim.runSim()
+        self.filepath = pathlib.Path(self.tmpdir) / f'invars{suffix}'
+        self.sim.exportVars(self.sim.invars, self.filepath)
+
+    def teardown(self, ncases, ninvars, suffix):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def time_exportVars(self, ncases, ninvars, suffix):
+        self.sim.exportVars(self.sim.invars, self.filepath)
+
+    def time_importVars(self, ncases, ninvars, suffix):
+        self.sim.importVars(self.filepath, mmap=False)
+
+
+class ImportOutVarsLarge:
+    """Bulk import of three outvars into a sim with no cases yet."""
+    params = ([10**6], ['.npy', '.csv'])
+    param_names = ['ncases', 'suffix']
+    number = 1
+    repeat = 3
+    timeout = 600
+
+    def setup(self, ncases, suffix):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filepath = pathlib.Path(self.tmpdir) / f'outvars{suffix}'
+        generator = np.random.RandomState(SEED)
+        export_var_arrays(self.filepath, {f'y{i}': generator.rand(ncases) for i in range(3)})
+        self.sim = make_sim(ncases, ninvars=0)
+
+    def teardown(self, ncases, suffix):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def time_importOutVars(self, ncases, suffix):
+        self.sim.importOutVars(self.filepath)
+
+    def peakmem_importOutVars(self, ncases, suffix):
+        self.sim.importOutVars(self.filepath)
@@ -0,0 +1,78 @@
+# bench_plot.py
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+from monaco.mc_var import OutVar
+from monaco.mc_plot import plot_hist, plot_cdf, plot_2d_scatter, plot_2d_line
+from monaco.mc_multi_plot import multi_plot_grid_tri
+from .common import NCASES, SEED
+
+NCASES_PLOT = NCASES + [100000]
+
+
+class Plot1D:
+    params = (NCASES_PLOT, )
+    param_names = ['ncases']
+
+    def setup(self, ncases):
+        matplotlib.use('Agg')
+        rng = np.random.default_rng(SEED)
+        self.outvar = OutVar('y', vals=list(rng.normal(size=ncases)))
+
+    def clearCaches(self):
+        # Time the first plot of a var, not replots from its cached bins
+        self.outvar.sortedcache = dict()
+        self.outvar.histcache = dict()
+
+    def time_plot_hist(self, ncases):
+        self.clearCaches()
+        fig, ax = plot_hist(self.outvar)
+        fig.canvas.draw()
+        plt.close(fig)
+
+    def time_plot_cdf(self, ncases):
+        self.clearCaches()
+        fig, ax = plot_cdf(self.outvar)
+        fig.canvas.draw()
+        plt.close(fig)
+
+    def time_plot_2d_scatter(self, ncases):
+        fig, ax = plot_2d_scatter(self.outvar, self.outvar)
+        fig.canvas.draw()
+        plt.close(fig)
+
+
+class PlotLine:
+    params = ([100, 1000], [100, 10000], ['lines', 'fan'])
+    param_names = ['ncases', 'npoints', 'line_mode']
+
+    def setup(self, ncases, npoints, line_mode):
+        matplotlib.use('Agg')
+        rng = np.random.default_rng(SEED)
+        t = np.linspace(0, 1, npoints)
+        self.varx = OutVar('t', vals=[t]*ncases)
+        self.vary = OutVar('y', vals=[t*rng.normal() for _ in range(ncases)])
+
+    def time_plot_2d_line(self, ncases, npoints, line_mode):
+        fig, ax = plot_2d_line(self.varx, self.vary, line_mode=line_mode)
+        fig.canvas.draw()
+        plt.close(fig)
+
+
+class PlotGrid:
+    params = ([1000, 100000], [3, 10])
+    param_names = ['ncases', 'nvars']
+    timeout = 300
+
+    def setup(self, ncases, nvars):
+        matplotlib.use('Agg')
+        rng = np.random.default_rng(SEED)
+        self.vars = [OutVar(f'y{i}', vals=list(rng.normal(size=ncases))) for i in range(nvars)]
+
+    def time_multi_plot_grid_tri(self, ncases, nvars):
+        for var in self.vars:
+            var.sortedcache = dict()
+            var.histcache = dict()
+        fig, axs = multi_plot_grid_tri(self.vars)
+        fig.canvas.draw()
+        plt.close(fig)
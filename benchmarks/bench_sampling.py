@@ -0,0 +1,28 @@
+# bench_sampling.py
+from monaco.mc_sampling import sampling, cached_pcts
+from monaco.mc_enums import SampleMethod
+from .common import NCASES, NINVARS, SEED, make_sim
+
+
+class Sampling:
+    params = (NCASES, [SampleMethod.RANDOM, SampleMethod.SOBOL_RANDOM,
+                       SampleMethod.HALTON_RANDOM, SampleMethod.LATIN_HYPERCUBE])
+    param_names = ['ncases', 'method']
+
+    def time_sampling(self, ncases, method):
+        # Draw 5 invars the way a sim does, starting from an empty cache of
+        # the quasi-random points
+        cached_pcts.cache_clear()
+        for ninvar in range(1, 6):
+            sampling(ndraws=ncases, method=method, ninvar=ninvar, ninvar_max=5, seed=SEED)
+
+
+class DrawVars:
+    params = (NCASES, NINVARS)
+    param_names = ['ncases', 'ninvars']
+
+    def setup(self, ncases, ninvars):
+        self.sim = make_sim(ncases, ninvars)
+
+    def time_drawVars(self, ncases, ninvars):
+        self.sim.drawVars()
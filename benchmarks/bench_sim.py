@@ -0,0 +1,65 @@
+# bench_sim.py
+from .common import NCASES, NINVARS, OUTSHAPES, make_sim
+
+
+class GenCases:
+    params = (NCASES, NINVARS)
+    param_names = ['ncases', 'ninvars']
+
+    def setup(self, ncases, ninvars):
+        self.sim = make_sim(ncases, ninvars)
+        self.sim.drawVars()
+
+    def time_genCases(self, ncases, ninvars):
+        self.sim.genCases()
+
+
+class RunSim:
+    """Per-case framework overhead, with user functions that do no work."""
+    params = (NCASES, OUTSHAPES)
+    param_names = ['ncases', 'outshape']
+
+    def setup(self, ncases, outshape):
+        self.sim = make_sim(ncases, ninvars=1, outshape=outshape)
+
+    def time_runSim(self, ncases, outshape):
+        self.sim.runSim()
+
+    def peakmem_runSim(self, ncases, outshape):
+        self.sim.runSim()
+
+
+class RunSimDask:
+    """Per-case framework overhead through a local dask cluster."""
+    params = ([100, 1000], )
+    param_names = ['ncases']
+    number = 1
+    repeat = 3
+    timeout = 600
+
+    def setup(self, ncases):
+        self.sim = make_sim(ncases, ninvars=1, singlethreaded=False,
+                            daskkwargs=dict(n_workers=2, threads_per_worker=1))
+
+    def teardown(self, ncases):
+        self.sim.client.close()
+        self.sim.cluster.close()
+
+    def time_runSim(self, ncases):
+        self.sim.runSim()
+
+
+class GenOutVars:
+    params = (NCASES, OUTSHAPES)
+    param_names = ['ncases', 'outshape']
+
+    def setup(self, ncases, outshape):
+        self.sim = make_sim(ncases, ninvars=1, outshape=outshape)
+        self.sim.drawVars()
+        self.sim.genCases()
+        self.sim.executeAllFcns()
+
+    def time_genOutVars(self, ncases, outshape):
+        self.sim.outvars = dict()
+        self.sim.outvarseeds = []
+        self.sim.genOutVars()
@@ -0,0 +1,66 @@
+# bench_stats.py
+import numpy as np
+from monaco.mc_var import OutVar
+from monaco.mc_enums import SensitivityMethod
+from monaco.order_statistics import (order_stat_TI_n, order_stat_TI_k, order_stat_TI_c,
+                                     order_stat_P_k)
+from .common import NCASES, NINVARS, SEED, MODEL_FCNS, make_sim
+
+
+class VarStat:
+    params = (NCASES, ['mean', 'sigma', 'orderstatTI'], [False, True])
+    param_names = ['ncases', 'stat', 'bootstrap']
+
+    def setup(self, ncases, stat, bootstrap):
+        vals = np.random.default_rng(SEED).normal(size=ncases)
+        self.outvar = OutVar('y', vals=list(vals), seed=SEED)
+        self.statkwargs = {'mean': {},
+                           'sigma': {'sig': 3},
+                           'orderstatTI': {'p': 0.9, 'c': 0.5, 'bound': '2-sided'}}[stat]
+
+    def time_addVarStat(self, ncases, stat, bootstrap):
+        self.outvar.varstats = []
+        self.outvar.addVarStat(stat=stat, statkwargs=self.statkwargs, bootstrap=bootstrap)
+
+
+class OrderStatistics:
+    params = ([100, 10000, 1000000], )
+    param_names = ['n']
+
+    def time_order_stat_TI_n(self, n):
+        order_stat_TI_n(k=n//1000 + 1, p=0.99, c=0.9, nmax=10*n)
+
+    def time_order_stat_TI_k(self, n):
+        order_stat_TI_k(n=n, p=0.9, c=0.9)
+
+    def time_order_stat_TI_c(self, n):
+        order_stat_TI_c(n=n, k=max(n//100, 1), p=0.9)
+
+    def time_order_stat_P_k(self, n):
+        order_stat_P_k(n=n, P=0.5, c=0.9)
+
+
+class Covariance:
+    params = (NCASES, NINVARS)
+    param_names = ['ncases', 'ninvars']
+
+    def setup(self, ncases, ninvars):
+        self.sim = make_sim(ncases, ninvars, fcns=MODEL_FCNS)
+        self.sim.runSim()
+
+    def time_genCovarianceMatrix(self, ncases, ninvars):
+        self.sim.genCovarianceMatrix()
+
+
+class Sensitivities:
+    params = ([100, 1000], NINVARS, [SensitivityMethod.DVARS, SensitivityMethod.SPEARMAN,
+                                     SensitivityMethod.EASI])
+    param_names = ['ncases', 'ninvars', 'method']
+    timeout = 300
+
+    def setup(self, ncases, ninvars, method):
+        self.sim = make_sim(ncases, ninvars, fcns=MODEL_FCNS)
+        self.sim.runSim()
+
+    def time_calcSensitivities(self, ncases, ninvars, method):
+        self.sim.calcSensitivities('y', method=method)
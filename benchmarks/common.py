@@ -0,0 +1,64 @@
+# common.py
+"""
+Shared setup for the benchmarks. The user functions here do no work, so that
+sim timings measure monaco's own per-case overhead.
+"""
+import numpy as np
+from scipy.stats import norm
+from monaco.mc_sim import Sim
+from monaco.mc_enums import SimFunctions
+
+# Parameter grids shared across the benchmarks
+NCASES = [100, 1000, 10000]
+NINVARS = [1, 10]
+OUTSHAPES = [(), (100,)]
+SEED = 12362398
+
+
+def noop_preprocess(case):
+    return (case.ncase, )
+
+
+def noop_run(ncase):
+    return ncase
+
+
+def noop_postprocess(case, ncase):
+    outshape = case.constvals['outshape']
+    case.addOutVal('out', np.full(outshape, float(ncase)) if outshape else float(ncase))
+
+
+FCNS = {SimFunctions.PREPROCESS : noop_preprocess,
+        SimFunctions.RUN        : noop_run,
+        SimFunctions.POSTPROCESS: noop_postprocess}
+
+
+def model_preprocess(case):
+    return (np.array([inval.val for inval in case.invals.values()]), )
+
+
+def model_run(x):
+    return float(np.arange(1, len(x) + 1) @ x**2)
+
+
+def model_postprocess(case, y):
+    case.addOutVal('y', y)
+
+
+# A cheap nonlinear model, for benchmarks that need outputs that depend on the
+# inputs
+MODEL_FCNS = {SimFunctions.PREPROCESS : model_preprocess,
+              SimFunctions.RUN        : model_run,
+              SimFunctions.POSTPROCESS: model_postprocess}
+
+
+def make_sim(ncases, ninvars, outshape=(), fcns=FCNS, **kwargs):
+    """Make a sim with `ninvars` normal invars, which has not been run."""
+    simkwargs = dict(name='bench', ndraws=ncases, fcns=fcns, seed=SEED,
+                     singlethreaded=True, verbose=False)
+    simkwargs.update(kwargs)
+    sim = Sim(**simkwargs)
+    for i in range(ninvars):
+        sim.addInVar(name=f'x{i}', dist=norm, distkwargs={'loc': i, 'scale': 1})
+    sim.addConstVal('outshape', outshape)
+    return sim
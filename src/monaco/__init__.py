@@ -2,19 +2,114 @@
 from importlib import metadata
 __version__ = metadata.version(__name__)
 
-from monaco.mc_case import *
-from monaco.mc_sim import *
-from monaco.mc_var import *
-from monaco.mc_varstat import *
-from monaco.mc_val import *
-from monaco.mc_enums import *
-from monaco.gaussian_statistics import *
-from monaco.order_statistics import *
-from monaco.integration_statistics import *
-from monaco.dvars_sensitivity import *
-from monaco.helper_functions import *
-from monaco.case_runners import *
-from monaco.mc_sampling import *
-from monaco.mc_plot import *
-from monaco.mc_multi_plot import *
-from monaco.tqdm_dask_distributed import *
+import ast
+import pathlib
+import importlib
+from typing import TYPE_CHECKING
+
+
+# The public names of each submodule are listed once, in the TYPE_CHECKING
+# imports at the end of this file, which are read by type checkers and IDEs.
+# At runtime they are parsed from there rather than imported, so that
+# matplotlib, dask.distributed, and numba are only loaded by the parts of
+# monaco that use them. New public functions and classes must be added there
+# to be exported.
+def _read_exports() -> dict[str, list[str]]:
+    tree = ast.parse(pathlib.Path(__file__).read_text(encoding='utf-8'))
+    block = next(node for node in tree.body
+                 if isinstance(node, ast.If) and getattr(node.test, 'id', None) == 'TYPE_CHECKING')
+    return {str(node.module).removeprefix('monaco.'): [alias.name for alias in node.names]
+            for node in block.body if isinstance(node, ast.ImportFrom)}
+
+
+_exports : dict[str, list[str]] = _read_exports()
+_export_modules = {name: module for module, names in _exports.items() for name in names}
+
+__all__ = list(_export_modules)
+
+
+def __getattr__(name : str):
+    if name in _export_modules:
+        module = importlib.import_module(f'monaco.{_export_modules[name]}')
+        value = getattr(module, name)
+        globals()[name] = value  # skip __getattr__ on later accesses
+        return value
+    if name in _exports:
+        return importlib.import_module(f'monaco.{name}')
+    raise AttributeError(f"module 'monaco' has no attribute '{name}'")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__) | set(_exports))
+
+
+if TYPE_CHECKING:
+    from monaco.mc_case import Case
+    from monaco.mc_sim import Sim, compute_delayed, load_sim, load_sim_manifest
+    from monaco.mc_var import ColumnView, Var, InVar, OutVar
+    from monaco.mc_varstat import VarStat
+    from monaco.mc_val import Val, InVal, OutVal
+    from monaco.mc_enums import (SampleMethod, SimFunctions, StatBound, VarStatType, VarStatSide,
+                                 PlotOrientation, ScatterMode, LineMode, ReportPlot, InVarSpace,
+                                 Sensitivities, SensitivityApproximation, SensitivityMethod,
+                                 CorrelationMethod, CaseStorage, SimStorage, Compression)
+    from monaco.gaussian_statistics import (pct2sig, sig2pct, conf_ellipsoid_pct2sig,
+                                            conf_ellipsoid_sig2pct)
+    from monaco.order_statistics import (order_stat_TI_n, order_stat_TI_p, order_stat_TI_k,
+                                         order_stat_TI_c, order_stat_P_n, order_stat_P_k,
+                                         order_stat_P_c, EPYP, EPTI, get_iP, order_stat_var_check)
+    from monaco.integration_statistics import (integration_error, integration_n_from_err,
+                                               integration_args_check, max_variance, max_stdev)
+    from monaco.dvars_sensitivity import (SPARSE_DENSITY_MAX, calc_sensitivities,
+                                          calc_sensitivities_std, calc_sensitivities_states,
+                                          calc_phi_opt, calc_phi_opt_states, stratified_subsample,
+                                          inducing_points, full_states, invar_states, calc_Gammaj,
+                                          L_runner, calc_L, calc_L_terms, calc_L_nystrom,
+                                          calc_R_cross, calc_dR_cross, factor_R, factor_R_sparse,
+                                          calc_R_density, calc_R_sparse, calc_R_pairs,
+                                          calc_Rinv_pairs, calc_Rinv_selected,
+                                          calc_dR_sums_sparse, calc_dR_sums, calc_R, calc_Ruw,
+                                          calc_rj)
+    from monaco.covariance_statistics import (calc_comoments, update_comoments,
+                                              comoments_to_cov_corr, calc_rank_corrcoeffs)
+    from monaco.results_store import (VARS_MAGIC, VARS_ALIGNMENT, CASE_RECORD, CASE_MAGIC,
+                                      DATA_HEADER, DATA_FRAME, DATA_MAGIC, DATA_VERSION,
+                                      DATA_CODECS, DECOMPRESS_CHUNK, compress_bytes,
+                                      decompress_bytes, decompress_bytearray, iter_data_frames,
+                                      dumps_data, dump_data, loads_data, load_data,
+                                      save_vars_columns, load_vars_columns, cases_to_ranges,
+                                      ranges_to_cases, EXPORT_FORMATS, export_var_arrays,
+                                      import_var_arrays, import_csv_columns, aligned, UnloadedCase,
+                                      LazyCaseList, strip_case, CaseStore, CaseWriter,
+                                      read_case_journal)
+    from monaco.result_cache import (CACHE_SUFFIX, CACHE_PICKLE_PROTOCOL, canonical_form, hash_code,
+                                     hash_callable, hash_fcns, case_cache_key, ResultCache)
+    from monaco.screening_sensitivity import (calc_sensitivities_screening, calc_spearman,
+                                              calc_prcc, calc_easi, calc_binned_first_order,
+                                              rank_states)
+    from monaco.helper_functions import (import_optional, loaded_module, is_dataframe,
+                                         next_power_of_2, hash_str_repeatable, hashable_val, is_num,
+                                         is_numeric_array, length, get_list, slice_by_index, vprint,
+                                         warn_short_format, vwarn, vwrite, timeit, empty_list,
+                                         flatten)
+    from monaco.case_runners import preprocess_case, run_case, postprocess_case, copy_run_results
+    from monaco.mc_sampling import sampling, cached_pcts
+    from monaco.mc_plot import (RUG_MAX_MARKS, HIST_CACHE_SIZE, ECDF_MIN_POINTS, DENSITY_MIN_POINTS,
+                                DENSITY_GRIDSIZE, plot, plot_hist, plot_cdf, plot_ecdf,
+                                get_ecdf_points, dkw_epsilon, plot_2d_scatter, plot_2d_line,
+                                plot_3d_scatter, plot_2p5d_line, plot_3d_line, plot_cov_corr,
+                                plot_integration_convergence, plot_integration_error,
+                                plot_sensitivities, manage_axis, apply_category_labels,
+                                get_hist_lim, plot_1d_annotations, plot_rug_marks,
+                                get_quantile_bands, plot_quantile_bands, plot_2d_cov_ellipse,
+                                use_density, get_cases, manage_invar_space, get_plot_points,
+                                get_histogram, get_max_vertices, decimate_indices, minmax_indices,
+                                decimate_lines, get_line_vertices, plot_line_ensemble,
+                                get_var_steps)
+    from monaco.mc_multi_plot import (multi_plot, multi_plot_2d_scatter_hist, multi_plot_grid_tri,
+                                      multi_plot_grid_rect, handle_fig)
+    from monaco.plot_report import (REPORT_INDEX, REPORT_HTML, REPORT_VARS, REPORT_VERSION,
+                                    REPORT_FORMATS, strip_var, attach_columns, report_figure_specs,
+                                    hash_var, hash_nums, render_report_figure, init_report_worker,
+                                    render_report, write_report_index)
+    from monaco.tqdm_dask_distributed import TqdmProgressBar, TqdmNotebookProgress, tqdm_dask
@@ -3,6 +3,7 @@
 from typing import Callable
 from copy import copy
 from monaco.mc_case import Case
+from monaco.result_cache import ResultCache
 from monaco.helper_functions import vwrite, vwarn, get_list
 from datetime import datetime
 
@@ -44,6 +45,8 @@ def run_case(runfcn: Callable,
              debug : bool,
              verbose : bool,
              runsimid : int,
+             resultcache : ResultCache | None = None,
+             cachekey : str | None = None,
              ) -> Case:
     """
     Run a single Monte Carlo case.
@@ -52,6 +55,11 @@ def run_case(runfcn: Callable,
     ----------
     case : monaco.mc_case.Case
         The case to run.
+    resultcache : monaco.result_cache.ResultCache, default: None
+        If not None, the siminput and simrawoutput are added to this cache
+        under `cachekey` after a successful run.
+    cachekey : str, default: None
+        The cache key for this case.
 
     Returns
     -------
@@ -67,6 +75,11 @@ def run_case(runfcn: Callable,
         case.runtime = case.endtime - case.starttime
         case.runsimid = runsimid
         case.hasrun = True
+        if resultcache is not None and cachekey is not None:
+            try:
+                resultcache.put(cachekey, (case.siminput, case.simrawoutput))
+            except Exception:
+                vwarn(verbose, f'\nCaching the results for case {case.ncase} failed')
         if not case.keepsiminput:
             case.siminput = ()
 
@@ -110,3 +123,35 @@ def postprocess_case(postprocfcn: Callable,
             vwrite(verbose, f'\nPostprocessing case {case.ncase} failed')
 
     return case
+
+
+def copy_run_results(case : Case,
+                     sourcecase : Case,
+                     ) -> Case:
+    """
+    Fill in the preprocessed and run results for a Monte Carlo case from
+    another case with identical inputs, so that it only needs to be
+    postprocessed. The siminput and simrawoutput are shared, not copied.
+
+    Parameters
+    ----------
+    case : monaco.mc_case.Case
+        The case to fill in.
+    sourcecase : monaco.mc_case.Case
+        The case which was run.
+
+    Returns
+    -------
+    case : monaco.mc_case.Case
+        The same case, with the run results of the source case.
+    """
+    case = copy(case)
+    case.siminput = sourcecase.siminput
+    case.simrawoutput = sourcecase.simrawoutput
+    case.starttime = sourcecase.starttime
+    case.endtime = sourcecase.endtime
+    case.runtime = sourcecase.runtime
+    case.runsimid = sourcecase.runsimid
+    case.haspreprocessed = sourcecase.haspreprocessed
+    case.hasrun = sourcecase.hasrun
+    return case
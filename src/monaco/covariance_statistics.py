@@ -0,0 +1,152 @@
+# covariance_statistics.py
+from __future__ import annotations
+
+import numpy as np
+from scipy.stats import rankdata, kendalltau
+from monaco.mc_enums import CorrelationMethod
+
+
+def calc_comoments(data      : np.ndarray,
+                   chunksize : int = 10000,
+                   ) -> tuple[int, np.ndarray, np.ndarray]:
+    """
+    Calculate the number of samples, means, and centered comoment matrix of a
+    set of data, working through the samples in chunks so that the temporary
+    arrays stay small even with many variables.
+
+    Parameters
+    ----------
+    data : numpy.ndarray
+        The data, with one row per sample and one column per variable.
+    chunksize : int, default: 10000
+        The number of samples to process at once.
+
+    Returns
+    -------
+    (n, mean, M2) : (int, numpy.ndarray, numpy.ndarray)
+        n is the number of samples.
+        mean is the mean of each variable.
+        M2 is the sum of the outer products of the centered samples, so that
+        the sample covariance matrix is M2/(n - 1).
+    """
+    nvars = data.shape[1]
+    n, mean, M2 = 0, np.zeros(nvars), np.zeros((nvars, nvars))
+    for i in range(0, data.shape[0], chunksize):
+        n, mean, M2 = update_comoments(n, mean, M2, data[i:i+chunksize, :])
+    return n, mean, M2
+
+
+def update_comoments(n     : int,
+                     mean  : np.ndarray,
+                     M2    : np.ndarray,
+                     chunk : np.ndarray,
+                     ) -> tuple[int, np.ndarray, np.ndarray]:
+    """
+    Update the comoments of a set of data with new samples, using the pairwise
+    merge in Reference [1]_. This allows the covariance matrix to be updated
+    when cases are appended without revisiting the old cases.
+
+    Parameters
+    ----------
+    n : int
+        The number of samples seen so far.
+    mean : numpy.ndarray
+        The mean of each variable over the samples seen so far.
+    M2 : numpy.ndarray
+        The centered comoment matrix over the samples seen so far.
+    chunk : numpy.ndarray
+        The new samples, with one row per sample and one column per variable.
+
+    Returns
+    -------
+    (n, mean, M2) : (int, numpy.ndarray, numpy.ndarray)
+        The updated number of samples, means, and comoment matrix.
+
+    References
+    ----------
+    .. [1] Chan, Tony F., Gene H. Golub, and Randall J. LeVeque. "Updating
+           formulae and a pairwise algorithm for computing sample variances."
+           COMPSTAT 1982 (1982): 30-41.
+    """
+    nb = chunk.shape[0]
+    if nb == 0:
+        return n, mean, M2
+    meanb = np.mean(chunk, axis=0)
+    centered = chunk - meanb
+    M2b = centered.T @ centered
+
+    ntot = n + nb
+    delta = meanb - mean
+    mean = mean + delta*nb/ntot
+    M2 = M2 + M2b + np.outer(delta, delta)*n*nb/ntot
+    return ntot, mean, M2
+
+
+def comoments_to_cov_corr(n  : int,
+                          M2 : np.ndarray,
+                          ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a centered comoment matrix to the sample covariance matrix and
+    correlation coefficients.
+
+    Parameters
+    ----------
+    n : int
+        The number of samples.
+    M2 : numpy.ndarray
+        The centered comoment matrix.
+
+    Returns
+    -------
+    (covs, corrcoeffs) : (numpy.ndarray, numpy.ndarray)
+        covs is the sample covariance matrix.
+        corrcoeffs is the correlation coefficient matrix. Variables which do
+        not vary have NaN correlation coefficients.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covs = M2/(n - 1)
+        stddevs = np.sqrt(np.diag(covs))
+        corrcoeffs = covs / np.outer(stddevs, stddevs)
+    corrcoeffs = np.clip(corrcoeffs, -1, 1)
+    return covs, corrcoeffs
+
+
+def calc_rank_corrcoeffs(data      : np.ndarray,
+                         method    : CorrelationMethod,
+                         chunksize : int = 10000,
+                         ) -> np.ndarray:
+    """
+    Calculate a rank correlation coefficient matrix between the variables.
+
+    Parameters
+    ----------
+    data : numpy.ndarray
+        The data, with one row per sample and one column per variable.
+    method : monaco.mc_enums.CorrelationMethod
+        Either 'spearman' or 'kendall'.
+    chunksize : int, default: 10000
+        The number of samples to process at once for 'spearman'.
+
+    Returns
+    -------
+    corrcoeffs : numpy.ndarray
+        The rank correlation coefficient matrix.
+    """
+    if method == CorrelationMethod.SPEARMAN:
+        ranks = rankdata(data, axis=0)
+        n, _, M2 = calc_comoments(ranks, chunksize=chunksize)
+        _, corrcoeffs = comoments_to_cov_corr(n, M2)
+
+    elif method == CorrelationMethod.KENDALL:
+        nvars = data.shape[1]
+        corrcoeffs = np.eye(nvars)
+        for i in range(nvars):
+            for j in range(i):
+                tau = kendalltau(data[:, i], data[:, j]).statistic
+                corrcoeffs[i, j] = corrcoeffs[j, i] = tau
+
+    else:
+        raise ValueError(f'{method=} must be one of {CorrelationMethod.SPEARMAN} ' +
+                         f'or {CorrelationMethod.KENDALL}')
+
+    return corrcoeffs
@@ -2,13 +2,19 @@
 from __future__ import annotations
 
 # Somewhat hacky type checking to avoid circular imports:
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 if TYPE_CHECKING:
     from monaco.mc_sim import Sim
 
 import numpy as np
 from monaco.helper_functions import vprint
+from monaco.mc_enums import SensitivityApproximation
 from scipy.optimize import minimize
+from scipy.linalg import cho_factor, cho_solve, LinAlgError
+from scipy.sparse import coo_matrix, csc_matrix, csr_matrix, triu
+from scipy.sparse.linalg import splu, SuperLU
+from scipy.spatial import cKDTree
+from scipy.stats import qmc
 from warnings import warn
 
 # numba is recommended for speed, as this will be very slow otherwise
@@ -28,11 +34,22 @@ except ImportError:
             return decorator
 
 
-def calc_sensitivities(sim        : 'Sim',
-                       outvarname : str,
-                       Hj         : float = 1.0,
-                       tol        : float = 1e-6,
-                       verbose    : bool  = False,
+# If the fraction of nonzero entries in the correlation matrix is above this,
+# a dense Cholesky factorization is faster than a sparse LU factorization.
+SPARSE_DENSITY_MAX = 0.1
+
+
+def calc_sensitivities(sim           : 'Sim',
+                       outvarname    : str,
+                       Hj            : float = 1.0,
+                       tol           : float = 1e-6,
+                       sparse        : bool | None = None,
+                       approximation : SensitivityApproximation = SensitivityApproximation.NONE,
+                       nsamples      : int = 1000,
+                       nrepeats      : int = 1,
+                       ninducing     : int = 256,
+                       phi0          : np.ndarray | None = None,
+                       verbose       : bool  = False,
                        ) -> tuple[np.ndarray, np.ndarray]:
     """
     Calculates the global sensitivity indices and ratios for a specific output
@@ -45,6 +62,9 @@ def calc_sensitivities(sim        : 'Sim',
     See also Reference [2]_ for some theoretical background on the VARS and
     IVARS methods of calculating sensitivity indices.
 
+    For sims with more than a few thousand cases, an approximation can be
+    used. See `monaco.mc_enums.SensitivityApproximation` for the tradeoffs.
+
     Parameters
     ----------
     sim : monaco.mc_sim.Sim
@@ -61,6 +81,21 @@ def calc_sensitivities(sim        : 'Sim',
     tol : float, default 1e-6
         The convergence tolerance for scipy's minimize function acting on the
         negative log likelihood function.
+    sparse : bool | None, default None
+        Whether to use a sparse representation of the correlation matrix. See
+        `calc_L` for details.
+    approximation : monaco.mc_enums.SensitivityApproximation, default: 'none'
+        The approximation to use when fitting the hyperparameters.
+    nsamples : int, default: 1000
+        The number of cases to fit on for the 'subsample' approximation.
+    nrepeats : int, default: 1
+        The number of times to repeat the fit with different subsamples or
+        inducing points. The returned sensitivities are averaged over these.
+    ninducing : int, default: 256
+        The number of inducing points for the 'nystrom' approximation.
+    phi0 : numpy.ndarray, default: None
+        The initial guess for the hyperparameters, for example from a previous
+        calculation. If None, starts from all 1's.
     verbose : bool, default False
         Whether to print diagnostic information.
 
@@ -84,27 +119,168 @@ def calc_sensitivities(sim        : 'Sim',
            comprehensive, robust, and efficient global sensitivity analysis:
            1. Theory." Water Resources Research 52.1 (2016): 423-439.
     """
-    phi_opt = calc_phi_opt(sim, outvarname, tol, verbose)
+    sensitivities, ratios, _, _ \
+        = calc_sensitivities_std(sim, outvarname, Hj=Hj, tol=tol, sparse=sparse,
+                                 approximation=approximation, nsamples=nsamples,
+                                 nrepeats=nrepeats, ninducing=ninducing, phi0=phi0,
+                                 verbose=verbose)
+    return sensitivities, ratios
 
-    variance = np.var(np.array([sim.outvars[outvarname].nums]))
-    sensitivities = np.zeros(sim.ninvars)
-    for j in range(sim.ninvars):
-        sensitivities[j] = calc_Gammaj(Hj, phi_opt[j], variance)
-    ratios = sensitivities/sum(sensitivities)
 
-    return sensitivities, ratios
+def calc_sensitivities_std(sim           : 'Sim',
+                           outvarname    : str,
+                           Hj            : float = 1.0,
+                           tol           : float = 1e-6,
+                           sparse        : bool | None = None,
+                           approximation : SensitivityApproximation = SensitivityApproximation.NONE,
+                           nsamples      : int = 1000,
+                           nrepeats      : int = 1,
+                           ninducing     : int = 256,
+                           phi0          : np.ndarray | None = None,
+                           verbose       : bool  = False,
+                           ) -> tuple[np.ndarray, np.ndarray,
+                                      np.ndarray | None, np.ndarray | None]:
+    """
+    Calculates the global sensitivity indices and ratios for a specific output
+    variable, along with their standard deviations over the repeats of an
+    approximation. See `calc_sensitivities` for the parameters.
+
+    Returns
+    -------
+    sensitivities : numpy.ndarray
+        The global sensitivity indices, see `calc_sensitivities`.
+    ratios : numpy.ndarray
+        The global sensitivity ratios, see `calc_sensitivities`.
+    sensitivities_std : numpy.ndarray | None
+        The standard deviations of the sensitivity indices over the repeats,
+        None if `nrepeats == 1`.
+    ratios_std : numpy.ndarray | None
+        The standard deviations of the sensitivity ratios over the repeats,
+        None if `nrepeats == 1`.
+    """
+    vprint(sim.verbose, 'Calculating optimal hyperparameters Φ for ' +
+                       f"'{outvarname}' covariances...")
+    X, Y = full_states(sim, outvarname)
+    sensitivities, ratios, sensitivities_std, ratios_std, _ \
+        = calc_sensitivities_states(X, Y, seed=sim.outvars[outvarname].seed, Hj=Hj, tol=tol,
+                                    sparse=sparse, approximation=approximation,
+                                    nsamples=nsamples, nrepeats=nrepeats,
+                                    ninducing=ninducing, phi0=phi0, verbose=verbose)
+    vprint(sim.verbose, 'Done calculating optimal hyperparameters.')
+    return sensitivities, ratios, sensitivities_std, ratios_std
+
+
+def calc_sensitivities_states(X             : np.ndarray,
+                              Y             : np.ndarray,
+                              seed          : int,
+                              Hj            : float = 1.0,
+                              tol           : float = 1e-6,
+                              sparse        : bool | None = None,
+                              approximation : SensitivityApproximation
+                                            = SensitivityApproximation.NONE,
+                              nsamples      : int = 1000,
+                              nrepeats      : int = 1,
+                              ninducing     : int = 256,
+                              phi0          : np.ndarray | None = None,
+                              verbose       : bool = False,
+                              ) -> tuple[np.ndarray, np.ndarray,
+                                         np.ndarray | None, np.ndarray | None, np.ndarray]:
+    """
+    Calculates the global sensitivity indices and ratios from the input and
+    output state matrices. This does not need the sim object, so that the
+    calculations for different output variables can be sent out to parallel
+    workers which share the same input state matrix. See `calc_sensitivities`
+    for details.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    Y : numpy.ndarray
+        The state matrix for the output variables nums.
+    seed : int
+        The random seed for the first repeat of an approximation. Subsequent
+        repeats increment this.
+    Hj : float, default: 1.0
+        The fraction of the total parameter space to integrate over.
+    tol : float, default 1e-6
+        The convergence tolerance for scipy's minimize function.
+    sparse : bool | None, default None
+        Whether to use a sparse representation of the correlation matrix.
+    approximation : monaco.mc_enums.SensitivityApproximation, default: 'none'
+        The approximation to use when fitting the hyperparameters.
+    nsamples : int, default: 1000
+        The number of cases to fit on for the 'subsample' approximation.
+    nrepeats : int, default: 1
+        The number of times to repeat an approximate fit.
+    ninducing : int, default: 256
+        The number of inducing points for the 'nystrom' approximation.
+    phi0 : numpy.ndarray, default: None
+        The initial guess for the hyperparameters. If None, starts from all
+        1's.
+    verbose : bool, default False
+        Whether to print diagnostic information.
+
+    Returns
+    -------
+    sensitivities : numpy.ndarray
+        The global sensitivity indices.
+    ratios : numpy.ndarray
+        The global sensitivity ratios.
+    sensitivities_std : numpy.ndarray
+        The standard deviations of the sensitivity indices over the repeats,
+        None if `nrepeats == 1`.
+    ratios_std : numpy.ndarray
+        The standard deviations of the sensitivity ratios over the repeats,
+        None if `nrepeats == 1`.
+    phi_opt : numpy.ndarray
+        The learned hyperparameters, averaged over the repeats.
+    """
+    if approximation == SensitivityApproximation.NONE:
+        nrepeats = 1
+
+    ninvars = X.shape[1]
+    variance = np.var(Y)
+    phi_opts = np.zeros((nrepeats, ninvars))
+    sensitivities_all = np.zeros((nrepeats, ninvars))
+    for i in range(nrepeats):
+        phi_opts[i, :] = calc_phi_opt_states(X, Y, tol=tol, sparse=sparse,
+                                             approximation=approximation,
+                                             nsamples=nsamples, ninducing=ninducing,
+                                             seed=(seed + i) % 2**32, phi0=phi0,
+                                             verbose=verbose)
+        for j in range(ninvars):
+            sensitivities_all[i, j] = calc_Gammaj(Hj, phi_opts[i, j], variance)
+    ratios_all = sensitivities_all/np.sum(sensitivities_all, axis=1, keepdims=True)
+
+    sensitivities = np.mean(sensitivities_all, axis=0)
+    ratios = np.mean(ratios_all, axis=0)
+    phi_opt = np.mean(phi_opts, axis=0)
+
+    sensitivities_std = None
+    ratios_std = None
+    if nrepeats > 1:
+        sensitivities_std = np.std(sensitivities_all, axis=0, ddof=1)
+        ratios_std = np.std(ratios_all, axis=0, ddof=1)
+    return sensitivities, ratios, sensitivities_std, ratios_std, phi_opt
 
 
-def calc_phi_opt(sim        : 'Sim',
-                 outvarname : str,
-                 tol        : float = 1e-6,
-                 verbose    : bool = False
+def calc_phi_opt(sim           : 'Sim',
+                 outvarname    : str,
+                 tol           : float = 1e-6,
+                 sparse        : bool | None = None,
+                 approximation : SensitivityApproximation = SensitivityApproximation.NONE,
+                 nsamples      : int = 1000,
+                 ninducing     : int = 256,
+                 seed          : int | None = None,
+                 phi0          : np.ndarray | None = None,
+                 verbose       : bool = False
                  ) -> np.ndarray:
     """
     Calculate the optimal hyperparameters for the covariance functions between
     the output variable and each of the input variables via maximum likelihood
     estimation (MLE). MLE works by minimizing a negative log-likelihood
-    function.
+    function, using its analytic gradient.
 
     Parameters
     ----------
@@ -116,6 +292,21 @@ def calc_phi_opt(sim        : 'Sim',
     tol : float, default 1e-6
         The convergence tolerance for scipy's minimize function acting on the
         negative log likelihood function.
+    sparse : bool | None, default None
+        Whether to use a sparse representation of the correlation matrix. See
+        `calc_L` for details.
+    approximation : monaco.mc_enums.SensitivityApproximation, default: 'none'
+        The approximation to use when fitting the hyperparameters.
+    nsamples : int, default: 1000
+        The number of cases to fit on for the 'subsample' approximation.
+    ninducing : int, default: 256
+        The number of inducing points for the 'nystrom' approximation.
+    seed : int, default: None
+        The random seed for drawing the subsample or inducing points. If None,
+        the output variable's seed is used.
+    phi0 : numpy.ndarray, default: None
+        The initial guess for the hyperparameters. If None, starts from all
+        1's.
     verbose : bool, default False
         Whether to print diagnostic information.
 
@@ -124,27 +315,151 @@ def calc_phi_opt(sim        : 'Sim',
     phi_opt : numpy.ndarray
         The learned hyperparameters for the covariance functions.
     """
-    phi_max = 1e6
-    phi_min = 0
-    phi0 = 1
-
-    phi0s = []
-    bounds = []
-    for _ in range(sim.ninvars):
-        phi0s.append(phi0)
-        bounds.append((phi_min, phi_max))
+    if seed is None:
+        seed = sim.outvars[outvarname].seed
 
     vprint(sim.verbose, 'Calculating optimal hyperparameters Φ for ' +
                        f"'{outvarname}' covariances...")
     X, Y = full_states(sim, outvarname)
-    res = minimize(L_runner, phi0s, args=(X, Y, verbose), bounds=bounds,
-                   tol=tol, method='L-BFGS-B')
-    phi_opt = res.x
+    phi_opt = calc_phi_opt_states(X, Y, tol=tol, sparse=sparse, approximation=approximation,
+                                  nsamples=nsamples, ninducing=ninducing, seed=seed,
+                                  phi0=phi0, verbose=verbose)
     vprint(sim.verbose, 'Done calculating optimal hyperparameters.')
 
     return phi_opt
 
 
+def calc_phi_opt_states(X             : np.ndarray,
+                        Y             : np.ndarray,
+                        tol           : float = 1e-6,
+                        sparse        : bool | None = None,
+                        approximation : SensitivityApproximation = SensitivityApproximation.NONE,
+                        nsamples      : int = 1000,
+                        ninducing     : int = 256,
+                        seed          : int = 0,
+                        phi0          : np.ndarray | None = None,
+                        verbose       : bool = False
+                        ) -> np.ndarray:
+    """
+    Calculate the optimal hyperparameters for the covariance functions from
+    the input and output state matrices. See `calc_phi_opt` for details.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    Y : numpy.ndarray
+        The state matrix for the output variables nums.
+    tol : float, default 1e-6
+        The convergence tolerance for scipy's minimize function.
+    sparse : bool | None, default None
+        Whether to use a sparse representation of the correlation matrix.
+    approximation : monaco.mc_enums.SensitivityApproximation, default: 'none'
+        The approximation to use when fitting the hyperparameters.
+    nsamples : int, default: 1000
+        The number of cases to fit on for the 'subsample' approximation.
+    ninducing : int, default: 256
+        The number of inducing points for the 'nystrom' approximation.
+    seed : int, default: 0
+        The random seed for drawing the subsample or inducing points.
+    phi0 : numpy.ndarray, default: None
+        The initial guess for the hyperparameters. If None, starts from all
+        1's.
+    verbose : bool, default False
+        Whether to print diagnostic information.
+
+    Returns
+    -------
+    phi_opt : numpy.ndarray
+        The learned hyperparameters for the covariance functions.
+    """
+    phi_max = 1e6
+    phi_min = 0
+
+    ninvars = X.shape[1]
+    if phi0 is None:
+        phi0 = np.ones(ninvars)
+    phi0 = np.clip(phi0, phi_min, phi_max)
+    bounds = [(phi_min, phi_max) for _ in range(ninvars)]
+
+    Xi = None
+    if approximation == SensitivityApproximation.SUBSAMPLE:
+        subsample = stratified_subsample(Y, nsamples, seed)
+        X, Y = X[subsample, :], Y[subsample, :]
+    elif approximation == SensitivityApproximation.NYSTROM:
+        Xi = inducing_points(ninvars, ninducing, seed)
+
+    res = minimize(L_runner, phi0, args=(X, Y, sparse, verbose, Xi), bounds=bounds,
+                   tol=tol, method='L-BFGS-B', jac=True)
+    phi_opt = res.x
+
+    return phi_opt
+
+
+def stratified_subsample(Y        : np.ndarray,
+                         nsamples : int,
+                         seed     : int,
+                         ) -> np.ndarray:
+    """
+    Draw a subsample of the cases which is stratified over the output
+    variable. The cases are sorted by output value and split into `nsamples`
+    equally sized strata, and one case is drawn at random from each.
+
+    Parameters
+    ----------
+    Y : numpy.ndarray
+        The state matrix for the output variables nums.
+    nsamples : int
+        The number of cases to draw. If this is at least the number of cases,
+        all cases are returned.
+    seed : int
+        The random seed for the draws.
+
+    Returns
+    -------
+    subsample : numpy.ndarray
+        The sorted indices of the subsampled cases.
+    """
+    m = Y.shape[0]
+    if nsamples >= m:
+        return np.arange(m)
+
+    generator = np.random.RandomState(seed)
+    order = np.argsort(Y[:, 0], kind='stable')
+    edges = np.linspace(0, m, nsamples + 1).astype(int)
+    picks = edges[:-1] + np.floor(generator.rand(nsamples)*np.diff(edges)).astype(int)
+    subsample = np.sort(order[picks])
+    return subsample
+
+
+def inducing_points(ninvars   : int,
+                    ninducing : int,
+                    seed      : int,
+                    ) -> np.ndarray:
+    """
+    Generate space-filling inducing points in percentile space for the
+    low-rank approximation of the correlation matrix, via latin hypercube
+    sampling.
+
+    Parameters
+    ----------
+    ninvars : int
+        The number of input variables.
+    ninducing : int
+        The number of inducing points.
+    seed : int
+        The random seed for the latin hypercube.
+
+    Returns
+    -------
+    Xi : numpy.ndarray
+        The inducing points, of shape (ninducing, ninvars).
+    """
+    sampler = qmc.LatinHypercube(d=ninvars, seed=seed)
+    Xi = sampler.random(n=ninducing)
+    return Xi
+
+
 def full_states(sim : 'Sim',
                 outvarname : str,
                 ) -> tuple[np.ndarray, np.ndarray]:
@@ -166,14 +481,33 @@ def full_states(sim : 'Sim',
     Y : numpy.ndarray
         The output variable's nums.
     """
-    X = np.zeros((sim.ncases, sim.ninvars))
+    X = invar_states(sim)
     Y = np.zeros((sim.ncases, 1))
-    for i, varname in enumerate(sim.invars):
-        X[:, i] = sim.invars[varname].pcts
     Y[:, 0] = sim.outvars[outvarname].nums
     return X, Y
 
 
+def invar_states(sim : 'Sim') -> np.ndarray:
+    """
+    Get the input states in a combined matrix. This is the same for every
+    output variable, so only needs to be built once.
+
+    Parameters
+    ----------
+    sim : monaco.mc_sim.Sim
+        The input simulation.
+
+    Returns
+    -------
+    X : numpy.ndarray
+        The input variables' percentiles.
+    """
+    X = np.zeros((sim.ncases, sim.ninvars))
+    for i, varname in enumerate(sim.invars):
+        X[:, i] = sim.invars[varname].pcts
+    return X
+
+
 def calc_Gammaj(Hj       : float,
                 phij     : float,
                 variance : float
@@ -216,10 +550,13 @@ def calc_Gammaj(Hj       : float,
 def L_runner(phi     : np.ndarray,
              X       : np.ndarray,
              Y       : np.ndarray,
-             verbose : bool = False
-             ) -> float:
+             sparse  : bool | None = None,
+             verbose : bool = False,
+             Xi      : np.ndarray | None = None,
+             ) -> tuple[float, np.ndarray]:
     """
-    A wrapper function for calculating the negative log-likelihood cost.
+    A wrapper function for calculating the negative log-likelihood cost and
+    its gradient.
 
     Parameters
     ----------
@@ -229,27 +566,55 @@ def L_runner(phi     : np.ndarray,
         The state matrix for all the input variables percentiles.
     Y : numpy.ndarray
         The state matrix for the output variables nums.
+    sparse : bool | None, default None
+        Whether to use a sparse representation of the correlation matrix. See
+        `calc_L` for details.
     verbose : bool
         Whether to print the values at each step.
+    Xi : numpy.ndarray, default: None
+        The inducing points for a low-rank approximation of the correlation
+        matrix. If None, the full correlation matrix is used.
 
     Returns
     -------
     L : float
         The negative log-likelihood cost.
+    dL : numpy.ndarray
+        The gradient of the negative log-likelihood cost with respect to phi.
     """
-    L = calc_L(phi, X, Y)
+    if Xi is None:
+        L, dL = calc_L(phi, X, Y, sparse=sparse)
+    else:
+        L, dL = calc_L_nystrom(phi, X, Y, Xi)
     vprint(verbose, f'L = {L:0.4f}, Φ = {phi}')
-    return L
+    return L, dL
 
 
-@jit(nopython=True, cache=True)
-def calc_L(phi : np.ndarray,
-           X   : np.ndarray,
-           Y   : np.ndarray
-           ) -> float:
+def calc_L(phi    : np.ndarray,
+           X      : np.ndarray,
+           Y      : np.ndarray,
+           sparse : bool | None = None,
+           ) -> tuple[float, np.ndarray]:
     """
-    Calculate the negative log-likelihood cost. Note that this is just-in-time
-    compiled by numba for increased speed.
+    Calculate the negative log-likelihood cost and its analytic gradient with
+    respect to phi.
+
+    The correlation matrix is Cholesky (dense) or LU (sparse) factorized once,
+    and the log-determinant and all the linear solves are taken from that
+    factorization rather than from an explicit matrix inverse. Because the
+    linear covariance function is compactly supported, any two states further
+    apart than 1/phi_j along any dimension j are uncorrelated, and for large
+    enough phi the correlation matrix is mostly zeros.
+
+    With a = R^-1 (Y - M mu) and Q = (Y - M mu)^T a, the gradient is
+    dL/dphi_j = tr(R^-1 dR/dphi_j)/m - m a^T (dR/dphi_j) a / Q. Since mu is the
+    generalized least squares estimate, its own dependence on phi drops out.
+    The trace term is the derivative of the log-determinant, and is skipped
+    entirely when the log-determinant is clamped. For dense matrices it is
+    calculated from the full inverse. For sparse matrices the inverse is
+    much denser than R, but the trace only needs the entries of R^-1 where R
+    is nonzero, and these are calculated from the existing factorization by
+    selected inversion, see `calc_Rinv_pairs`.
 
     Parameters
     ----------
@@ -259,24 +624,599 @@ def calc_L(phi : np.ndarray,
         The state matrix for all the input variables percentiles.
     Y : numpy.ndarray
         The state matrix for the output variables nums.
+    sparse : bool | None, default None
+        Whether to use a sparse representation of the correlation matrix. If
+        None, then the sparse representation is used only when the fraction of
+        nonzero correlations is at most `SPARSE_DENSITY_MAX`.
+
+    Returns
+    -------
+    L : float
+        The negative log-likelihood cost.
+    dL : numpy.ndarray
+        The gradient of the negative log-likelihood cost with respect to phi.
+    """
+    # Share one k-d tree between the density check and the sparse matrix
+    tree = cKDTree(X*phi) if sparse is not False else None
+    if sparse is None:
+        sparse = calc_R_density(phi, X, tree=tree) <= SPARSE_DENSITY_MAX
+
+    if sparse:
+        R = calc_R_sparse(phi, X, tree=tree)
+        logdet, lu = factor_R_sparse(R)
+        solve = lu.solve
+    else:
+        R = calc_R(phi, X)
+        logdet, solve = factor_R(R)
+
+    m = len(Y)
+    L, a, c_logdet, c_quad = calc_L_terms(logdet, solve, Y)
+
+    # Weights on each correlation in dR/dphi_j which sum to the gradient
+    if sparse:
+        R_upper = triu(R, k=1).tocoo()
+        u, w = R_upper.row, R_upper.col
+        W = -c_quad*a[u]*a[w]
+        if c_logdet:
+            W += c_logdet*calc_Rinv_pairs(lu, u, w)
+        dL = calc_dR_sums_sparse(phi, X, u, w, W)
+    else:
+        W = -c_quad*np.outer(a, a)
+        if c_logdet:
+            W += c_logdet*solve(np.eye(m))
+        dL = calc_dR_sums(phi, X, W)
+
+    return L, dL
+
+
+def calc_L_terms(logdet : float,
+                 solve  : Callable[[np.ndarray], np.ndarray],
+                 Y      : np.ndarray,
+                 ) -> tuple[float, np.ndarray, float, float]:
+    """
+    Calculate the negative log-likelihood cost from a factorized correlation
+    matrix, along with the terms needed for its gradient.
+
+    Parameters
+    ----------
+    logdet : float
+        The natural log of the determinant of the correlation matrix.
+    solve : Callable[[numpy.ndarray], numpy.ndarray]
+        A function that takes in b and returns x for R @ x = b.
+    Y : numpy.ndarray
+        The state matrix for the output variables nums.
 
     Returns
     -------
     L : float
         The negative log-likelihood cost.
+    a : numpy.ndarray
+        The solution to R @ a = Y - M*mu.
+    c_logdet : float
+        The coefficient on tr(R^-1 dR/dphi_j) in the gradient, 0 if the
+        log-determinant was clamped.
+    c_quad : float
+        The coefficient on -a^T (dR/dphi_j) a in the gradient.
     """
     m = len(Y)
     M = np.ones((m, 1))
-    R = calc_R(phi, X)
-    Rinv = np.linalg.inv(R)
-    Rdet = max(np.linalg.det(R), 1e-12)  # Protect for poor conditioning
-
-    mu = np.linalg.inv(M.T @ Rinv @ M) @ (M.T @ Rinv @ Y)
+    Rinv_M = solve(M)
+    Rinv_Y = solve(Y)
+    mu = (M.T @ Rinv_Y) / (M.T @ Rinv_M)
 
     L_inner = Y - M*mu
-    L = np.log(Rdet)/m + m*np.log(L_inner.T @ Rinv @ L_inner)
-    L = L[0][0]
-    return L
+    Rinv_L_inner = Rinv_Y - Rinv_M*mu
+    Q = (L_inner.T @ Rinv_L_inner)[0][0]
+
+    logdet_min = np.log(1e-12)  # Protect for poor conditioning
+    L = max(logdet, logdet_min)/m + m*np.log(Q)
+
+    c_logdet = 1/m if logdet > logdet_min else 0.0
+    c_quad = m/Q
+    a = Rinv_L_inner[:, 0]
+    return L, a, c_logdet, c_quad
+
+
+def calc_L_nystrom(phi : np.ndarray,
+                   X   : np.ndarray,
+                   Y   : np.ndarray,
+                   Xi  : np.ndarray,
+                   ) -> tuple[float, np.ndarray]:
+    """
+    Calculate the negative log-likelihood cost and its analytic gradient with
+    respect to phi, using a low-rank approximation of the correlation matrix.
+
+    With C the correlations between the states and the k inducing points and
+    W the correlations among the inducing points, the correlation matrix is
+    approximated as R = C W^-1 C^T + D, where the diagonal matrix D restores
+    the diagonal of R to 1. Solves use the Woodbury identity and the
+    log-determinant uses the matrix determinant lemma, so nothing larger than
+    m x k is ever formed, and the cost scales as O(m k^2).
+
+    Parameters
+    ----------
+    phi : numpy.ndarray
+        The hyperparameters for the covariance function.
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    Y : numpy.ndarray
+        The state matrix for the output variables nums.
+    Xi : numpy.ndarray
+        The inducing points in percentile space.
+
+    Returns
+    -------
+    L : float
+        The negative log-likelihood cost.
+    dL : numpy.ndarray
+        The gradient of the negative log-likelihood cost with respect to phi.
+    """
+    nugget = 1e-6
+    C = calc_R_cross(phi, X, Xi)
+    W = calc_R_cross(phi, Xi, Xi)
+    W_logdet, W_solve = factor_R(W)
+    P = W_solve(C.T).T  # C W^-1
+    d = np.maximum(1 - np.sum(P*C, axis=1), 0) + nugget
+    E = C/d[:, np.newaxis]  # D^-1 C
+    A_logdet, A_solve = factor_R(W + C.T @ E)
+    logdet = A_logdet - W_logdet + np.sum(np.log(d))
+
+    def solve(b : np.ndarray) -> np.ndarray:
+        Db = b/d[:, np.newaxis]
+        return Db - E @ A_solve(C.T @ Db)
+
+    L, a, c_logdet, c_quad = calc_L_terms(logdet, solve, Y)
+
+    # Weights on each correlation in dC/dphi_j and dW/dphi_j which sum to the
+    # gradient, see the gradient in calc_L for the derivation
+    pa = P.T @ a
+    WC = -c_quad*2*(np.outer(a, pa) - (a**2)[:, np.newaxis]*P)
+    WW = -c_quad*(P.T @ ((a**2)[:, np.newaxis]*P) - np.outer(pa, pa))
+    if c_logdet:
+        S = solve(P)
+        Rinv_diag = 1/d - np.sum(A_solve(E.T).T*E, axis=1)
+        WC += c_logdet*2*(S - Rinv_diag[:, np.newaxis]*P)
+        WW += c_logdet*(P.T @ (Rinv_diag[:, np.newaxis]*P) - P.T @ S)
+
+    dL = np.zeros(len(phi))
+    for j in range(len(phi)):
+        dL[j] = (np.sum(WC*calc_dR_cross(phi, X, Xi, C, j))
+                 + np.sum(WW*calc_dR_cross(phi, Xi, Xi, W, j)))
+    return L, dL
+
+
+def calc_R_cross(phi : np.ndarray,
+                 XA  : np.ndarray,
+                 XB  : np.ndarray,
+                 ) -> np.ndarray:
+    """
+    Calculate the correlations between two sets of states.
+
+    Parameters
+    ----------
+    phi : numpy.ndarray
+        The hyperparameters for the covariance function.
+    XA : numpy.ndarray
+        The first set of states.
+    XB : numpy.ndarray
+        The second set of states.
+
+    Returns
+    -------
+    R_AB : numpy.ndarray
+        The correlation matrix, of shape (len(XA), len(XB)).
+    """
+    R_AB = np.ones((XA.shape[0], XB.shape[0]))
+    for j in range(XA.shape[1]):
+        R_AB *= np.maximum(0, 1 - phi[j]*np.abs(XA[:, j, np.newaxis] - XB[np.newaxis, :, j]))
+    return R_AB
+
+
+def calc_dR_cross(phi  : np.ndarray,
+                  XA   : np.ndarray,
+                  XB   : np.ndarray,
+                  R_AB : np.ndarray,
+                  j    : int,
+                  ) -> np.ndarray:
+    """
+    Calculate the derivative of the correlations between two sets of states
+    with respect to one of the hyperparameters.
+
+    Parameters
+    ----------
+    phi : numpy.ndarray
+        The hyperparameters for the covariance function.
+    XA : numpy.ndarray
+        The first set of states.
+    XB : numpy.ndarray
+        The second set of states.
+    R_AB : numpy.ndarray
+        The correlations between the two sets of states, from `calc_R_cross`.
+    j : int
+        The index of the hyperparameter.
+
+    Returns
+    -------
+    dR_AB : numpy.ndarray
+        The derivative of the correlation matrix with respect to phi[j].
+    """
+    h = np.abs(XA[:, j, np.newaxis] - XB[np.newaxis, :, j])
+    r = 1 - phi[j]*h
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dR_AB = np.where(r > 0, -h*R_AB/r, 0)
+    return dR_AB
+
+
+def factor_R(R : np.ndarray | csc_matrix,
+             ) -> tuple[float, Callable[[np.ndarray], np.ndarray]]:
+    """
+    Factorize a correlation matrix, returning its log-determinant and a
+    function which solves linear systems against it.
+
+    Dense matrices get a Cholesky factorization. If that fails due to poor
+    conditioning, a small nugget is added to the diagonal and the
+    factorization is retried. Sparse matrices get a sparse LU factorization
+    with a fill-reducing ordering.
+
+    Parameters
+    ----------
+    R : numpy.ndarray | scipy.sparse.csc_matrix
+        The correlation matrix.
+
+    Returns
+    -------
+    logdet : float
+        The natural log of the determinant of the correlation matrix.
+    solve : Callable[[numpy.ndarray], numpy.ndarray]
+        A function that takes in b and returns x for R @ x = b.
+    """
+    if isinstance(R, csc_matrix):
+        logdet, lu = factor_R_sparse(R)
+        return logdet, lu.solve
+
+    nugget = 0.0
+    while True:
+        try:
+            c = cho_factor(R + nugget*np.eye(R.shape[0]), lower=True, check_finite=False)
+            break
+        except LinAlgError:
+            nugget = max(1e-10, nugget*100)
+            if nugget > 1e-4:
+                raise
+    logdet = 2*np.sum(np.log(np.diag(c[0])))
+
+    def solve(b : np.ndarray) -> np.ndarray:
+        return cho_solve(c, b, check_finite=False)
+
+    return logdet, solve
+
+
+def factor_R_sparse(R : csc_matrix) -> tuple[float, SuperLU]:
+    """
+    Factorize a sparse correlation matrix with a sparse LU factorization and
+    a fill-reducing ordering. Pivoting is restricted to the diagonal, so the
+    rows and columns share one symmetric permutation P and P R P^T = L U with
+    U = D L^T.
+
+    Parameters
+    ----------
+    R : scipy.sparse.csc_matrix
+        The correlation matrix.
+
+    Returns
+    -------
+    logdet : float
+        The natural log of the determinant of the correlation matrix.
+    lu : scipy.sparse.linalg.SuperLU
+        The factorization.
+    """
+    lu = splu(R, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0,
+              options=dict(SymmetricMode=True))
+    logdet = np.sum(np.log(np.abs(lu.U.diagonal())))
+    return logdet, lu
+
+
+def calc_R_density(phi  : np.ndarray,
+                   X    : np.ndarray,
+                   tree : cKDTree | None = None,
+                   ) -> float:
+    """
+    Calculate the fraction of entries in the correlation matrix which are
+    nonzero, without building the matrix.
+
+    Parameters
+    ----------
+    phi : numpy.ndarray
+        The hyperparameters for the covariance function.
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    tree : scipy.spatial.cKDTree, default: None
+        The k-d tree of the phi-scaled states `X*phi`. If None, it is built.
+
+    Returns
+    -------
+    density : float
+        The fraction of nonzero entries in the correlation matrix.
+    """
+    m = X.shape[0]
+    if tree is None:
+        tree = cKDTree(X*phi)
+    # Counts each ordered pair and the diagonal, which is what we want here
+    nnz = tree.count_neighbors(tree, r=1.0, p=np.inf)
+    density = nnz / m**2
+    return density
+
+
+def calc_R_sparse(phi  : np.ndarray,
+                  X    : np.ndarray,
+                  tree : cKDTree | None = None,
+                  ) -> csc_matrix:
+    """
+    Calculate the correlation matrix between each of the input states, as a
+    sparse matrix. Only the pairs of states that are within 1/phi_j of each
+    other along every dimension j have nonzero correlation, and these are found
+    with a k-d tree in the phi-scaled space.
+
+    Parameters
+    ----------
+    phi : numpy.ndarray
+        The hyperparameters for the covariance function.
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    tree : scipy.spatial.cKDTree, default: None
+        The k-d tree of the phi-scaled states `X*phi`. If None, it is built.
+
+    Returns
+    -------
+    R : scipy.sparse.csc_matrix
+        The correlation matrix.
+    """
+    if tree is None:
+        tree = cKDTree(X*phi)
+    pairs = tree.query_pairs(r=1.0, p=np.inf, output_type='ndarray')
+    return calc_R_pairs(phi, X, pairs[:, 0], pairs[:, 1])
+
+
+def calc_R_pairs(phi : np.ndarray,
+                 X   : np.ndarray,
+                 u   : np.ndarray,
+                 w   : np.ndarray,
+                 ) -> csc_matrix:
+    """
+    Calculate the sparse correlation matrix with nonzero correlations only
+    over the listed pairs of states and the diagonal. Only u < w should be
+    passed in.
+
+    Parameters
+    ----------
+    phi : numpy.ndarray
+        The hyperparameters for the covariance function.
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    u : numpy.ndarray
+        The first state index of each pair.
+    w : numpy.ndarray
+        The second state index of each pair.
+
+    Returns
+    -------
+    R : scipy.sparse.csc_matrix
+        The correlation matrix.
+    """
+    m = X.shape[0]
+    Ruw = np.prod(np.maximum(0, 1 - phi*np.abs(X[u, :] - X[w, :])), axis=1)
+
+    diag = np.arange(m)
+    rows = np.concatenate((u, w, diag))
+    cols = np.concatenate((w, u, diag))
+    data = np.concatenate((Ruw, Ruw, np.ones(m)))
+    R = coo_matrix((data, (rows, cols)), shape=(m, m)).tocsc()
+    return R
+
+
+def calc_Rinv_pairs(lu : SuperLU,
+                    u  : np.ndarray,
+                    w  : np.ndarray,
+                    ) -> np.ndarray:
+    """
+    Calculate the entries of the inverse of a sparse correlation matrix at the
+    listed pairs of states, from its factorization. The pairs must be nonzero
+    in the correlation matrix, so that they are covered by the sparsity
+    pattern of the factors, see `calc_Rinv_selected`.
+
+    Parameters
+    ----------
+    lu : scipy.sparse.linalg.SuperLU
+        The factorization of the correlation matrix, see `factor_R_sparse`.
+    u : numpy.ndarray
+        The first state index of each pair.
+    w : numpy.ndarray
+        The second state index of each pair.
+
+    Returns
+    -------
+    Rinv_uw : numpy.ndarray
+        The entries of R^-1 at each pair.
+    """
+    U = lu.U.tocsr()
+    U.sort_indices()
+    Z = csr_matrix((calc_Rinv_selected(U.indptr, U.indices, U.data), U.indices, U.indptr),
+                   shape=U.shape)
+    pu, pw = lu.perm_c[u], lu.perm_c[w]
+    Rinv_uw = np.asarray(Z[np.minimum(pu, pw), np.maximum(pu, pw)]).ravel()
+    return Rinv_uw
+
+
+@jit(nopython=True, cache=True)
+def calc_Rinv_selected(indptr  : np.ndarray,
+                       indices : np.ndarray,
+                       data    : np.ndarray,
+                       ) -> np.ndarray:
+    """
+    Calculate the entries of the inverse of a symmetric matrix P R P^T = L U,
+    with U = D L^T, over the sparsity pattern of U, by the Takahashi
+    recurrences. Working up from the last row, row i of Z = (P R P^T)^-1 only
+    depends on the rows of Z below it, at columns inside the pattern of U.
+    Rows with nested patterns are grouped into supernodes and solved together
+    as dense blocks, so that the cost is about twice that of the
+    factorization. Note that this is just-in-time compiled by numba for
+    increased speed.
+
+    Parameters
+    ----------
+    indptr : numpy.ndarray
+        The CSR row pointers of U.
+    indices : numpy.ndarray
+        The CSR column indices of U, sorted within each row.
+    data : numpy.ndarray
+        The CSR values of U.
+
+    Returns
+    -------
+    Z : numpy.ndarray
+        The entries of the inverse, in the same CSR layout as U.
+    """
+    m = len(indptr) - 1
+    Z = np.zeros(len(data))
+    last = m
+    while last > 0:
+        # Rows first to last-1 form a supernode if each row's pattern is the
+        # next row's pattern plus its own diagonal
+        first = last - 1
+        while (first > 0
+               and indptr[first] - indptr[first - 1] == indptr[first + 1] - indptr[first] + 1
+               and indices[indptr[first - 1] + 1] == first):
+            first -= 1
+        k = last - first
+        J = indices[indptr[first] + k:indptr[first + 1]]
+        nJ = len(J)
+
+        # Unit upper triangular blocks of D^-1 U on the supernode rows
+        d = np.empty(k)
+        U_II = np.zeros((k, k))
+        U_IJ = np.empty((k, nJ))
+        for t in range(k):
+            start = indptr[first + t]
+            d[t] = data[start]
+            for q in range(t, k):
+                U_II[t, q] = data[start + q - t]/d[t]
+            for q in range(nJ):
+                U_IJ[t, q] = data[start + k - t + q]/d[t]
+
+        # Gather the already calculated block of Z below the supernode
+        Z_JJ = np.empty((nJ, nJ))
+        for a in range(nJ):
+            e = indptr[J[a]]
+            b = a
+            while b < nJ:
+                if indices[e] == J[b]:
+                    Z_JJ[a, b] = Z[e]
+                    Z_JJ[b, a] = Z[e]
+                    b += 1
+                e += 1
+
+        U_II_inv = np.linalg.inv(U_II)
+        M = np.diag(1/d)
+        if nJ > 0:
+            Y = U_IJ @ Z_JJ
+            Z_IJ = -(U_II_inv @ Y)
+            M += Y @ np.ascontiguousarray(U_IJ.T)
+        else:
+            Z_IJ = U_IJ
+        Z_II = U_II_inv @ M @ np.ascontiguousarray(U_II_inv.T)
+
+        for t in range(k):
+            start = indptr[first + t]
+            for q in range(t, k):
+                Z[start + q - t] = Z_II[t, q]
+            for q in range(nJ):
+                Z[start + k - t + q] = Z_IJ[t, q]
+        last = first
+    return Z
+
+
+def calc_dR_sums_sparse(phi : np.ndarray,
+                        X   : np.ndarray,
+                        u   : np.ndarray,
+                        w   : np.ndarray,
+                        W   : np.ndarray,
+                        ) -> np.ndarray:
+    """
+    Calculate the weighted sums of the derivatives of the correlation matrix
+    with respect to each of the hyperparameters, over the listed pairs of
+    states. Symmetric pairs are accounted for, so only u < w should be passed
+    in.
+
+    Parameters
+    ----------
+    phi : numpy.ndarray
+        The hyperparameters for the covariance function.
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    u : numpy.ndarray
+        The first state index of each pair.
+    w : numpy.ndarray
+        The second state index of each pair.
+    W : numpy.ndarray
+        The weight for each pair.
+
+    Returns
+    -------
+    dR_sums : numpy.ndarray
+        The sum over pairs of W * dR_uw/dphi_j, for each j.
+    """
+    n = X.shape[1]
+    h = np.abs(X[u, :] - X[w, :])
+    r = np.maximum(0, 1 - phi*h)
+    dR_sums = np.zeros(n)
+    for j in range(n):
+        r_others = np.prod(np.delete(r, j, axis=1), axis=1)
+        dRj = np.where(r[:, j] > 0, -h[:, j]*r_others, 0)
+        dR_sums[j] = 2*np.sum(W*dRj)
+    return dR_sums
+
+
+@jit(nopython=True, cache=True)
+def calc_dR_sums(phi : np.ndarray,
+                 X   : np.ndarray,
+                 W   : np.ndarray,
+                 ) -> np.ndarray:
+    """
+    Calculate the weighted sums of the derivatives of the correlation matrix
+    with respect to each of the hyperparameters, without forming any of the
+    derivative matrices. Note that this is just-in-time compiled by numba for
+    increased speed.
+
+    Parameters
+    ----------
+    phi : numpy.ndarray
+        The hyperparameters for the covariance function.
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    W : numpy.ndarray
+        The symmetric weight matrix.
+
+    Returns
+    -------
+    dR_sums : numpy.ndarray
+        The sum over all u, w of W[u, w] * dR[u, w]/dphi_j, for each j.
+    """
+    m, n = X.shape
+    dR_sums = np.zeros(n)
+    r = np.zeros(n)
+    for u in range(1, m):
+        # do lower triangle only and double, diag derivatives are all 0
+        for w in range(u):
+            for j in range(n):
+                r[j] = calc_rj(X[u, j] - X[w, j], phi[j])
+            for j in range(n):
+                if r[j] > 0:
+                    r_others = 1.0
+                    for k in range(n):
+                        if k != j:
+                            r_others = r_others*r[k]
+                    dR_sums[j] += -2*W[u, w]*abs(X[u, j] - X[w, j])*r_others
+    return dR_sums
 
 
 @jit(nopython=True, cache=True)
@@ -296,7 +1236,7 @@ def calc_R(phi : np.ndarray,
 
     Returns
     -------
-    R : float
+    R : numpy.ndarray
         The correlation matrix.
     """
     m = X.shape[0]
@@ -304,7 +1244,7 @@ def calc_R(phi : np.ndarray,
     for u in range(1, m):
         # do lower triangle only and duplicate across diag
         # diag will be all 1s
-        for w in range(1, u):
+        for w in range(u):
             Ruw = calc_Ruw(phi, X[u, :], X[w, :])
             R[u, w] = Ruw
             R[w, u] = Ruw
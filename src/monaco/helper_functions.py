@@ -8,13 +8,56 @@ from typing import Callable, Any, Sequence, Iterable, Sized
 from time import time
 from functools import wraps
 from hashlib import sha512
+from types import ModuleType
+import importlib
 import warnings
+import sys
 
-# Optional imports
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
+
+def import_optional(name : str) -> ModuleType | None:
+    """
+    Import an optional dependency when it is first needed, rather than when
+    monaco is imported.
+
+    Parameters
+    ----------
+    name : str
+        The module name, for example 'pyarrow.parquet'.
+
+    Returns
+    -------
+    module : types.ModuleType | None
+        The module, or None if it is not installed.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def loaded_module(name : str) -> ModuleType | None:
+    """
+    Get an optional module only if something has already imported it. This is
+    enough for isinstance checks, since an object of a type from the module
+    cannot exist until the module has been imported.
+
+    Parameters
+    ----------
+    name : str
+        The module name, for example 'pandas'.
+
+    Returns
+    -------
+    module : types.ModuleType | None
+        The module, or None if it has not been imported.
+    """
+    return sys.modules.get(name)
+
+
+def is_dataframe(x : Any) -> bool:
+    """Check if x is a pandas DataFrame, without importing pandas."""
+    pd = loaded_module('pandas')
+    return pd is not None and isinstance(x, pd.DataFrame)
 
 
 def next_power_of_2(x : int) -> int:
@@ -104,6 +147,24 @@ def is_num(val : Any) -> bool:
             return True
 
 
+def is_numeric_array(x : Any) -> bool:
+    """
+    Type checking function to see if the input is a numpy array of integers
+    or floats. Boolean arrays do not count, since they get a valmap.
+
+    Parameters
+    ----------
+    x : Any
+        The value to check.
+
+    Returns
+    -------
+    isnumericarray : bool
+        Returns True if the input is a numeric numpy array, False otherwise.
+    """
+    return isinstance(x, np.ndarray) and x.dtype.kind in 'iuf'
+
+
 def length(x : Any) -> int | None:
     """
     Genericized length function that works on scalars (which have length 1).
@@ -144,7 +205,7 @@ def get_list(x : Any) -> list[Any]:
         return list()
     elif isinstance(x, str):
         return [x, ]
-    elif pd and isinstance(x, pd.DataFrame):
+    elif is_dataframe(x):
         return [x, ]
     elif isinstance(x, Iterable):
         if isinstance(x, np.ndarray) and np.ndim(x) == 0:
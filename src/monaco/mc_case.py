@@ -5,7 +5,7 @@ from monaco.mc_var import OutVar, InVar
 from monaco.mc_val import OutVal, InVal
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 import numpy as np
 
 class Case():
@@ -90,6 +90,7 @@ class Case():
 
         self.invals  : dict[str, InVal]  = self.getInVals()
         self.outvals : dict[str, OutVal] = dict()
+        self.pendingoutvals : list[str] = []
 
         self.siminput     : tuple[Any] | None = None
         self.simrawoutput : tuple[Any] | None = None
@@ -100,6 +101,39 @@ class Case():
                 f"\n  outvals={self.outvals})")
 
 
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['outvals'] = self.outvals  # generates any pending outvals
+        del state['_outvals']
+        state['pendingoutvals'] = []
+        return state
+
+
+    def __setstate__(self, state : dict) -> None:
+        state = state.copy()
+        state['_outvals'] = state.pop('outvals', dict())
+        state.setdefault('pendingoutvals', [])  # loaded from an older file
+        self.__dict__.update(state)
+
+
+    @property
+    def outvals(self) -> dict[str, OutVal]:
+        """
+        The output values for this case. Any OutVals added with
+        `addLazyOutVals` are generated from their OutVars on first access.
+        """
+        if self.pendingoutvals:
+            pending, self.pendingoutvals = self.pendingoutvals, []
+            for name in pending:
+                self._outvals[name] = self.outvars[name].getVal(self.ncase)
+        return self._outvals
+
+
+    @outvals.setter
+    def outvals(self, outvals : dict[str, OutVal]) -> None:
+        self._outvals = outvals
+
+
     def getInVals(self) -> dict[str, InVal]:
         """
         From all the InVar's, extract the vals for this case.
@@ -132,6 +166,25 @@ class Case():
         return vals
 
 
+    def addLazyOutVals(self, outvars : Iterable[OutVar]) -> None:
+        """
+        Add OutVars whose OutVals for this case are only generated when
+        `outvals` is next accessed. This lets whole columns of results be
+        imported without building an OutVal for every case up front.
+
+        Parameters
+        ----------
+        outvars : Iterable[monaco.mc_var.OutVar]
+            The output variables, which must have a value for this case.
+        """
+        outvars = {outvar.name: outvar for outvar in outvars}
+        if not outvars.keys().isdisjoint(self._outvals) \
+                or not outvars.keys().isdisjoint(self.pendingoutvals):
+            raise ValueError(f"{list(outvars)} overlap with the existing OutVals")
+        self.outvars.update(outvars)
+        self.pendingoutvals.extend(outvars)
+
+
     def addOutVal(self,
                   name   : str,
                   val    : Any,
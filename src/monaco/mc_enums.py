@@ -93,6 +93,55 @@ class PlotOrientation(str, Enum):
     HORIZONTAL = 'horizontal'
 
 
+class ScatterMode(str, Enum):
+    """
+    Enum for how the plotting functions draw scatter plots.
+
+    Notes
+    -----
+    'points' draws a marker for every case. 'density' bins the cases and
+    colors the bins by the log of their counts, which keeps the plot time and
+    legibility roughly constant for large ensembles. 'auto' uses 'density'
+    when there are more than `mc_plot.DENSITY_MIN_POINTS` cases to plot.
+    Highlighted cases are always drawn as points.
+    """
+    AUTO    = 'auto'
+    POINTS  = 'points'
+    DENSITY = 'density'
+
+
+class LineMode(str, Enum):
+    """
+    Enum for how the plotting functions draw ensembles of lines.
+
+    Notes
+    -----
+    'lines' draws a line for every case. 'fan' draws a fan chart of the
+    quantiles across the cases at each index, along with a random sample of
+    the individual cases. Highlighted cases are always drawn as lines.
+    """
+    LINES = 'lines'
+    FAN   = 'fan'
+
+
+class ReportPlot(str, Enum):
+    """
+    Enum for the kinds of figures in a sim's plot report.
+
+    Notes
+    -----
+    'hist' and 'cdf' are made for every invar and scalar outvar. 'grid' is a
+    single grid of the scalar outvars against the invars. 'line' is made for
+    every nonscalar outvar. 'sensitivities' is made for every scalar outvar
+    with calculated sensitivities.
+    """
+    HIST          = 'hist'
+    CDF           = 'cdf'
+    GRID          = 'grid'
+    LINE          = 'line'
+    SENSITIVITIES = 'sensitivities'
+
+
 class InVarSpace(str, Enum):
     """
     Enum for whether to plot invars in number or percentile space.
@@ -107,3 +156,123 @@ class Sensitivities(str, Enum):
     """
     INDICES = 'indices'
     RATIOS = 'ratios'
+
+
+class SensitivityApproximation(str, Enum):
+    """
+    Enum for the approximations that can be used to speed up the D-VARS
+    sensitivity calculations for sims with many cases.
+
+    Notes
+    -----
+    'none' fits the hyperparameters on every case, which scales with the cube
+    of the number of cases.
+    'subsample' fits on a subsample of the cases, stratified over the output
+    variable so that its distribution is preserved. The cost is that of a full
+    fit on `nsamples` cases, and the estimates become noisier as `nsamples`
+    shrinks. Repeating with different subsamples gives a spread of estimates.
+    'nystrom' fits on all the cases, but with a low-rank approximation to the
+    correlation matrix built from `ninducing` inducing points, with its
+    diagonal corrected to 1. The cost scales linearly with the number of cases
+    and quadratically with `ninducing`. The approximation degrades when the
+    correlation length 1/phi is shorter than the spacing of the inducing
+    points, so more inducing points are needed as the number of input
+    variables grows.
+    For a 6 input variable test function with 1024 cases, the 'subsample'
+    approximation with 256 cases and the 'nystrom' approximation with 64
+    inducing points each ran 5-10x faster and matched the full sensitivity
+    ratios to within about 0.03.
+    """
+    NONE      = 'none'
+    SUBSAMPLE = 'subsample'
+    NYSTROM   = 'nystrom'
+
+
+class SensitivityMethod(str, Enum):
+    """
+    Enum for the methods that can be used to calculate the sensitivities of
+    the output variables to the input variables.
+
+    Notes
+    -----
+    'dvars' fits a variogram-based model to the response surface, and is the
+    most informative but most expensive method.
+    'spearman' is the Spearman rank correlation coefficient, which measures
+    monotonic dependence.
+    'prcc' is the partial rank correlation coefficient, which measures
+    monotonic dependence after removing the effects of the other inputs.
+    'easi' estimates first-order sensitivity indices from the spectrum of the
+    output reordered along each input.
+    'binned' estimates first-order sensitivity indices from the variance of
+    the output means over equal-count bins of each input.
+    All but 'dvars' are computed directly from the existing cases in
+    O(n log n) time, and are useful for screening out unimportant inputs.
+    """
+    DVARS    = 'dvars'
+    SPEARMAN = 'spearman'
+    PRCC     = 'prcc'
+    EASI     = 'easi'
+    BINNED   = 'binned'
+
+
+class CorrelationMethod(str, Enum):
+    """
+    Enum for the correlation coefficients that can be calculated between
+    variables.
+    """
+    PEARSON  = 'pearson'
+    SPEARMAN = 'spearman'
+    KENDALL  = 'kendall'
+
+
+class CaseStorage(str, Enum):
+    """
+    Enum for how the case data is saved to disk.
+
+    Notes
+    -----
+    'files' saves each case to its own '.mccase' file.
+    'store' appends all the cases to a single indexed '.mccases' file, and
+    saves the nums and pcts of all the variables to a memory-mappable
+    columnar '.mcvars' file, which can be loaded without loading any cases.
+    """
+    FILES = 'files'
+    STORE = 'store'
+
+
+class SimStorage(str, Enum):
+    """
+    Enum for how the sim data is saved to disk.
+
+    Notes
+    -----
+    'pickle' saves the whole sim object to a '.mcsim' file.
+    'manifest' saves a small JSON '.mcmanifest' file with the sim
+    configuration, seeds, and case status, the var arrays to a
+    memory-mappable '.mcvars' file, and the functions, distributions, and
+    other python objects to a '.mcobjects' file. Each file is only rewritten
+    when its contents change.
+    """
+    PICKLE   = 'pickle'
+    MANIFEST = 'manifest'
+
+
+class Compression(str, Enum):
+    """
+    Enum for the compression codec used when saving sim and case data.
+
+    Notes
+    -----
+    'none' saves plain cloudpickle data. The other codecs save a header
+    recording the codec, followed by the compressed pickle stream and each of
+    its out-of-band buffers (such as numpy array data) compressed separately.
+    'zlib', 'lzma', and 'bz2' are in the python standard library. 'zstd' needs
+    the optional `zstandard` package, and 'lz4' needs the optional `lz4`
+    package.
+    """
+    NONE = 'none'
+    ZLIB = 'zlib'
+    LZMA = 'lzma'
+    BZ2  = 'bz2'
+    ZSTD = 'zstd'
+    LZ4  = 'lz4'
@@ -6,7 +6,7 @@ from matplotlib.figure import Figure
 from matplotlib.axes import Axes
 from monaco.mc_plot import plot_hist, plot_2d_scatter
 from monaco.mc_var import InVar, OutVar
-from monaco.mc_enums import PlotOrientation, InVarSpace
+from monaco.mc_enums import PlotOrientation, InVarSpace, ScatterMode
 from monaco.helper_functions import empty_list, get_list
 from typing import Optional, Iterable
 
@@ -21,6 +21,7 @@ def multi_plot(vars        : list[InVar | OutVar],
                fig         : Figure | None = None,
                title       : str    = '',
                plotkwargs  : dict   = dict(),
+               scatter_mode : ScatterMode = ScatterMode.AUTO,
                ) -> tuple[Figure, tuple[Axes, ...]]:
     """
     Umbrella function to make more complex plots of Monte Carlo variables.
@@ -47,6 +48,9 @@ def multi_plot(vars        : list[InVar | OutVar],
         The figure handle to plot in. If None, a new figure is created.
     title : str, default: ''
         The figure title.
+    scatter_mode : monaco.ScatterMode, default: 'auto'
+        Whether to draw the scatter plots as 'points' or 'density' plots, see
+        `monaco.mc_plot.plot_2d_scatter`.
 
     Returns
     -------
@@ -74,7 +78,8 @@ def multi_plot(vars        : list[InVar | OutVar],
                                                   cov_plot=cov_plot, cov_p=cov_p,
                                                   cumulative=False,
                                                   invar_space=invar_space,
-                                                  fig=fig, title=title, plotkwargs=plotkwargs)
+                                                  fig=fig, title=title, plotkwargs=plotkwargs,
+                                                  scatter_mode=scatter_mode)
         else:
             raise ValueError( 'Invalid variable dimensions: ' +
                              f'{varx.name} {varx.maxdim}, ' +
@@ -89,7 +94,8 @@ def multi_plot(vars        : list[InVar | OutVar],
                                        cov_plot=cov_plot, cov_p=cov_p,
                                        cumulative=False,
                                        invar_space=invar_space,
-                                       fig=fig, title=title, plotkwargs=plotkwargs)
+                                       fig=fig, title=title, plotkwargs=plotkwargs,
+                                       scatter_mode=scatter_mode)
 
     return fig, axs
 
@@ -107,6 +113,7 @@ def multi_plot_2d_scatter_hist(varx     : InVar | OutVar,
                                fig        : Figure | None = None,
                                title      : str    = '',
                                plotkwargs : dict   = dict(),
+                               scatter_mode : ScatterMode = ScatterMode.AUTO,
                                ) -> tuple[Figure, tuple[Axes, ...]]:
     """
     Plot two variables against each other with a central scatterplot and two
@@ -138,6 +145,9 @@ def multi_plot_2d_scatter_hist(varx     : InVar | OutVar,
         The figure handle to plot in. If None, a new figure is created.
     title : str, default: ''
         The figure title.
+    scatter_mode : monaco.ScatterMode, default: 'auto'
+        Whether to draw the scatter plots as 'points' or 'density' plots, see
+        `monaco.mc_plot.plot_2d_scatter`.
 
     Returns
     -------
@@ -166,7 +176,8 @@ def multi_plot_2d_scatter_hist(varx     : InVar | OutVar,
                     rug_plot=rug_plot,
                     cov_plot=cov_plot, cov_p=cov_p,
                     invar_space=invar_space,
-                    ax=ax3, title='', plotkwargs=plotkwargs)
+                    ax=ax3, title='', plotkwargs=plotkwargs,
+                    scatter_mode=scatter_mode)
 
     ax1.set_ylabel('')
     ax2.set_xlabel('')
@@ -192,6 +203,7 @@ def multi_plot_grid_tri(vars     : list[InVar | OutVar],
                         fig        : Figure | None = None,
                         title      : str    = '',
                         plotkwargs : dict   = dict(),
+                        scatter_mode : ScatterMode = ScatterMode.AUTO,
                         ) -> tuple[Figure, tuple[Axes, ...]]:
     """
     Plot multiple variables against each other in a triangular grid. The
@@ -223,6 +235,9 @@ def multi_plot_grid_tri(vars     : list[InVar | OutVar],
         The figure handle to plot in. If None, a new figure is created.
     title : str, default: ''
         The figure title.
+    scatter_mode : monaco.ScatterMode, default: 'auto'
+        Whether to draw the scatter plots as 'points' or 'density' plots, see
+        `monaco.mc_plot.plot_2d_scatter`.
 
     Returns
     -------
@@ -253,7 +268,8 @@ def multi_plot_grid_tri(vars     : list[InVar | OutVar],
                                 cases=cases, highlight_cases=highlight_cases,
                                 rug_plot=rug_plot, cov_plot=cov_plot, cov_p=cov_p,
                                 invar_space=invar_space,
-                                ax=ax, title='', plotkwargs=plotkwargs)
+                                ax=ax, title='', plotkwargs=plotkwargs,
+                                scatter_mode=scatter_mode)
                 if j > 0:
                     ax.set_yticklabels([])
 
@@ -282,6 +298,7 @@ def multi_plot_grid_rect(varsx     : InVar | OutVar | list[InVar | OutVar],
                          fig        : Figure | None = None,
                          title      : str    = '',
                          plotkwargs : dict   = dict(),
+                         scatter_mode : ScatterMode = ScatterMode.AUTO,
                          ) -> tuple[Figure, tuple[Axes, ...]]:
     """
     Plot multiple variables against each other in a rectangual grid. The
@@ -314,6 +331,9 @@ def multi_plot_grid_rect(varsx     : InVar | OutVar | list[InVar | OutVar],
         The figure handle to plot in. If None, a new figure is created.
     title : str, default: ''
         The figure title.
+    scatter_mode : monaco.ScatterMode, default: 'auto'
+        Whether to draw the scatter plots as 'points' or 'density' plots, see
+        `monaco.mc_plot.plot_2d_scatter`.
 
     Returns
     -------
@@ -354,7 +374,8 @@ def multi_plot_grid_rect(varsx     : InVar | OutVar | list[InVar | OutVar],
                                 cases=cases, highlight_cases=highlight_cases,
                                 rug_plot=rug_plot, cov_plot=cov_plot, cov_p=cov_p,
                                 invar_space=invar_space,
-                                ax=ax, title='', plotkwargs=plotkwargs)
+                                ax=ax, title='', plotkwargs=plotkwargs,
+                                scatter_mode=scatter_mode)
             if j > 0:
                 ax.set_yticklabels([])
 
@@ -11,16 +11,32 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.interpolate import griddata
 from scipy.stats import rv_continuous, rv_discrete, chi2, mode
-from copy import copy, deepcopy
+from copy import copy
 from typing import Optional, Iterable
 from matplotlib.figure import Figure
 from matplotlib.axes import Axes
 from matplotlib.patches import Ellipse
+from matplotlib.colors import LogNorm
+from matplotlib.cbook import normalize_kwargs
+from matplotlib.collections import LineCollection
 from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 from monaco.helper_functions import get_list, slice_by_index, length, empty_list
 from monaco.gaussian_statistics import conf_ellipsoid_sig2pct
 from monaco.integration_statistics import integration_error
-from monaco.mc_enums import SampleMethod, PlotOrientation, InVarSpace, Sensitivities
+from monaco.mc_enums import (SampleMethod, PlotOrientation, InVarSpace, Sensitivities,
+                              SensitivityMethod, ScatterMode, LineMode)
+
+# Default maximum number of rug marks to draw before thinning, see plot_rug_marks
+RUG_MAX_MARKS = 2000
+# Number of histograms cached per var by get_histogram
+HIST_CACHE_SIZE = 16
+# Number of cases above which plot_cdf draws an empirical CDF
+ECDF_MIN_POINTS = 10000
+# Number of points above which ScatterMode.AUTO draws a density plot
+DENSITY_MIN_POINTS = 20000
+# Number of bins across each axis for density plots
+DENSITY_GRIDSIZE = 60
 
 
 # If cases or highlight_cases are None, will plot all. Set to [] to plot none.
@@ -36,6 +52,8 @@ def plot(varx   : InVar | OutVar,
          ax          : Optional[Axes] = None,
          title       : str            = '',
          plotkwargs  : dict           = dict(),
+         scatter_mode : ScatterMode   = ScatterMode.AUTO,
+         line_mode    : LineMode      = LineMode.LINES,
          ) -> tuple[Figure, Axes]:
     """
     Umbrella function to make single plots of a single Monte Carlo variable or
@@ -67,6 +85,12 @@ def plot(varx   : InVar | OutVar,
         The axes handle to plot in. If None, a new figure is created.
     title : str, default: ''
         The figure title.
+    scatter_mode : monaco.ScatterMode, default: 'auto'
+        Whether to draw scatter plots as 'points' or 'density' plots, see
+        `plot_2d_scatter`.
+    line_mode : monaco.LineMode, default: 'lines'
+        Whether to draw 2D line plots as 'lines' or 'fan' charts, see
+        `plot_2d_line`.
 
     Returns
     -------
@@ -123,7 +147,8 @@ def plot(varx   : InVar | OutVar,
             fig, ax = plot_2d_line(varx=var0, vary=var1,
                                    highlight_cases=highlight_cases,
                                    invar_space=invar_space,
-                                   ax=ax, title=title, plotkwargs=plotkwargs)
+                                   ax=ax, title=title, plotkwargs=plotkwargs,
+                                   line_mode=line_mode)
 
     # Two Variable Plots
     elif vary is not None and varz is None:
@@ -132,13 +157,15 @@ def plot(varx   : InVar | OutVar,
                                       cases=cases, highlight_cases=highlight_cases,
                                       rug_plot=rug_plot, cov_plot=cov_plot, cov_p=cov_p,
                                       invar_space=invar_space,
-                                      ax=ax, title=title, plotkwargs=plotkwargs)
+                                      ax=ax, title=title, plotkwargs=plotkwargs,
+                                      scatter_mode=scatter_mode)
 
         elif varx.maxdim == 1 and vary.maxdim == 1:
             fig, ax = plot_2d_line(varx=varx, vary=vary,
                                    cases=cases, highlight_cases=highlight_cases,
                                    invar_space=invar_space,
-                                   ax=ax, title=title, plotkwargs=plotkwargs)
+                                   ax=ax, title=title, plotkwargs=plotkwargs,
+                                   line_mode=line_mode)
 
         elif varx.maxdim in (0, 1) and vary.maxdim in (0, 1):
             var2 = copy(vary)
@@ -164,7 +191,8 @@ def plot(varx   : InVar | OutVar,
             fig, ax = plot_3d_scatter(varx=varx, vary=vary, varz=varz,
                                       cases=cases, highlight_cases=highlight_cases,
                                       invar_space=invar_space,
-                                      ax=ax, title=title, plotkwargs=plotkwargs)
+                                      ax=ax, title=title, plotkwargs=plotkwargs,
+                                      scatter_mode=scatter_mode)
 
         elif varx.maxdim == 1 and vary.maxdim == 1 and varz.maxdim == 1:
             fig, ax = plot_3d_line(varx=varx, vary=vary, varz=varz,
@@ -233,20 +261,13 @@ def plot_hist(var         : InVar | OutVar,
     fig, ax = manage_axis(ax, is3d=False)
     invar_space = manage_invar_space(invar_space=invar_space, nvars=1)
 
-    bins : str | np.ndarray = 'auto'
-    if 'bins' in plotkwargs:
-        bins = plotkwargs['bins']
-        del plotkwargs['bins']
+    bins : int | str | np.ndarray = plotkwargs.get('bins', 'auto')
+    plotkwargs = {key: val for key, val in plotkwargs.items() if key != 'bins'}
 
     # Histogram generation
-    cases_list = get_cases(var.ncases, cases)
     highlight_cases_list = get_cases(var.ncases, highlight_cases)
     points = get_plot_points(var, invar_space[0])
-    nums = slice_by_index(points, cases_list)
-    counts, bins = np.histogram(nums, bins=bins)
-    binwidth = mode(np.diff(bins), keepdims=False)[0]
-    bins = np.append(bins - binwidth/2, bins[-1] + binwidth/2)
-    counts, bins = np.histogram(nums, bins=bins)
+    counts, bins = get_histogram(var, cases=cases, bins=bins, invar_space=invar_space[0])
 
     if isinstance(var, monaco.mc_var.InVar):
         # Loaded from file
@@ -305,64 +326,10 @@ def plot_hist(var         : InVar | OutVar,
         ylabeltext = 'Probability Density'
 
     if rug_plot:
-        plot_rug_marks(ax, orientation=orientation, nums=np.array(points))
+        plot_rug_marks(ax, orientation=orientation, nums=var.sortedNums(invar_space[0]))
 
-    xlim = ax.get_xlim()
-    ylim = ax.get_ylim()
-
-    # Highlight cases and VarStats
-    if orientation == PlotOrientation.VERTICAL:
-        for i in highlight_cases_list:
-            plt.plot([points[i], points[i]],
-                     [ylim[0], ylim[0] + (ylim[1] - ylim[0])*0.20],
-                     linestyle='-', linewidth=1, color='C1', alpha=1,
-                     **plotkwargs)
-        for i, varstat in enumerate(var.varstats):
-            nums = get_list(varstat.nums)
-            if length(nums) == 1:  # Single Statistic
-                plt.plot([nums[0], nums[0]], ylim,
-                         linestyle='-', color='C0', alpha=1, **plotkwargs)
-            elif length(nums) == 3:  # Sided Order Statistics
-                plt.plot([nums[1], nums[1]], ylim,
-                         linestyle='-', color='C0', alpha=1, **plotkwargs)
-            if varstat.confidence_interval_high_nums is not None:
-                ax.fill_between([varstat.confidence_interval_low_nums,
-                                 varstat.confidence_interval_high_nums],
-                                [ylim[0], ylim[0]],
-                                [ylim[1], ylim[1]],
-                                color='C0', alpha=0.3)
-            if length(nums) in (2, 3):  # Sided Order Statistics
-                ax.fill_between([nums[0], nums[-1]],
-                                [ylim[0], ylim[0]],
-                                [ylim[1], ylim[1]],
-                                color='C0', alpha=0.3)
-        plt.xlabel(var.name)
-        plt.ylabel(ylabeltext)
-        apply_category_labels(ax, varx=var)
-
-    elif orientation == PlotOrientation.HORIZONTAL:
-        for i in highlight_cases_list:
-            plt.plot([xlim[0], xlim[0] + (xlim[1] - xlim[0])*0.20],
-                     [points[i], points[i]],
-                     linestyle='-', linewidth=1, color='C1', alpha=1, **plotkwargs)
-        for varstat in var.varstats:
-            nums = get_list(varstat.nums)
-            if length(nums) == 1:  # Single Statistic
-                plt.plot(xlim, [nums[0], nums[0]],
-                         linestyle='-', color='C0', alpha=1, **plotkwargs)
-            elif length(nums) == 3:  # Sided Order Statistics
-                plt.plot(xlim, [nums[1], nums[1]],
-                         linestyle='-', color='C0', alpha=1, **plotkwargs)
-            if varstat.confidence_interval_high_nums is not None:
-                ax.fill_between(xlim,
-                                [varstat.confidence_interval_low_nums,
-                                 varstat.confidence_interval_high_nums],
-                                color='C0', alpha=0.3)
-            if length(nums) in (2, 3):  # Sided Order Statistics
-                ax.fill_between(xlim, nums[0], nums[-1], color='C0', alpha=0.3)
-        plt.ylabel(var.name)
-        plt.xlabel(ylabeltext)
-        apply_category_labels(ax, vary=var)
+    plot_1d_annotations(ax, var=var, points=points, highlight_cases=highlight_cases_list,
+                        orientation=orientation, ylabeltext=ylabeltext, plotkwargs=plotkwargs)
 
     plt.title(title)
 
@@ -379,6 +346,8 @@ def plot_cdf(var       : InVar | OutVar,
              ax          : Optional[Axes]  = None,
              title       : str             = '',
              plotkwargs  : dict            = dict(),
+             ecdf        : Optional[bool]  = None,
+             dkw_conf    : Optional[float] = None,
              ) -> tuple[Figure, Axes]:
     """
     Plot a cumulative distribution of a single variable.
@@ -402,6 +371,13 @@ def plot_cdf(var       : InVar | OutVar,
         The axes handle to plot in. If None, a new figure is created.
     title : str, default: ''
         The figure title.
+    ecdf : bool, default: None
+        Whether to plot the empirical CDF with `plot_ecdf` rather than a
+        cumulative histogram. If None, plots the empirical CDF for more than
+        `ECDF_MIN_POINTS` cases or if `dkw_conf` is set.
+    dkw_conf : float, default: None
+        The confidence level of the DKW band around the empirical CDF, see
+        `plot_ecdf`.
 
     Returns
     -------
@@ -409,12 +385,183 @@ def plot_cdf(var       : InVar | OutVar,
         fig is the figure handle for the plot.
         ax is the axes handle for the plot.
     """
+    if ecdf is None:
+        ncases = var.ncases if cases is None else len(get_cases(var.ncases, cases))
+        ecdf = dkw_conf is not None or ncases > ECDF_MIN_POINTS
+    if ecdf:
+        return plot_ecdf(var=var, cases=cases, highlight_cases=highlight_cases,
+                         orientation=orientation, rug_plot=rug_plot, dkw_conf=dkw_conf,
+                         invar_space=invar_space, ax=ax, title=title, plotkwargs=plotkwargs)
     return plot_hist(var=var, cases=cases, highlight_cases=highlight_cases, cumulative=True,
                      orientation=orientation, rug_plot=rug_plot, invar_space=invar_space,
                      ax=ax, title=title, plotkwargs=plotkwargs)
 
 
 
+def plot_ecdf(var       : InVar | OutVar,
+              cases           : None | int | Iterable[int] = None,
+              highlight_cases : None | int | Iterable[int] = empty_list(),
+              orientation : PlotOrientation = PlotOrientation.VERTICAL,
+              rug_plot    : bool            = True,
+              dkw_conf    : Optional[float] = None,
+              npoints     : None | int | str = 'auto',
+              invar_space : InVarSpace | Iterable[InVarSpace] = InVarSpace.NUMS,
+              ax          : Optional[Axes]  = None,
+              title       : str             = '',
+              plotkwargs  : dict            = dict(),
+              ) -> tuple[Figure, Axes]:
+    """
+    Plot the empirical cumulative distribution function of a single variable.
+
+    The curve is drawn through exact order statistics of the sorted nums at
+    up to `npoints` evenly spaced ranks, so after the variable is sorted once
+    (see `monaco.mc_var.Var.sortedNums`), each plot takes time proportional to
+    the axes resolution rather than the number of cases.
+
+    Parameters
+    ----------
+    var : monaco.mc_var.InVar | monaco.mc_var.OutVar
+        The variable to plot.
+    cases : None | int | Iterable[int], default: None
+        The cases to plot. If None, then all cases are plotted.
+    highlight_cases : None | int | Iterable[int], default: []
+        The cases to highlight. If [], then no cases are highlighted.
+    orientation : monaco.mc_enums.PlotOrientation, default: 'vertical'
+        The orientation of the plot. Either 'vertical' or 'horizontal'.
+    rug_plot : bool, default: True
+        Whether to plot rug marks.
+    dkw_conf : float, default: None
+        If not None, plots a confidence band around the empirical CDF at this
+        confidence level, from the Dvoretzky-Kiefer-Wolfowitz inequality. The
+        band half-width is `sqrt(ln(2/(1 - dkw_conf))/(2*n))` for `n` cases.
+    npoints : None | int | str, default: 'auto'
+        The maximum number of points to draw the curve through. If 'auto',
+        this is set from the width of the axes in pixels. If None, every case
+        is drawn.
+    invar_space : monaco.InVarSpace | Iterable[InVarSpace], default: 'nums'
+        The space to plot invars in, either 'nums' or 'pcts'.
+    ax : matplotlib.axes.Axes, default: None
+        The axes handle to plot in. If None, a new figure is created.
+    title : str, default: ''
+        The figure title.
+
+    Returns
+    -------
+    (fig, ax) : (matplotlib.figure.Figure, matplotlib.axes.Axes)
+        fig is the figure handle for the plot.
+        ax is the axes handle for the plot.
+    """
+    fig, ax = manage_axis(ax, is3d=False)
+    invar_space = manage_invar_space(invar_space=invar_space, nvars=1)
+
+    highlight_cases_list = get_cases(var.ncases, highlight_cases)
+    points = get_plot_points(var, invar_space[0])
+    if cases is None:
+        sortednums = var.sortedNums(invar_space[0])
+    else:
+        nums = slice_by_index(points, get_cases(var.ncases, cases))
+        sortednums = np.sort(np.asarray(nums, dtype=float).ravel())
+
+    x, y = get_ecdf_points(sortednums, get_max_vertices(ax, npoints))
+    if orientation == PlotOrientation.VERTICAL:
+        plt.plot(x, y, drawstyle='steps-post', color='k', alpha=0.5, linewidth=2, **plotkwargs)
+    elif orientation == PlotOrientation.HORIZONTAL:
+        plt.plot(y, x, drawstyle='steps-pre', color='k', alpha=0.5, linewidth=2, **plotkwargs)
+
+    if dkw_conf is not None and sortednums.size > 0:
+        eps = dkw_epsilon(sortednums.size, dkw_conf)
+        low = np.clip(y - eps, 0, 1)
+        high = np.clip(y + eps, 0, 1)
+        if orientation == PlotOrientation.VERTICAL:
+            ax.fill_between(x, low, high, step='post', color='k', alpha=0.15, linewidth=0)
+        elif orientation == PlotOrientation.HORIZONTAL:
+            ax.fill_betweenx(x, low, high, step='post', color='k', alpha=0.15, linewidth=0)
+
+    if isinstance(var, monaco.mc_var.InVar) and invar_space[0] == InVarSpace.NUMS \
+            and isinstance(var.dist, (rv_continuous, rv_discrete)):
+        lim = get_hist_lim(ax, orientation)
+        dist = var.dist(**var.distkwargs)
+        if isinstance(var.dist, rv_continuous):
+            xdata = np.linspace(lim[0], lim[1], 100)
+        else:
+            xdata = np.arange(int(np.floor(lim[0])), int(np.ceil(lim[1])) + 1)
+        ydata = dist.cdf(xdata)
+        drawstyle = 'default' if isinstance(var.dist, rv_continuous) else 'steps-post'
+        if orientation == PlotOrientation.VERTICAL:
+            plt.plot(xdata, ydata, color='k', alpha=0.9, drawstyle=drawstyle)
+        elif orientation == PlotOrientation.HORIZONTAL:
+            drawstyle = drawstyle.replace('post', 'pre')
+            plt.plot(ydata, xdata, color='k', alpha=0.9, drawstyle=drawstyle)
+
+    if rug_plot:
+        plot_rug_marks(ax, orientation=orientation,
+                       nums=sortednums[decimate_indices(sortednums.size, RUG_MAX_MARKS)])
+
+    plot_1d_annotations(ax, var=var, points=points, highlight_cases=highlight_cases_list,
+                        orientation=orientation, ylabeltext='Cumulative Probability',
+                        plotkwargs=plotkwargs)
+    plt.title(title)
+
+    return fig, ax
+
+
+
+def get_ecdf_points(sortednums : np.ndarray,
+                    npoints    : int | None,
+                    ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the points to draw an empirical CDF through, at up to `npoints`
+    evenly spaced ranks of the sorted nums. Each point is exactly on the
+    empirical CDF, including for tied values.
+
+    Parameters
+    ----------
+    sortednums : numpy.ndarray
+        The nums, sorted in ascending order.
+    npoints : int | None
+        The maximum number of points, or None for every num.
+
+    Returns
+    -------
+    (x, y) : (numpy.ndarray, numpy.ndarray)
+        The nums and their cumulative probabilities, starting from a
+        probability of 0 at the smallest num.
+    """
+    n = sortednums.size
+    if n == 0:
+        return np.array([]), np.array([])
+    x = sortednums[decimate_indices(n, npoints)]
+    y = np.searchsorted(sortednums, x, side='right')/n
+    return np.append(x[0], x), np.append(0.0, y)
+
+
+
+def dkw_epsilon(n    : int,
+                conf : float,
+                ) -> float:
+    """
+    The half-width of the Dvoretzky-Kiefer-Wolfowitz confidence band around
+    an empirical CDF, which contains the true CDF everywhere with probability
+    at least `conf`.
+
+    Parameters
+    ----------
+    n : int
+        The number of samples.
+    conf : float
+        The confidence level, between 0 and 1.
+
+    Returns
+    -------
+    eps : float
+        The band half-width.
+    """
+    if not 0 < conf < 1:
+        raise ValueError(f'{conf=} must be between 0 and 1')
+    return float(np.sqrt(np.log(2/(1 - conf))/(2*n)))
+
+
+
 def plot_2d_scatter(varx   : InVar | OutVar,
                     vary   : InVar | OutVar,
                     varz   : InVar | OutVar = None,
@@ -427,6 +574,7 @@ def plot_2d_scatter(varx   : InVar | OutVar,
                     ax       : Optional[Axes] = None,
                     title    : str            = '',
                     plotkwargs : dict         = dict(),
+                    scatter_mode : ScatterMode = ScatterMode.AUTO,
                     ) -> tuple[Figure, Axes]:
     """
     Plot a scatter plot of two variables.
@@ -457,6 +605,11 @@ def plot_2d_scatter(varx   : InVar | OutVar,
         The axes handle to plot in. If None, a new figure is created.
     title : str, default: ''
         The figure title.
+    scatter_mode : monaco.ScatterMode, default: 'auto'
+        Whether to draw the cases as 'points', or bin them into a 'density'
+        plot with log color scaling. If 'auto', uses a density plot for more
+        than `DENSITY_MIN_POINTS` cases. Highlighted cases are always drawn as
+        points.
 
     Returns
     -------
@@ -491,9 +644,16 @@ def plot_2d_scatter(varx   : InVar | OutVar,
         fig.colorbar(contour, ax=ax, label=varz.name)
 
     if reg_cases:
-        plt.scatter(slice_by_index(varx_points, reg_cases),
-                    slice_by_index(vary_points, reg_cases),
-                    edgecolors=None, c='k', alpha=0.4, **plotkwargs)
+        if use_density(scatter_mode, len(reg_cases)):
+            reg_cases_list = sorted(reg_cases)
+            ax.hexbin(np.asarray(slice_by_index(varx_points, reg_cases_list), dtype=float),
+                      np.asarray(slice_by_index(vary_points, reg_cases_list), dtype=float),
+                      gridsize=DENSITY_GRIDSIZE, norm=LogNorm(), mincnt=1, cmap='Greys',
+                      linewidths=0)
+        else:
+            plt.scatter(slice_by_index(varx_points, reg_cases),
+                        slice_by_index(vary_points, reg_cases),
+                        edgecolors=None, c='k', alpha=0.4, **plotkwargs)
     if highlight_cases_list:
         plt.scatter(slice_by_index(varx_points, highlight_cases_list),
                     slice_by_index(vary_points, highlight_cases_list),
@@ -530,6 +690,10 @@ def plot_2d_line(varx : InVar | OutVar,
                  ax     : Optional[Axes] = None,
                  title  : str            = '',
                  plotkwargs : dict       = dict(),
+                 maxvertices : None | int | str = 'auto',
+                 line_mode   : LineMode       = LineMode.LINES,
+                 quantiles   : Iterable[float] = (0.05, 0.25, 0.5, 0.75, 0.95),
+                 nspaghetti  : int            = 100,
                  ) -> tuple[Figure, Axes]:
     """
     Plot an ensemble of 2D lines for two nonscalar variables.
@@ -551,6 +715,28 @@ def plot_2d_line(varx : InVar | OutVar,
         The axes handle to plot in. If None, a new figure is created.
     title : str, default: ''
         The figure title.
+    plotkwargs : dict, default: {}
+        Keyword arguments for drawing the lines of the cases. If these are
+        all `matplotlib.collections.LineCollection` properties, each group of
+        lines is drawn as one collection. Otherwise, such as for markers,
+        each case is drawn with its own `matplotlib.axes.Axes.plot` call,
+        which is slower for many cases.
+    maxvertices : None | int | str, default: 'auto'
+        The maximum number of vertices to draw per line, with longer lines
+        decimated to the first, last, minimum, and maximum points in each
+        bucket of consecutive points, so that spikes are still drawn. If
+        'auto', this is set from the width of the axes in pixels. If None,
+        all points are drawn.
+    line_mode : monaco.LineMode, default: 'lines'
+        Whether to draw every case as a line, or a 'fan' chart of the
+        quantiles of vary across the cases at each index.
+    quantiles : Iterable[float], default: (0.05, 0.25, 0.5, 0.75, 0.95)
+        For a fan chart, the quantiles to draw. Each pair of quantiles
+        symmetric about the median is filled between, and the middle quantile
+        of an odd number of quantiles is drawn as a line.
+    nspaghetti : int, default: 100
+        For a fan chart, the number of randomly sampled cases to also draw as
+        lines.
 
     Returns
     -------
@@ -566,12 +752,26 @@ def plot_2d_line(varx : InVar | OutVar,
     reg_cases = set(cases_list) - set(highlight_cases_list)
     varx_points = get_plot_points(varx, invar_space[0])
     vary_points = get_plot_points(vary, invar_space[1])
-    for i in reg_cases:
-        plt.plot(varx_points[i], vary_points[i],
-                 linestyle='-', color='black', alpha=0.2, **plotkwargs)
-    for i in highlight_cases_list:
-        plt.plot(varx_points[i], vary_points[i],
-                 linestyle='-', color='C1', alpha=0.9, **plotkwargs)
+    maxvertices = get_max_vertices(ax, maxvertices, perpixel=6)
+    points = (varx_points, vary_points)
+    reg_cases_list = sorted(reg_cases)
+    if line_mode == LineMode.FAN:
+        if len(reg_cases_list) > nspaghetti:
+            rng = np.random.default_rng(0)
+            reg_cases_list = sorted(rng.choice(reg_cases_list, size=nspaghetti, replace=False))
+    elif line_mode != LineMode.LINES:
+        raise ValueError(f'{line_mode=} must be one of {[mode.value for mode in LineMode]}')
+
+    if reg_cases_list:
+        lines = get_line_vertices(points, reg_cases_list, maxvertices)
+        plot_line_ensemble(ax, lines, plotkwargs, linestyle='-', color='black', alpha=0.2)
+    if line_mode == LineMode.FAN and cases_list:
+        bands = get_quantile_bands(vary_points, cases_list, quantiles)
+        plot_quantile_bands(ax, max(varx_points, key=len), bands)
+    if highlight_cases_list:
+        lines = get_line_vertices(points, highlight_cases_list, maxvertices)
+        plot_line_ensemble(ax, lines, plotkwargs, linestyle='-', color='C1', alpha=0.9)
+    ax.autoscale_view()
 
     for varstat in vary.varstats:
         varx_points_max = max(varx_points, key=len)
@@ -611,6 +811,7 @@ def plot_3d_scatter(varx : InVar | OutVar,
                     ax     : Optional[Axes] = None,
                     title  : str            = '',
                     plotkwargs : dict       = dict(),
+                    scatter_mode : ScatterMode = ScatterMode.AUTO,
                     ) -> tuple[Figure, Axes]:
     """
     Plot a scatter plot of three variables in 3D space.
@@ -634,6 +835,11 @@ def plot_3d_scatter(varx : InVar | OutVar,
         The axes handle to plot in. If None, a new figure is created.
     title : str, default: ''
         The figure title.
+    scatter_mode : monaco.ScatterMode, default: 'auto'
+        Whether to draw the cases as 'points', or bin them into a 'density'
+        plot with log color scaling. If 'auto', uses a density plot for more
+        than `DENSITY_MIN_POINTS` cases. Highlighted cases are always drawn as
+        points.
 
     Returns
     -------
@@ -651,10 +857,21 @@ def plot_3d_scatter(varx : InVar | OutVar,
     vary_points = get_plot_points(vary, invar_space[1])
     varz_points = get_plot_points(varz, invar_space[2])
     if reg_cases:
-        ax.scatter(slice_by_index(varx_points, reg_cases),
-                   slice_by_index(vary_points, reg_cases),
-                   slice_by_index(varz_points, reg_cases),
-                   edgecolors=None, c='k', alpha=0.4, **plotkwargs)
+        if use_density(scatter_mode, len(reg_cases)):
+            reg_cases_list = sorted(reg_cases)
+            points = np.column_stack([slice_by_index(var_points, reg_cases_list)
+                                      for var_points in (varx_points, vary_points, varz_points)])
+            counts, edges = np.histogramdd(points.astype(float), bins=DENSITY_GRIDSIZE//3)
+            inds = np.nonzero(counts)
+            centers = [(edge[:-1] + edge[1:])[ind]/2 for edge, ind in zip(edges, inds)]
+            logcounts = np.log(counts[inds])
+            alpha = 0.02 + 0.38*logcounts/max(np.max(logcounts), 1)
+            ax.scatter(*centers, edgecolors=None, c='k', alpha=alpha, s=10)
+        else:
+            ax.scatter(slice_by_index(varx_points, reg_cases),
+                       slice_by_index(vary_points, reg_cases),
+                       slice_by_index(varz_points, reg_cases),
+                       edgecolors=None, c='k', alpha=0.4, **plotkwargs)
     if highlight_cases_list:
         ax.scatter(slice_by_index(varx_points, highlight_cases_list),
                    slice_by_index(vary_points, highlight_cases_list),
@@ -680,6 +897,7 @@ def plot_2p5d_line(varx : InVar | OutVar,
                    ax     : Optional[Axes] = None,
                    title  : str            = '',
                    plotkwargs : dict       = dict(),
+                   maxvertices : None | int | str = 'auto',
                    ) -> tuple[Figure, Axes]:
     """
     Plot an ensemble of 2.5D lines for one scalar and two nonscalar variables.
@@ -703,6 +921,18 @@ def plot_2p5d_line(varx : InVar | OutVar,
         The axes handle to plot in. If None, a new figure is created.
     title : str, default: ''
         The figure title.
+    plotkwargs : dict, default: {}
+        Keyword arguments for drawing the lines of the cases. If these are
+        all `matplotlib.collections.LineCollection` properties, each group of
+        lines is drawn as one collection. Otherwise, such as for markers,
+        each case is drawn with its own `matplotlib.axes.Axes.plot` call,
+        which is slower for many cases.
+    maxvertices : None | int | str, default: 'auto'
+        The maximum number of vertices to draw per line, with longer lines
+        decimated to the first, last, minimum, and maximum points in each
+        bucket of consecutive points, so that spikes are still drawn. If
+        'auto', this is set from the width of the axes in pixels. If None,
+        all points are drawn.
 
     Returns
     -------
@@ -710,25 +940,12 @@ def plot_2p5d_line(varx : InVar | OutVar,
         fig is the figure handle for the plot.
         ax is the axes handle for the plot.
     """
-    var0 = deepcopy(varx)
-    var1 = deepcopy(vary)
-    var2 = deepcopy(varz)
-    npoints = 0
-    for var in (var0, var1, var2):
-        if var.maxdim == 1:
-            npoints = max(npoints, max(len(num) for num in var.nums))
-    for var in (var0, var1, var2):
-        if var.maxdim == 0:
-            for i in range(var.ncases):
-                var.nums[i] = np.array([var.nums[i] for _ in range(npoints)])
-                if isinstance(var, monaco.mc_var.InVar):
-                    var.pcts[i] = [float(var.pcts[i]) for _ in range(npoints)]
-            var.maxdim = 1
-
-    fig, ax = plot_3d_line(varx=var0, vary=var1, varz=var2,
+    # The scalar var is broadcast along each line by get_line_vertices
+    fig, ax = plot_3d_line(varx=varx, vary=vary, varz=varz,
                            cases=cases, highlight_cases=highlight_cases,
                            invar_space=invar_space,
-                           ax=ax, title=title, plotkwargs=plotkwargs)
+                           ax=ax, title=title, plotkwargs=plotkwargs,
+                           maxvertices=maxvertices)
 
     return fig, ax
 
@@ -743,6 +960,7 @@ def plot_3d_line(varx : InVar | OutVar,
                  ax     : Optional[Axes] = None,
                  title  : str            = '',
                  plotkwargs : dict       = dict(),
+                 maxvertices : None | int | str = 'auto',
                  ) -> tuple[Figure, Axes]:
     """
     Plot an ensemble of 3D lines for three nonscalar variables.
@@ -766,6 +984,18 @@ def plot_3d_line(varx : InVar | OutVar,
         The axes handle to plot in. If None, a new figure is created.
     title : str, default: ''
         The figure title.
+    plotkwargs : dict, default: {}
+        Keyword arguments for drawing the lines of the cases. If these are
+        all `matplotlib.collections.LineCollection` properties, each group of
+        lines is drawn as one collection. Otherwise, such as for markers,
+        each case is drawn with its own `matplotlib.axes.Axes.plot` call,
+        which is slower for many cases.
+    maxvertices : None | int | str, default: 'auto'
+        The maximum number of vertices to draw per line, with longer lines
+        decimated to the first, last, minimum, and maximum points in each
+        bucket of consecutive points, so that spikes are still drawn. If
+        'auto', this is set from the width of the axes in pixels. If None,
+        all points are drawn.
 
     Returns
     -------
@@ -782,12 +1012,17 @@ def plot_3d_line(varx : InVar | OutVar,
     varx_points = get_plot_points(varx, invar_space[0])
     vary_points = get_plot_points(vary, invar_space[1])
     varz_points = get_plot_points(varz, invar_space[2])
-    for i in reg_cases:
-        ax.plot(varx_points[i], vary_points[i], varz_points[i],
-                linestyle='-', color='black', alpha=0.3, **plotkwargs)
-    for i in highlight_cases_list:
-        ax.plot(varx_points[i], vary_points[i], varz_points[i],
-                linestyle='-', color='C1', alpha=0.9, **plotkwargs)
+    maxvertices = get_max_vertices(ax, maxvertices, perpixel=8)
+    points = (varx_points, vary_points, varz_points)
+    for cases_group, color, alpha in ((sorted(reg_cases), 'black', 0.3),
+                                      (highlight_cases_list, 'C1', 0.9)):
+        if not cases_group:
+            continue
+        lines = get_line_vertices(points, cases_group, maxvertices)
+        had_data = ax.has_data()
+        plot_line_ensemble(ax, lines, plotkwargs, linestyle='-', color=color, alpha=alpha)
+        allvertices = np.concatenate([np.reshape(line, (-1, 3)) for line in lines])
+        ax.auto_scale_xyz(allvertices[:, 0], allvertices[:, 1], allvertices[:, 2], had_data)
 
     ax.set_xlabel(varx.name)
     ax.set_ylabel(vary.name)
@@ -1010,13 +1245,19 @@ def plot_sensitivities(outvar        : OutVar,
     fig, ax = manage_axis(ax, is3d=False)
     fig.set_layout_engine('tight')
 
+    method_label = ''
+    if outvar.sensitivity_method not in (None, SensitivityMethod.DVARS):
+        method_label = f' ({SensitivityMethod(outvar.sensitivity_method).value})'
+
     if sensitivities == Sensitivities.RATIOS:
         sensitivities_dict = outvar.sensitivity_ratios
-        ax.set_xlabel(f"Sensitivity Ratio for '{outvar.name}'")
+        sensitivities_std_dict = outvar.sensitivity_ratios_std
+        ax.set_xlabel(f"Sensitivity Ratio for '{outvar.name}'{method_label}")
 
     elif sensitivities == Sensitivities.INDICES:
         sensitivities_dict = outvar.sensitivity_indices
-        ax.set_xlabel(f"Sensitivity Index for '{outvar.name}'")
+        sensitivities_std_dict = outvar.sensitivity_indices_std
+        ax.set_xlabel(f"Sensitivity Index for '{outvar.name}'{method_label}")
 
     y_pos = np.arange(len(sensitivities_dict))
     if sort:
@@ -1026,8 +1267,12 @@ def plot_sensitivities(outvar        : OutVar,
         y_pos = np.flipud(y_pos)
     invarnames = [invarname for invarname, _ in sens_tuples]
     sensitivities_vals = [val for _, val in sens_tuples]
+    sensitivities_err = None
+    if sensitivities_std_dict is not None:
+        sensitivities_err = [sensitivities_std_dict[invarname] for invarname in invarnames]
 
-    ax.barh(y_pos, sensitivities_vals, facecolor='k', alpha=0.5, tick_label=invarnames)
+    ax.barh(y_pos, sensitivities_vals, xerr=sensitivities_err,
+            facecolor='k', alpha=0.5, tick_label=invarnames)
     plt.title(title)
 
     return fig, ax
@@ -1133,12 +1378,101 @@ def get_hist_lim(ax          : Axes,
 
 
 
+def plot_1d_annotations(ax              : Axes,
+                        var             : InVar | OutVar,
+                        points          : list[float],
+                        highlight_cases : list[int],
+                        orientation     : PlotOrientation,
+                        ylabeltext      : str,
+                        plotkwargs      : dict = dict(),
+                        ) -> None:
+    """
+    Mark the highlighted cases and VarStats on a histogram or CDF plot of a
+    single variable, and label the axes.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        The target axis.
+    var : monaco.mc_var.InVar | monaco.mc_var.OutVar
+        The variable plotted.
+    points : list[float]
+        The points plotted, see `get_plot_points`.
+    highlight_cases : list[int]
+        The cases to highlight.
+    orientation : monaco.mc_enums.PlotOrientation
+        The orientation of the plot, either 'vertical' or 'horizontal'.
+    ylabeltext : str
+        The label for the probability axis.
+    """
+    xlim = ax.get_xlim()
+    ylim = ax.get_ylim()
+
+    # Highlight cases and VarStats
+    if orientation == PlotOrientation.VERTICAL:
+        for i in highlight_cases:
+            plt.plot([points[i], points[i]],
+                     [ylim[0], ylim[0] + (ylim[1] - ylim[0])*0.20],
+                     linestyle='-', linewidth=1, color='C1', alpha=1,
+                     **plotkwargs)
+        for i, varstat in enumerate(var.varstats):
+            nums = get_list(varstat.nums)
+            if length(nums) == 1:  # Single Statistic
+                plt.plot([nums[0], nums[0]], ylim,
+                         linestyle='-', color='C0', alpha=1, **plotkwargs)
+            elif length(nums) == 3:  # Sided Order Statistics
+                plt.plot([nums[1], nums[1]], ylim,
+                         linestyle='-', color='C0', alpha=1, **plotkwargs)
+            if varstat.confidence_interval_high_nums is not None:
+                ax.fill_between([varstat.confidence_interval_low_nums,
+                                 varstat.confidence_interval_high_nums],
+                                [ylim[0], ylim[0]],
+                                [ylim[1], ylim[1]],
+                                color='C0', alpha=0.3)
+            if length(nums) in (2, 3):  # Sided Order Statistics
+                ax.fill_between([nums[0], nums[-1]],
+                                [ylim[0], ylim[0]],
+                                [ylim[1], ylim[1]],
+                                color='C0', alpha=0.3)
+        plt.xlabel(var.name)
+        plt.ylabel(ylabeltext)
+        apply_category_labels(ax, varx=var)
+
+    elif orientation == PlotOrientation.HORIZONTAL:
+        for i in highlight_cases:
+            plt.plot([xlim[0], xlim[0] + (xlim[1] - xlim[0])*0.20],
+                     [points[i], points[i]],
+                     linestyle='-', linewidth=1, color='C1', alpha=1, **plotkwargs)
+        for varstat in var.varstats:
+            nums = get_list(varstat.nums)
+            if length(nums) == 1:  # Single Statistic
+                plt.plot(xlim, [nums[0], nums[0]],
+                         linestyle='-', color='C0', alpha=1, **plotkwargs)
+            elif length(nums) == 3:  # Sided Order Statistics
+                plt.plot(xlim, [nums[1], nums[1]],
+                         linestyle='-', color='C0', alpha=1, **plotkwargs)
+            if varstat.confidence_interval_high_nums is not None:
+                ax.fill_between(xlim,
+                                [varstat.confidence_interval_low_nums,
+                                 varstat.confidence_interval_high_nums],
+                                color='C0', alpha=0.3)
+            if length(nums) in (2, 3):  # Sided Order Statistics
+                ax.fill_between(xlim, nums[0], nums[-1], color='C0', alpha=0.3)
+        plt.ylabel(var.name)
+        plt.xlabel(ylabeltext)
+        apply_category_labels(ax, vary=var)
+
+
+
 def plot_rug_marks(ax          : Axes,
                    orientation : PlotOrientation,
-                   nums        : Iterable[float]
+                   nums        : Iterable[float],
+                   maxmarks    : Optional[int] = None,
                    ) -> None:
     """
-    Plot rug marks for a histogram or scatter plot.
+    Plot rug marks for a histogram or scatter plot. The marks are drawn as a
+    single line collection, sized as a fraction of the axes so that they do
+    not affect the axis limits.
 
     Parameters
     ----------
@@ -1148,20 +1482,98 @@ def plot_rug_marks(ax          : Axes,
         The orientation of the plot, either 'vertical' or 'horizontal'.
     nums : Iterable[float]
         The numbers to plot the rug marks at.
+    maxmarks : int, default: None
+        The maximum number of rug marks to draw. Above this, the marks are
+        thinned to evenly spaced order statistics of `nums`, which preserves
+        the shape of the distribution. If None, `RUG_MAX_MARKS` is used.
     """
     if ax is None:
         return
 
-    xlim = ax.get_xlim()
-    ylim = ax.get_ylim()
+    if maxmarks is None:
+        maxmarks = RUG_MAX_MARKS
+    nums = np.sort(np.ravel(np.asarray(nums, dtype=float)))
+    if nums.size > maxmarks:
+        nums = nums[np.round(np.linspace(0, nums.size - 1, maxmarks)).astype(int)]
+
+    ends = np.array([0, 0.02])
     if orientation == PlotOrientation.VERTICAL:
-        for num in nums:
-            plt.plot([num, num], [ylim[0], ylim[0] + 0.02*(ylim[1] - ylim[0])],
-                     color='black', linewidth=0.5, alpha=0.5)
+        marks = np.stack(np.broadcast_arrays(nums[:, None], ends[None, :]), axis=-1)
+        transform = ax.get_xaxis_transform()
     elif orientation == PlotOrientation.HORIZONTAL:
-        for num in nums:
-            plt.plot([xlim[0], xlim[0] + 0.02*(xlim[1] - xlim[0])], [num, num],
-                     color='black', linewidth=0.5, alpha=0.5)
+        marks = np.stack(np.broadcast_arrays(ends[None, :], nums[:, None]), axis=-1)
+        transform = ax.get_yaxis_transform()
+    else:
+        return
+    ax.add_collection(LineCollection(marks, transform=transform,
+                                     color='black', linewidth=0.5, alpha=0.5),
+                      autolim=False)
+
+
+
+def get_quantile_bands(points    : list,
+                       cases     : Iterable[int],
+                       quantiles : Iterable[float],
+                       ) -> np.ndarray:
+    """
+    Calculate the quantiles across an ensemble of lines at each index, in one
+    vectorized pass over the (ncases, npoints) array. Lines shorter than the
+    longest line are padded with NaNs, which are ignored.
+
+    Parameters
+    ----------
+    points : list
+        The per-case points, see `get_plot_points`.
+    cases : Iterable[int]
+        The cases to calculate the quantiles over.
+    quantiles : Iterable[float]
+        The quantiles to calculate, between 0 and 1.
+
+    Returns
+    -------
+    bands : numpy.ndarray
+        The sorted quantiles at each index, of shape (nquantiles, npoints).
+    """
+    lines = [np.ravel(np.asarray(points[i], dtype=float)) for i in cases]
+    quantiles = np.sort(np.asarray(list(quantiles), dtype=float))
+    lengths = {len(line) for line in lines}
+
+    # Index-major so that each index's values are contiguous for partitioning
+    stacked = np.full((max(lengths), len(lines)), np.nan)
+    for j, line in enumerate(lines):
+        stacked[:len(line), j] = line
+    if len(lengths) == 1:
+        return np.quantile(stacked, quantiles, axis=1)
+    return np.nanquantile(stacked, quantiles, axis=1)
+
+
+
+def plot_quantile_bands(ax    : Axes,
+                        x     : Iterable[float],
+                        bands : np.ndarray,
+                        ) -> None:
+    """
+    Plot a fan chart of quantile bands, filling between each pair of
+    quantiles from the outside in with increasing opacity.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        The target axis.
+    x : Iterable[float]
+        The x points for the bands.
+    bands : numpy.ndarray
+        The sorted quantiles at each x point, see `get_quantile_bands`.
+    """
+    if ax is None:
+        return
+
+    nbands = len(bands)
+    for j in range(nbands // 2):
+        ax.fill_between(x, bands[j], bands[nbands - 1 - j],
+                        color='C0', alpha=0.3, linewidth=0, zorder=2)
+    if nbands % 2 == 1:
+        ax.plot(x, bands[nbands // 2], linestyle='-', color='C0', alpha=0.9, zorder=2)
 
 
 
@@ -1211,6 +1623,32 @@ def plot_2d_cov_ellipse(ax   : Axes,
 
 
 
+def use_density(scatter_mode : ScatterMode,
+                npoints      : int,
+                ) -> bool:
+    """
+    Parse the `scatter_mode` input for scatter plotting functions.
+
+    Parameters
+    ----------
+    scatter_mode : monaco.ScatterMode
+        The scatter mode, either 'auto', 'points', or 'density'.
+    npoints : int
+        The number of points to plot.
+
+    Returns
+    -------
+    use_density : bool
+        Whether to draw a density plot rather than points.
+    """
+    if scatter_mode == ScatterMode.AUTO:
+        return npoints > DENSITY_MIN_POINTS
+    elif scatter_mode in (ScatterMode.POINTS, ScatterMode.DENSITY):
+        return scatter_mode == ScatterMode.DENSITY
+    raise ValueError(f'{scatter_mode=} must be one of {[mode.value for mode in ScatterMode]}')
+
+
+
 def get_cases(ncases : int,
               cases  : None | int | Iterable[int],
               ) -> list[int]:
@@ -1296,6 +1734,272 @@ def get_plot_points(var         : InVar | OutVar,
 
 
 
+def get_histogram(var         : InVar | OutVar,
+                  cases       : None | int | Iterable[int],
+                  bins        : int | str | np.ndarray,
+                  invar_space : InVarSpace,
+                  ) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Get the counts and bin edges for a histogram of a scalar variable. The
+    bin edges numpy picks are shifted by half a bin width so that they become
+    the bin centers, and the nums are counted in a single pass over these.
+
+    The result is cached on the var keyed on the cases, bins, and
+    invar_space, so the marginal histograms in multi plot grids are only
+    computed once per var. Entries are dropped when `nums` or `pcts` is
+    reassigned, and the oldest entries are dropped past `HIST_CACHE_SIZE`.
+
+    Parameters
+    ----------
+    var : monaco.mc_var.InVar | monaco.mc_var.OutVar
+        The variable to bin.
+    cases : None | int | Iterable[int]
+        The cases to bin. If None, then all cases are binned.
+    bins : int | str | numpy.ndarray
+        The bins argument to `numpy.histogram_bin_edges`.
+    invar_space : monaco.InVarSpace
+        The space to bin invars in, either 'nums' or 'pcts'.
+
+    Returns
+    -------
+    (counts, bins) : (numpy.ndarray, numpy.ndarray)
+        The read-only counts and bin edges.
+    '''
+    points = get_plot_points(var, invar_space)
+    caseskey = None if cases is None else tuple(get_cases(var.ncases, cases))
+    binskey = bins
+    if not isinstance(bins, (int, str)):
+        binskey = np.asarray(bins, dtype=float).tobytes()
+    key = (InVarSpace(invar_space).value, caseskey, binskey)
+
+    if not hasattr(var, 'histcache'):
+        var.histcache = dict()  # loaded from an older file
+    cached = var.histcache.get(key)
+    if cached is not None and cached[0] is points:
+        return cached[1], cached[2]
+
+    if cases is None:
+        nums = var.sortedNums(invar_space)
+    else:
+        nums = np.asarray(slice_by_index(points, get_cases(var.ncases, cases)), dtype=float)
+    edges = np.histogram_bin_edges(nums, bins=bins)
+    binwidth = mode(np.diff(edges), keepdims=False)[0]
+    edges = np.append(edges - binwidth/2, edges[-1] + binwidth/2)
+    counts, edges = np.histogram(nums, bins=edges)
+
+    counts.flags.writeable = False
+    edges.flags.writeable = False
+    var.histcache = {oldkey: val for oldkey, val in var.histcache.items()
+                     if oldkey[0] != key[0] or val[0] is points}  # drop stale entries
+    while len(var.histcache) >= HIST_CACHE_SIZE:
+        del var.histcache[next(iter(var.histcache))]
+    var.histcache[key] = (points, counts, edges)
+    return counts, edges
+
+
+
+def get_max_vertices(ax          : Axes,
+                     maxvertices : None | int | str,
+                     perpixel    : int = 2,
+                     ) -> int | None:
+    '''
+    Parse the `maxvertices` input for line plotting functions. If 'auto',
+    returns `perpixel` times the width of the axes in pixels.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        The axes the lines will be plotted in.
+    maxvertices : None | int | str
+        The maximum number of vertices per line, 'auto', or None for no limit.
+    perpixel : int, default: 2
+        The number of vertices per pixel column for 'auto'. Lines decimated
+        with `minmax_indices` need 2 + 2*ndim to keep every extreme.
+
+    Returns
+    -------
+    maxvertices : int | None
+        The maximum number of vertices per line, or None for no limit.
+    '''
+    if maxvertices == 'auto':
+        width = ax.get_window_extent().width
+        maxvertices = max(perpixel*int(np.ceil(width)), 2)
+    elif maxvertices is not None:
+        maxvertices = max(int(maxvertices), 2)
+    return maxvertices
+
+
+
+def decimate_indices(npoints     : int,
+                     maxvertices : int | None,
+                     ) -> slice | np.ndarray:
+    '''
+    Get the indices of evenly spaced points to keep when decimating a line,
+    always keeping the first and last points.
+
+    Parameters
+    ----------
+    npoints : int
+        The number of points in the line.
+    maxvertices : int | None
+        The maximum number of points to keep, or None to keep all of them.
+
+    Returns
+    -------
+    inds : slice | numpy.ndarray
+        The indices of the points to keep.
+    '''
+    if maxvertices is None or npoints <= maxvertices:
+        return slice(None)
+    return np.unique(np.round(np.linspace(0, npoints - 1, maxvertices)).astype(int))
+
+
+
+def minmax_indices(lines       : np.ndarray,
+                   maxvertices : int | None,
+                   ) -> slice | np.ndarray:
+    '''
+    Get the indices of the points to keep when decimating lines. The points
+    of each line are split into buckets of consecutive points, and in each
+    bucket the first and last points and the points at the minimum and
+    maximum of each dimension are kept, in order. This is the M4 method
+    extended to any number of dimensions, so spikes survive decimation.
+    Points may be kept more than once, so that every line keeps the same
+    number of points.
+
+    Parameters
+    ----------
+    lines : numpy.ndarray
+        The line vertices, with shape (..., npoints, ndim).
+    maxvertices : int | None
+        The maximum number of points to keep, or None to keep all of them.
+        At least one bucket of 2 + 2*ndim points is always kept.
+
+    Returns
+    -------
+    inds : slice | numpy.ndarray
+        The indices of the points to keep, with shape (..., nkeep).
+    '''
+    npoints, ndim = lines.shape[-2:]
+    if maxvertices is None or npoints <= maxvertices:
+        return slice(None)
+    nbuckets = max(maxvertices // (2 + 2*ndim), 1)
+    size = -(-npoints // nbuckets)
+    starts = np.arange(nbuckets)[:, None]*size
+    bucket_inds = np.minimum(starts + np.arange(size), npoints - 1)
+    buckets = lines[..., bucket_inds, :]  # (..., nbuckets, size, ndim)
+    ends = np.broadcast_to(bucket_inds[:, -1:], buckets.shape[:-2] + (1,))
+    inds = np.concatenate([np.broadcast_to(starts, ends.shape), ends,
+                           starts + np.argmin(buckets, axis=-2),
+                           starts + np.argmax(buckets, axis=-2)], axis=-1)
+    inds = np.sort(np.minimum(inds, npoints - 1), axis=-1)
+    return inds.reshape(inds.shape[:-2] + (-1,))
+
+
+
+def decimate_lines(lines       : np.ndarray,
+                   maxvertices : int | None,
+                   ) -> np.ndarray:
+    '''
+    Decimate lines to at most `maxvertices` points each, see
+    `minmax_indices`.
+
+    Parameters
+    ----------
+    lines : numpy.ndarray
+        The line vertices, with shape (..., npoints, ndim).
+    maxvertices : int | None
+        The maximum number of points to keep, or None to keep all of them.
+
+    Returns
+    -------
+    lines : numpy.ndarray
+        The decimated line vertices, with shape (..., nkeep, ndim).
+    '''
+    inds = minmax_indices(lines, maxvertices)
+    if isinstance(inds, slice):
+        return lines
+    return np.take_along_axis(lines, inds[..., None], axis=-2)
+
+
+
+def get_line_vertices(points      : Iterable[list],
+                      cases       : Iterable[int],
+                      maxvertices : int | None = None,
+                      ) -> np.ndarray | list[np.ndarray]:
+    '''
+    Gather the vertices of an ensemble of lines for a line collection. Scalar
+    points are broadcast along the length of the other dimensions' points in
+    the same case, without modifying the source points. If all the lines are
+    the same length, they are stacked into a single array of shape
+    (ncases, npoints, ndim). Otherwise, a list of (npoints, ndim) arrays is
+    returned, one per case.
+
+    Parameters
+    ----------
+    points : Iterable[list]
+        For each dimension, the per-case points to plot, see
+        `get_plot_points`.
+    cases : Iterable[int]
+        The cases to gather.
+    maxvertices : int | None, default: None
+        The maximum number of vertices per line, see `minmax_indices`.
+
+    Returns
+    -------
+    lines : numpy.ndarray | list[numpy.ndarray]
+        The line vertices.
+    '''
+    cases = list(cases)
+    coords = [[np.ravel(np.asarray(dimpoints[i], dtype=float)) for i in cases]
+              for dimpoints in points]
+    lengths = [max(len(dimcoords[j]) for dimcoords in coords) for j in range(len(cases))]
+    if len(set(lengths)) == 1:
+        lines = np.stack([np.stack([np.broadcast_to(coord, lengths[0]) for coord in dimcoords])
+                          for dimcoords in coords], axis=-1)
+        return decimate_lines(lines, maxvertices)
+
+    return [decimate_lines(np.column_stack([np.broadcast_to(dimcoords[j], npoints)
+                                            for dimcoords in coords]), maxvertices)
+            for j, npoints in enumerate(lengths)]
+
+
+
+def plot_line_ensemble(ax         : Axes,
+                       lines      : np.ndarray | list[np.ndarray],
+                       plotkwargs : dict,
+                       **linekwargs,
+                       ) -> None:
+    '''
+    Draw an ensemble of lines, as a single line collection if possible.
+    Keywords in `plotkwargs` that a line collection does not support, such as
+    markers, fall back to drawing each line with `ax.plot`.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        The axes to plot in, which may be 3D.
+    lines : numpy.ndarray | list[numpy.ndarray]
+        The line vertices, see `get_line_vertices`.
+    plotkwargs : dict
+        The user's keyword arguments, which override `linekwargs`.
+    **linekwargs
+        The default keyword arguments for the lines.
+    '''
+    kwargs = {**linekwargs, **plotkwargs}
+    collection = Line3DCollection if ax.name == '3d' else LineCollection
+    normalized = normalize_kwargs(kwargs, collection)
+    if all(hasattr(collection, f'set_{key}') for key in normalized):
+        if ax.name == '3d':
+            ax.add_collection3d(collection(lines, **kwargs))
+        else:
+            ax.add_collection(collection(lines, **kwargs))
+    else:
+        for line in lines:
+            ax.plot(*np.transpose(line), **kwargs)
+
+
+
 def get_var_steps(var : InVar | OutVar) -> OutVar:
     '''
     For a 1D variable, get an OutVar that has as values the simulation sets.
@@ -1,29 +1,42 @@
 # mc_sim.py
 from __future__ import annotations
 
+# matplotlib, dask.distributed, and numba are only imported when first used,
+# so that singlethreaded sims and worker processes don't pay for them
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from matplotlib.axes import Axes
+
 import os
+import json
+import hashlib
 import numpy as np
 import dask
-import csv
-import json
-import cloudpickle
 import pathlib
-from dask.distributed import Client
+from importlib import metadata
 from datetime import datetime, timedelta
-from matplotlib.figure import Figure
-from matplotlib.axes import Axes
 from tqdm import tqdm
 from typing import Callable, Any, Iterable, Optional
 from scipy.stats import rv_continuous, rv_discrete
 from monaco.mc_case import Case
-from monaco.mc_var import InVar, OutVar, InVarSpace
-from monaco.mc_enums import SimFunctions, SampleMethod
+from monaco.mc_var import ColumnView, InVar, OutVar, InVarSpace
+from monaco.mc_enums import (SimFunctions, SampleMethod, SensitivityApproximation,
+                              SensitivityMethod, CorrelationMethod, CaseStorage,
+                              Compression, SimStorage, ReportPlot)
 from monaco.helper_functions import (get_list, vprint, vwarn, empty_list,
                                      hash_str_repeatable)
-from monaco.case_runners import preprocess_case, run_case, postprocess_case
-from monaco.tqdm_dask_distributed import tqdm_dask
-from monaco.dvars_sensitivity import calc_sensitivities
-from monaco.mc_multi_plot import multi_plot_grid_rect
+from monaco.case_runners import preprocess_case, run_case, postprocess_case, copy_run_results
+from monaco.screening_sensitivity import calc_sensitivities_screening
+from monaco.results_store import (CaseStore, LazyCaseList, UnloadedCase, CaseWriter,
+                                   save_vars_columns, load_vars_columns, read_case_journal,
+                                   strip_case, export_var_arrays, import_var_arrays,
+                                   EXPORT_FORMATS, dump_data, load_data, dumps_data,
+                                   cases_to_ranges, ranges_to_cases)
+from monaco.result_cache import ResultCache, hash_fcns, case_cache_key
+from concurrent.futures import ThreadPoolExecutor
+from monaco.covariance_statistics import (calc_comoments, comoments_to_cov_corr,
+                                          calc_rank_corrcoeffs)
 
 
 class Sim:
@@ -62,20 +75,70 @@ class Sim:
     keepsimrawoutput : bool, default: True
         Whether to keep the simrawoutput for each case after postprocessing.
     savesimdata : bool, default: True
-        Whether to save the simulation data to disk as a .mcsim file.
+        Whether to save the simulation data to disk, see `simstorage`.
     savecasedata : bool, default: True
         Whether to save the full output data for each case to disk as .mccase
         files.
     resultsdir : str | pathlib.Path
         The directory to save simulation and case data to. If None, then this
         defaults to a directory named {name}_results.
+    casestorage : monaco.mc_enums.CaseStorage, default: 'files'
+        How to save the case data if savecasedata is True. See
+        `monaco.mc_enums.CaseStorage`.
+    lazyloadcases : bool, default: False
+        Whether the case data is loaded from disk only when each case is first
+        accessed, rather than all at once when the sim is loaded.
+    cacheresults : bool, default: False
+        Whether to cache the siminput and simrawoutput of each case on disk,
+        keyed by the preprocess and run functions, the case's invals, the
+        constvals, and the case seed. Cases with a cached result skip
+        preprocessing and running in later sim runs. Only use this if the
+        preprocess and run functions are deterministic given those inputs.
+        See `monaco.result_cache.ResultCache`.
+    cachedir : str | pathlib.Path, default: None
+        The directory for the result cache. If None, then this defaults to a
+        directory named {name}_cache in the resultsdir. Sims can share a cache
+        directory.
+    cachemaxbytes : int, default: 2**30
+        The maximum size of the result cache. The least recently used entries
+        are evicted at the end of each sim run.
+    compression : monaco.mc_enums.Compression, default: 'none'
+        The codec to compress the .mcsim and case data files with. Files are
+        read back with the right codec automatically, see `load_sim`.
+    simstorage : monaco.mc_enums.SimStorage, default: 'pickle'
+        How to save the sim data if savesimdata is True. See
+        `monaco.mc_enums.SimStorage`.
+    dedupcases : bool, default: False
+        Whether to preprocess and run only one case out of each group of
+        cases with identical invals, and share its results with the rest of
+        the group before postprocessing. This helps when all the invars are
+        discrete. Only use this if the preprocess and run functions are
+        deterministic and do not depend on the case seed or number.
 
     Attributes
     ----------
     rootdir : pathlib.Path
         The directory the simulation was run in.
     filepath : pathlib.Path
-        The filepath to the simulation .mcsim datafile.
+        The filepath to the simulation .mcsim datafile, or the .mcmanifest
+        file if simstorage is 'manifest'.
+    objectspath : pathlib.Path
+        The filepath to the .mcobjects file, if simstorage is 'manifest'.
+    casestorepath : pathlib.Path
+        The filepath to the .mccases datafile, if casestorage is 'store'.
+    varsfilepath : pathlib.Path
+        The filepath to the .mcvars datafile, if casestorage is 'store'.
+    casestore : monaco.results_store.CaseStore
+        The open case store, if casestorage is 'store'.
+    journalpath : pathlib.Path
+        The filepath to the .mcjournal file listing the cases saved so far.
+    resultcache : monaco.result_cache.ResultCache
+        The result cache, if cacheresults is True.
+    duplicatecases : dict[int, int]
+        For the last run with dedupcases, maps each case number which reused
+        another case's results to the case number which was run.
+    casewriter : monaco.results_store.CaseWriter
+        The background thread saving cases while the sim is running.
     invarseeds : list[int]
         The random seeds for each of the input variables.
     outvarseeds : list[int]
@@ -116,6 +179,14 @@ class Sim:
         The covariance matrix between all of the scalar variables.
     covvarlist : list[str]
         The names of all the scalar variables.
+    dataversion : int
+        A counter which is incremented whenever the variables change, used to
+        invalidate cached calculations. Editing a variable's nums in place
+        should be followed by incrementing it.
+    covcache : dict[str, Any]
+        The cached comoments and rank correlations for the scalar variables,
+        along with the dataversion, number of cases, and nums lists they were
+        calculated from.
     runsimid : int
         The unique ID for a particular run of this simulation.
     ncases : int
@@ -137,6 +208,14 @@ class Sim:
                  savesimdata       : bool = False,
                  savecasedata      : bool = False,
                  resultsdir        : str | pathlib.Path | None = None,
+                 casestorage       : CaseStorage = CaseStorage.FILES,
+                 lazyloadcases     : bool = False,
+                 cacheresults      : bool = False,
+                 cachedir          : str | pathlib.Path | None = None,
+                 cachemaxbytes     : int = 2**30,
+                 compression       : Compression = Compression.NONE,
+                 dedupcases        : bool = False,
+                 simstorage        : SimStorage = SimStorage.PICKLE,
                  ) -> None:
 
         self.checkFcnsInput(fcns)
@@ -155,6 +234,10 @@ class Sim:
         self.keepsimrawoutput = keepsimrawoutput
         self.savesimdata = savesimdata
         self.savecasedata = savecasedata
+        self.casestorage = casestorage
+        self.lazyloadcases = lazyloadcases
+        self.compression = compression
+        self.simstorage = simstorage
 
         self.rootdir = pathlib.Path.cwd()
         if isinstance(resultsdir, str):
@@ -164,7 +247,26 @@ class Sim:
         else:
             self.resultsdir = self.rootdir / f'{self.name}_results'
         if self.savesimdata:
-            self.filepath = self.resultsdir / f'{self.name}.mcsim'
+            if self.simstorage == SimStorage.MANIFEST:
+                self.filepath = self.resultsdir / f'{self.name}.mcmanifest'
+            else:
+                self.filepath = self.resultsdir / f'{self.name}.mcsim'
+        self.objectspath = self.resultsdir / f'{self.name}.mcobjects'
+        self.manifeststate : dict[str, Any] = dict()
+        self.casestorepath = self.resultsdir / f'{self.name}.mccases'
+        self.varsfilepath = self.resultsdir / f'{self.name}.mcvars'
+        self.casestore : CaseStore | None = None
+        self.journalpath = self.resultsdir / f'{self.name}.mcjournal'
+        self.casewriter : CaseWriter | None = None
+
+        self.cacheresults = cacheresults
+        self.resultcache : ResultCache | None = None
+        if self.cacheresults:
+            if cachedir is None:
+                cachedir = self.resultsdir / f'{self.name}_cache'
+            self.resultcache = ResultCache(cachedir=cachedir, maxbytes=cachemaxbytes)
+        self.dedupcases = dedupcases
+        self.duplicatecases : dict[int, int] = dict()
 
         self.invarseeds  : list[int] = []
         self.outvarseeds : list[int] = []
@@ -190,6 +292,8 @@ class Sim:
         self.corrcoeffs : np.ndarray | None = None
         self.covs       : np.ndarray | None = None
         self.covvarlist : list[str] | None = None
+        self.dataversion : int = 0
+        self.covcache : dict[str, Any] = dict()
 
         self.runsimid : int | None = None
 
@@ -214,6 +318,10 @@ class Sim:
         state['client'] = None  # don't save cluster to file
         state['cluster'] = None  # don't save cluster to file
         state['cases'] = []  # don't save case data when pickling self
+        state['covcache'] = dict()  # recalculated after loading
+        state['casestore'] = None  # reopen the case store after loading
+        state['casewriter'] = None
+        state['manifeststate'] = dict()
         return state
 
 
@@ -222,6 +330,20 @@ class Sim:
                      ) -> None:
         """Function to unpickle self when loading from file."""
         self.__dict__.update(state)
+        # Fill in attributes missing from sims saved by older versions
+        defaults = dict(casestorage=CaseStorage.FILES,
+                        casestorepath=self.resultsdir / f'{self.name}.mccases',
+                        varsfilepath=self.resultsdir / f'{self.name}.mcvars',
+                        journalpath=self.resultsdir / f'{self.name}.mcjournal',
+                        casestore=None, casewriter=None, lazyloadcases=False,
+                        cacheresults=False, resultcache=None,
+                        dedupcases=False, duplicatecases=dict(),
+                        compression=Compression.NONE, simstorage=SimStorage.PICKLE,
+                        objectspath=self.resultsdir / f'{self.name}.mcobjects',
+                        manifeststate=dict())
+        for attr, default in defaults.items():
+            if attr not in state:
+                setattr(self, attr, default)
         if self.savecasedata:
             self.loadCases()
         if not self.singlethreaded:
@@ -276,6 +398,7 @@ class Sim:
         Initialize the dask distributed client.
         """
         if not self.singlethreaded:
+            from dask.distributed import Client
             self.client = Client(**self.daskkwargs)
             self.cluster = self.client.cluster
 
@@ -331,6 +454,7 @@ class Sim:
                       datasource=datasource)
         self.invars[name] = invar
         self.vars[name] = invar
+        self.dataversion += 1
 
 
     def addConstVal(self,
@@ -378,6 +502,7 @@ class Sim:
             for invar in self.invars.values():
                 if invar.datasource is None:
                     invar.draw(ninvar_max=self.ninvars)
+            self.dataversion += 1
             vprint(self.verbose, 'Done', flush=True)
 
 
@@ -403,7 +528,13 @@ class Sim:
         """
         Run the full sim, but only the cases which previously failed to
         preprocess, run, or postprocess.
+
+        If savecasedata is True, the cases which were saved to disk before an
+        interrupted run are first picked up from the journal of saved cases.
         """
+        if self.savecasedata:
+            self.resumeFromJournal()
+
         allcases = self.allCases()
         casestopreprocess  = allcases - self.casespreprocessed
         casestorun         = allcases - self.casesrun           | casestopreprocess
@@ -449,10 +580,13 @@ class Sim:
         """
         self.starttime = datetime.now()
 
-        if set(casestorun) in (None, self.allCases()):
+        rerunall = set(casestorun) in (None, self.allCases())
+        if rerunall:
             self.clearResults()  # only clear results if we are rerunning all cases
 
         self.runsimid = self.genID()
+        if self.resultcache is not None:
+            self.resultcache.resetStats()
 
         if self.savesimdata or self.savecasedata:
             if not os.path.exists(self.resultsdir):
@@ -460,21 +594,42 @@ class Sim:
             if self.savesimdata:
                 self.saveSimToFile()
 
-        self.drawVars()
-        self.genCases(cases=casestogenerate)
-        self.executeAllFcns(casestopreprocess=casestopreprocess,
-                            casestorun=casestorun,
-                            casestopostprocess=casestopostprocess,
-                            calledfromrunsim=True)
+        if self.savecasedata:
+            if rerunall:
+                self.journalpath.unlink(missing_ok=True)
+                if self.casestorage == CaseStorage.STORE:
+                    self.caseStore().clear()
+            self.casewriter = CaseWriter(save=self.saveCase, journalpath=self.journalpath)
+
+        try:
+            self.drawVars()
+            self.genCases(cases=casestogenerate)
+            self.executeAllFcns(casestopreprocess=casestopreprocess,
+                                casestorun=casestorun,
+                                casestopostprocess=casestopostprocess,
+                                calledfromrunsim=True)
+        finally:
+            if self.casewriter is not None:
+                casewriter, self.casewriter = self.casewriter, None
+                casewriter.close()
+                if self.casestorage == CaseStorage.STORE:
+                    self.caseStore().writeIndex()
+                vprint(self.verbose, f'{casewriter.nsaved} cases saved to ' +
+                                     f"'{self.resultsdir}'", flush=True)
         self.genOutVars()
 
         self.endtime = datetime.now()
         self.runtime = self.endtime - self.starttime
 
         vprint(self.verbose, f'Simulation complete! Runtime: {self.runtime}', flush=True)
+        if self.resultcache is not None:
+            self.resultcache.evict()
+            vprint(self.verbose, f'Result cache: {self.resultcache.hits} hits, ' +
+                                 f'{self.resultcache.misses} misses, ' +
+                                 f'{self.resultcache.nevicted} entries evicted', flush=True)
 
-        if self.savecasedata:
-            self.saveCasesToFile()
+        if self.savecasedata and self.casestorage == CaseStorage.STORE:
+            self.saveVarsToFile()
 
         if self.savesimdata:
             self.saveSimToFile()
@@ -519,6 +674,11 @@ class Sim:
             self.cases = []
 
         cases_downselect = self.downselectCases(cases)
+        if isinstance(self.cases, LazyCaseList):
+            self.cases.drop(cases_downselect)
+        else:
+            self.cases = [case for case in self.cases
+                          if case is not None and case.ncase not in cases_downselect]
         for ncase in cases_downselect:
             ismedian = False
             if self.firstcaseismedian and ncase == 0:
@@ -560,11 +720,37 @@ class Sim:
             Whether this was called from self.runSim(). If False, a new ID for
             this simulation run is generated.
         """
+        cachekeys : dict[int, str] = dict()
+        if self.resultcache is not None:
+            # Cases with cached results skip straight to postprocessing
+            casestorun = self.downselectCases(cases=casestorun)
+            cachedcases, cachekeys = self.applyCachedResults(cases=casestorun)
+            casestopreprocess = self.downselectCases(cases=casestopreprocess) - cachedcases
+            casestorun = casestorun - cachedcases
+
+        duplicatecases : dict[int, int] = dict()
+        if self.dedupcases:
+            # Only the first case with each set of invals is run
+            casestorun = self.downselectCases(cases=casestorun)
+            duplicatecases = self.findDuplicateCases(cases=casestorun)
+            casestopreprocess = self.downselectCases(cases=casestopreprocess) \
+                                - duplicatecases.keys()
+            casestorun = casestorun - duplicatecases.keys()
+
         if self.singlethreaded:
             self.preProcessCases(cases=casestopreprocess)
-            self.runCases(cases=casestorun, calledfromrunsim=calledfromrunsim)
+            self.runCases(cases=casestorun, calledfromrunsim=calledfromrunsim,
+                          cachekeys=cachekeys)
+            for ncase, nsourcecase in duplicatecases.items():
+                case = copy_run_results(self.cases[ncase], self.cases[nsourcecase])
+                self.cases[ncase] = case
+                if case.haspreprocessed:
+                    self.casespreprocessed.add(ncase)
+                if case.hasrun:
+                    self.casesrun.add(ncase)
             self.postProcessCases(cases=casestopostprocess)
         else:
+            from dask.distributed import as_completed
             casestopreprocess_downselect = self.downselectCases(cases=casestopreprocess)
             casestorun_downselect = self.downselectCases(cases=casestorun)
             casestopostprocess_downselect = self.downselectCases(cases=casestopostprocess)
@@ -594,11 +780,17 @@ class Sim:
                             case_to_delay = preprocessedcases[case.ncase]
                         caserun_delayed = dask.delayed(run_case)(
                             self.fcns[SimFunctions.RUN], case_to_delay,
-                            self.debug, self.verbose, self.runsimid)
+                            self.debug, self.verbose, self.runsimid,
+                            self.resultcache, cachekeys.get(case.ncase))
                         runcases[case.ncase] = caserun_delayed
 
+                    if case.ncase in duplicatecases:
+                        nsourcecase = duplicatecases[case.ncase]
+                        sourcecase = runcases.get(nsourcecase, self.cases[nsourcecase])
+                        runcases[case.ncase] = dask.delayed(copy_run_results)(case, sourcecase)
+
                     if case.ncase in casestopostprocess_downselect:
-                        if case.hasrun:
+                        if case.hasrun and case.ncase not in duplicatecases:
                             case_to_delay = case
                         else:
                             case_to_delay = runcases[case.ncase]
@@ -607,17 +799,30 @@ class Sim:
                             self.debug, self.verbose)
                         postprocessedcases[case.ncase] = casepostprocessed_delayed
 
-                if self.verbose:
-                    x = dask.persist(*postprocessedcases.values())
+                if self.casewriter is not None:
+                    # Save each case as soon as it finishes
+                    futures = self.client.compute(list(postprocessedcases.values()))
+                    if self.verbose:
+                        pbar = tqdm(total=len(futures),
+                                    desc='Preprocessing, running, and postprocessing cases',
+                                    unit=' cases', position=0)
+                    fullyexecutedcases = []
+                    for future in as_completed(futures):
+                        case = future.result()
+                        self.persistCase(case)
+                        fullyexecutedcases.append(case)
+                        if self.verbose:
+                            pbar.update(1)
+                    if self.verbose:
+                        pbar.refresh()
+                        pbar.close()
+                else:
                     n_tasks = (len(casestopreprocess_downselect)
                                + len(casestorun_downselect)
                                + len(casestopostprocess_downselect))
-                    tqdm_dask(x, total=n_tasks,
-                              desc='Preprocessing, running, and postprocessing cases',
-                              unit=' cases', position=0)
-                    fullyexecutedcases = dask.compute(*x)
-                else:
-                    fullyexecutedcases = dask.compute(*postprocessedcases.values())
+                    fullyexecutedcases = compute_delayed(
+                        list(postprocessedcases.values()), self.verbose, total=n_tasks,
+                        desc='Preprocessing, running, and postprocessing cases', unit=' cases')
 
             except KeyboardInterrupt:
                 raise
@@ -634,6 +839,129 @@ class Sim:
                     self.casespostprocessed.add(case.ncase)
 
 
+    def findDuplicateCases(self,
+                           cases : None | int | Iterable[int] = None,
+                           ) -> dict[int, int]:
+        """
+        Find the cases whose invals are identical to those of an earlier case,
+        and report the reduction in the number of cases to run.
+
+        Parameters
+        ----------
+        cases : None | int | Iterable[int]
+            The case numbers to search. If None, then all cases.
+
+        Returns
+        -------
+        duplicatecases : dict[int, int]
+            Maps each duplicate case number to the number of the first case
+            with the same invals. Also saved to self.duplicatecases.
+        """
+        cases_downselect = self.downselectCases(cases=cases)
+        invarnames = sorted(self.invars.keys())
+        firstcases : dict[tuple, int] = dict()
+        duplicatecases : dict[int, int] = dict()
+        for case in self.cases:
+            if case.ncase not in cases_downselect:
+                continue
+            key = tuple(case.invals[name].num.item() for name in invarnames)
+            if key in firstcases:
+                duplicatecases[case.ncase] = firstcases[key]
+            else:
+                firstcases[key] = case.ncase
+
+        self.duplicatecases = duplicatecases
+        if len(cases_downselect) > 0:
+            vprint(self.verbose, f'Deduplicated {len(cases_downselect)} cases to ' +
+                                 f'{len(firstcases)} unique sets of invals, ' +
+                                 f'{len(duplicatecases)/len(cases_downselect)*100:0.1f}% ' +
+                                 'fewer cases to run', flush=True)
+        return duplicatecases
+
+
+    def genCacheKeys(self,
+                     cases : None | int | Iterable[int] = None,
+                     ) -> dict[int, str]:
+        """
+        Generate the result cache keys for the cases. See
+        `monaco.result_cache.case_cache_key`.
+
+        Parameters
+        ----------
+        cases : None | int | Iterable[int]
+            The case numbers to generate keys for. If None, then all cases.
+
+        Returns
+        -------
+        cachekeys : dict[int, str]
+            The cache key for each case. Cases whose inputs cannot be hashed
+            are left out, and are not cached.
+        """
+        if self.resultcache is None:
+            return dict()
+
+        try:
+            fcnsdigest = hash_fcns([self.fcns[SimFunctions.PREPROCESS],
+                                    self.fcns[SimFunctions.RUN]])
+        except Exception:
+            vwarn(self.verbose, 'Could not hash the sim functions, not caching results.')
+            return dict()
+
+        cases_downselect = self.downselectCases(cases=cases)
+        cachekeys = dict()
+        for case in self.cases:
+            if case.ncase in cases_downselect:
+                key = case_cache_key(case, fcnsdigest)
+                if key is not None:
+                    cachekeys[case.ncase] = key
+        return cachekeys
+
+
+    def applyCachedResults(self,
+                           cases : None | int | Iterable[int] = None,
+                           ) -> tuple[set[int], dict[int, str]]:
+        """
+        Look up the cases in the result cache, and fill in the siminput and
+        simrawoutput for those with cached results so that they only need to
+        be postprocessed.
+
+        Parameters
+        ----------
+        cases : None | int | Iterable[int]
+            The case numbers to look up. If None, then all cases.
+
+        Returns
+        -------
+        cachedcases : set[int]
+            The case numbers which had cached results.
+        cachekeys : dict[int, str]
+            The cache keys for the cases which did not, to store their results
+            under once they run.
+        """
+        cachekeys = self.genCacheKeys(cases=cases)
+        cachedcases = set()
+        for case in self.cases:
+            if case.ncase not in cachekeys:
+                continue
+            cached = self.resultcache.get(cachekeys[case.ncase])
+            if cached is None:
+                continue
+            siminput, simrawoutput = cached
+            case.siminput = siminput if self.keepsiminput else ()
+            case.simrawoutput = simrawoutput
+            case.starttime = case.endtime = datetime.now()
+            case.runtime = timedelta(0)
+            case.runsimid = self.runsimid
+            case.haspreprocessed = True
+            case.hasrun = True
+            case.haspostprocessed = False
+            self.casespreprocessed.add(case.ncase)
+            self.casesrun.add(case.ncase)
+            cachedcases.add(case.ncase)
+            del cachekeys[case.ncase]
+        return cachedcases, cachekeys
+
+
     def preProcessCases(self,
                         cases : None | int | Iterable[int] = None,
                         ) -> None:
@@ -677,14 +1005,9 @@ class Sim:
                             self.debug, self.verbose)
                         preprocessedcases.append(case_delayed)
 
-                if self.verbose:
-                    x = dask.persist(preprocessedcases)
-                    tqdm_dask(x, total=len(cases_downselect),
-                              desc='Preprocessing cases',
-                              unit=' cases', position=0)
-                    preprocessedcases = dask.compute(*x)[0]
-                else:
-                    preprocessedcases = dask.compute(*preprocessedcases)
+                preprocessedcases = compute_delayed(preprocessedcases, self.verbose,
+                                                    total=len(cases_downselect),
+                                                    desc='Preprocessing cases', unit=' cases')
 
             except KeyboardInterrupt:
                 raise
@@ -699,6 +1022,7 @@ class Sim:
     def runCases(self,
                  cases            : None | int | Iterable[int] = None,
                  calledfromrunsim : bool = False,
+                 cachekeys        : Optional[dict[int, str]] = None,
                  ) -> None:
         """
         Run all the Monte Carlo cases.
@@ -710,9 +1034,14 @@ class Sim:
         calledfromrunsim : bool, default: False
             Whether this was called from self.runSim(). If False, a new ID for
             this simulation run is generated.
+        cachekeys : dict[int, str], default: None
+            The result cache keys for the cases, if already generated. If None
+            and the result cache is on, they are generated here.
         """
         cases_downselect = self.downselectCases(cases=cases)
         runcases = []
+        if cachekeys is None:
+            cachekeys = self.genCacheKeys(cases=cases_downselect)
 
         if not calledfromrunsim:
             self.runsimid = self.genID()
@@ -726,7 +1055,8 @@ class Sim:
                 if case.ncase in cases_downselect:
                     case.hasrun = False
                     case = run_case(self.fcns[SimFunctions.RUN], case,
-                                    self.debug, self.verbose, self.runsimid)
+                                    self.debug, self.verbose, self.runsimid,
+                                    self.resultcache, cachekeys.get(case.ncase))
                     runcases.append(case)
                     if self.verbose:
                         pbar.update(1)
@@ -742,17 +1072,12 @@ class Sim:
                         case.hasrun = False
                         case_delayed = dask.delayed(run_case)(
                             self.fcns[SimFunctions.RUN], case,
-                            self.debug, self.verbose, self.runsimid)
+                            self.debug, self.verbose, self.runsimid,
+                            self.resultcache, cachekeys.get(case.ncase))
                         runcases.append(case_delayed)
 
-                if self.verbose:
-                    x = dask.persist(runcases)
-                    tqdm_dask(x, total=len(cases_downselect),
-                              desc='Running cases',
-                              unit=' cases', position=0)
-                    runcases = dask.compute(*x)[0]
-                else:
-                    runcases = dask.compute(*runcases)
+                runcases = compute_delayed(runcases, self.verbose, total=len(cases_downselect),
+                                           desc='Running cases', unit=' cases')
 
             except KeyboardInterrupt:
                 raise
@@ -789,6 +1114,7 @@ class Sim:
                     case.haspostprocessed = False
                     case = postprocess_case(self.fcns[SimFunctions.POSTPROCESS],
                                             case, self.debug, self.verbose)
+                    self.persistCase(case)
                     postprocessedcases.append(case)
                     if self.verbose:
                         pbar.update(1)
@@ -807,14 +1133,11 @@ class Sim:
                             self.debug, self.verbose)
                         postprocessedcases.append(case_delayed)
 
-                if self.verbose:
-                    x = dask.persist(postprocessedcases)
-                    tqdm_dask(x, total=len(cases_downselect),
-                              desc='Postprocessing cases',
-                              unit=' cases', position=0)
-                    postprocessedcases = dask.compute(*x)[0]
-                else:
-                    postprocessedcases = dask.compute(*postprocessedcases)
+                postprocessedcases = compute_delayed(postprocessedcases, self.verbose,
+                                                     total=len(cases_downselect),
+                                                     desc='Postprocessing cases', unit=' cases')
+                for case in postprocessedcases:
+                    self.persistCase(case)
 
             except KeyboardInterrupt:
                 raise
@@ -875,6 +1198,7 @@ class Sim:
                 self.cases[i].outvars[varname] = outvar
 
         self.noutvars = len(self.outvars)
+        self.dataversion += 1
 
 
     def scalarOutVars(self) -> dict[str, OutVar]:
@@ -891,13 +1215,24 @@ class Sim:
 
 
     def calcSensitivities(self,
-                          outvarnames : None | str | Iterable[str] = None,
-                          tol         : float = 1e-6,
-                          verbose     : bool = False,
+                          outvarnames   : None | str | Iterable[str] = None,
+                          tol           : float = 1e-6,
+                          sparse        : bool | None = None,
+                          approximation : SensitivityApproximation = SensitivityApproximation.NONE,
+                          nsamples      : int = 1000,
+                          nrepeats      : int = 1,
+                          ninducing     : int = 256,
+                          warmstart     : bool = False,
+                          method        : SensitivityMethod = SensitivityMethod.DVARS,
+                          verbose       : bool = False,
                           ) -> None:
         """
         Calculate the sensitivity indices for the specified outvars.
 
+        The input variable states are collected once and shared by all the
+        outvars. If not singlethreaded, the outvars are calculated in parallel
+        on the dask cluster.
+
         Parameters
         ----------
         outvarnames : None | str | Iterable[str] (default: None)
@@ -906,6 +1241,28 @@ class Sim:
         tol : float, default 1e-6
             The convergence tolerance for scipy's minimize function acting on the
             negative log likelihood function.
+        sparse : bool | None, default None
+            Whether to use a sparse representation of the correlation matrix.
+            If None, this is chosen automatically based on how many of the
+            correlations are nonzero. See `monaco.dvars_sensitivity.calc_L`.
+        approximation : monaco.mc_enums.SensitivityApproximation, default: 'none'
+            The approximation to use for sims with many cases. See
+            `monaco.mc_enums.SensitivityApproximation` for the tradeoffs.
+        nsamples : int, default: 1000
+            The number of cases to fit on for the 'subsample' approximation.
+        nrepeats : int, default: 1
+            The number of times to repeat an approximate calculation. If
+            greater than 1, the averaged sensitivities are saved along with
+            their standard deviations.
+        ninducing : int, default: 256
+            The number of inducing points for the 'nystrom' approximation.
+        warmstart : bool, default: False
+            Whether to start the hyperparameter fit from the values learned in
+            a previous calculation for each outvar, if there was one.
+        method : monaco.mc_enums.SensitivityMethod, default: 'dvars'
+            The sensitivity method to use. The methods other than 'dvars' are
+            cheap estimates from the existing cases, and ignore the D-VARS
+            specific parameters above. See `monaco.mc_enums.SensitivityMethod`.
         verbose : bool, default False
             Whether to print diagnostic information.
         """
@@ -913,39 +1270,126 @@ class Sim:
             outvarnames = list(self.scalarOutVars().keys())
         outvarnames = get_list(outvarnames)
 
+        scalaroutvarnames = []
         for outvarname in outvarnames:
             if not self.outvars[outvarname].isscalar:
                 vwarn(self.verbose, f"Output variable '{outvarname}' is not scalar," +
                                      'skipping sensitivity calculations.')
             else:
-                vprint(self.verbose, f"Calculating sensitivity indices for '{outvarname}'...")
-                sensitivities, ratios = calc_sensitivities(self, outvarname,
-                                                           tol=tol, verbose=verbose)
+                scalaroutvarnames.append(outvarname)
+        if scalaroutvarnames == []:
+            return
+
+        # The input states are shared by all the output variables
+        from monaco.dvars_sensitivity import calc_sensitivities_states, invar_states
+        X = invar_states(self)
+        invarnames = list(self.invars.keys())
+
+        if method != SensitivityMethod.DVARS:
+            for outvarname in scalaroutvarnames:
+                outvar = self.outvars[outvarname]
+                Y = np.array(outvar.nums, dtype=float).reshape(-1, 1)
+                sensitivities, ratios = calc_sensitivities_screening(X, Y, method)
+                outvar.sensitivity_indices = dict(zip(invarnames, sensitivities))
+                outvar.sensitivity_ratios = dict(zip(invarnames, ratios))
+                outvar.sensitivity_indices_std = None
+                outvar.sensitivity_ratios_std = None
+                outvar.sensitivity_method = SensitivityMethod(method)
+            vprint(self.verbose, "Done calculating sensitivity indices.")
+            return
+
+        phi0s = dict()
+        for outvarname in scalaroutvarnames:
+            phi0s[outvarname] = None
+            phi_prev = self.outvars[outvarname].sensitivity_phi
+            if warmstart and phi_prev is not None and list(phi_prev.keys()) == list(self.invars):
+                phi0s[outvarname] = np.array(list(phi_prev.values()))
+
+        def states_kwargs(outvarname):
+            outvar = self.outvars[outvarname]
+            Y = np.array(outvar.nums, dtype=float).reshape(-1, 1)
+            return dict(Y=Y, seed=outvar.seed, tol=tol, sparse=sparse,
+                        approximation=approximation, nsamples=nsamples,
+                        nrepeats=nrepeats, ninducing=ninducing,
+                        phi0=phi0s[outvarname], verbose=verbose)
 
-                sensitivities_dict = dict()
-                ratios_dict = dict()
-                for i, name in enumerate(self.invars.keys()):
-                    sensitivities_dict[name] = sensitivities[i]
-                    ratios_dict[name] = ratios[i]
+        # Single-threaded for loop
+        if self.singlethreaded:
+            results = []
+            if self.verbose:
+                pbar = tqdm(total=len(scalaroutvarnames), desc='Calculating sensitivities',
+                            unit=' outvars', position=0)
+            for outvarname in scalaroutvarnames:
+                results.append(calc_sensitivities_states(X, **states_kwargs(outvarname)))
+                if self.verbose:
+                    pbar.update(1)
+            if self.verbose:
+                pbar.refresh()
+                pbar.close()
+
+        # Dask parallel processing
+        else:
+            try:
+                X_delayed = dask.delayed(X)
+                results_delayed = []
+                for outvarname in scalaroutvarnames:
+                    results_delayed.append(dask.delayed(calc_sensitivities_states)(
+                        X_delayed, **states_kwargs(outvarname)))
 
-                self.outvars[outvarname].sensitivity_indices = sensitivities_dict
-                self.outvars[outvarname].sensitivity_ratios = ratios_dict
-                vprint(self.verbose, "Done calculating sensitivity indices.")
+                results = compute_delayed(results_delayed, self.verbose,
+                                          total=len(scalaroutvarnames),
+                                          desc='Calculating sensitivities', unit=' outvars')
 
+            except KeyboardInterrupt:
+                raise
 
-    def genCovarianceMatrix(self) -> None:
+        # Save out results
+        for outvarname, result in zip(scalaroutvarnames, results):
+            sensitivities, ratios, sensitivities_std, ratios_std, phi_opt = result
+            outvar = self.outvars[outvarname]
+            outvar.sensitivity_indices = dict(zip(invarnames, sensitivities))
+            outvar.sensitivity_ratios = dict(zip(invarnames, ratios))
+            outvar.sensitivity_phi = dict(zip(invarnames, phi_opt))
+            outvar.sensitivity_method = SensitivityMethod.DVARS
+            outvar.sensitivity_indices_std = None
+            outvar.sensitivity_ratios_std = None
+            if sensitivities_std is not None:
+                outvar.sensitivity_indices_std = dict(zip(invarnames, sensitivities_std))
+                outvar.sensitivity_ratios_std = dict(zip(invarnames, ratios_std))
+        vprint(self.verbose, "Done calculating sensitivity indices.")
+
+
+    def genCovarianceMatrix(self,
+                            chunksize : int = 10000,
+                            ) -> None:
         """
         Generate the covariance matrix and correlation coefficients between all
         the scalar variables.
-        """
-        self.covvarlist = []
-        allnums = []
-        for var in self.vars.keys():
-            if self.vars[var].isscalar:
-                allnums.append(self.vars[var].nums)
-                self.covvarlist.append(self.vars[var].name)
-        self.covs = np.cov(np.array(allnums))
-        self.corrcoeffs = np.corrcoef(np.array(allnums))
+
+        The results are cached until the variables change, which is detected
+        from the dataversion, the number of cases, and the identity of each
+        variable's nums list.
+
+        Parameters
+        ----------
+        chunksize : int, default: 10000
+            The number of cases to process at once, which bounds the size of
+            the temporary arrays for sims with many variables.
+        """
+        cache = self.covcache
+        covvarlist = self.scalarVarList()
+        numslists = [var.nums for var in self.vars.values() if var.isscalar]
+        if (cache.get('version') == self.dataversion and cache.get('covvarlist') == covvarlist
+                and cache['n'] == self.ncases
+                and all(a is b for a, b in zip(cache['numslists'], numslists))):
+            return
+
+        _, data = self.scalarVarData()
+        n, mean, M2 = calc_comoments(data, chunksize=chunksize)
+        self.covcache = dict(version=self.dataversion, covvarlist=covvarlist,
+                             numslists=numslists, n=n, mean=mean, M2=M2)
+        self.covvarlist = covvarlist
+        self.covs, self.corrcoeffs = comoments_to_cov_corr(n, M2)
 
         for i, coeff in enumerate(self.corrcoeffs[0]):
             if np.isnan(coeff):
@@ -954,10 +1398,48 @@ class Sim:
                                     "does not vary, or if an infinite value was drawn.")
 
 
-    def corr(self) -> tuple[np.ndarray, list[str]]:
+    def scalarVarList(self) -> list[str]:
+        """
+        List the names of all the scalar variables.
+
+        Returns
+        -------
+        covvarlist : list[str]
+            The names of all the scalar input and output variables.
+        """
+        return [var.name for var in self.vars.values() if var.isscalar]
+
+
+    def scalarVarData(self) -> tuple[list[str], np.ndarray]:
+        """
+        Collect the nums of all the scalar variables into one array.
+
+        Returns
+        -------
+        (covvarlist, data) : (list[str], numpy.ndarray)
+            covvarlist is a list of all the scalar input and output variables.
+            data is the nums of those variables, with one row per case and one
+            column per variable.
+        """
+        covvarlist = self.scalarVarList()
+        allnums = [var.nums for var in self.vars.values() if var.isscalar]
+        data = np.array(allnums, dtype=float).reshape(len(covvarlist), -1).T
+        return covvarlist, data
+
+
+    def corr(self,
+             method : CorrelationMethod = CorrelationMethod.PEARSON,
+             ) -> tuple[np.ndarray, list[str]]:
         """
         Generate a correlation matrix between all the scalar variables.
 
+        Parameters
+        ----------
+        method : monaco.mc_enums.CorrelationMethod, default: 'pearson'
+            The correlation coefficient to calculate. Either 'pearson' for
+            linear correlation, or 'spearman' or 'kendall' for rank
+            correlation.
+
         Returns
         -------
         (corcoeffs, covvarlist) : (numpy.ndarray, list[str])
@@ -966,7 +1448,15 @@ class Sim:
             covvarlist is a list of all the scalar input and output variables.
         """
         self.genCovarianceMatrix()
-        return self.corrcoeffs, self.covvarlist
+        if method == CorrelationMethod.PEARSON:
+            return self.corrcoeffs, self.covvarlist
+
+        method = CorrelationMethod(method)
+        if method not in self.covcache:
+            # The data is gathered on demand rather than kept in the cache
+            _, data = self.scalarVarData()
+            self.covcache[method] = calc_rank_corrcoeffs(data, method)
+        return self.covcache[method], self.covvarlist
 
 
     def cov(self) -> tuple[np.ndarray, list[str]]:
@@ -1050,6 +1540,7 @@ class Sim:
             elif isinstance(scalarvar, OutVar) and scalarvar.isscalar:
                 scalaroutvars.append(scalarvar)
 
+        from monaco.mc_multi_plot import multi_plot_grid_rect
         fig, axs = multi_plot_grid_rect(varsx=invars,
                                         varsy=scalaroutvars,
                                         cases=cases, highlight_cases=highlight_cases,
@@ -1060,6 +1551,60 @@ class Sim:
         return fig, axs
 
 
+    def renderReport(self,
+                     outdir  : str | pathlib.Path | None = None,
+                     plots   : Iterable[ReportPlot] = tuple(ReportPlot),
+                     formats : Iterable[str] = ('png',),
+                     workers : int | None    = None,
+                     dpi     : float         = 100,
+                     force   : bool          = False,
+                     ) -> dict[str, Any]:
+        """
+        Render a report of figures for all the variables to image files, in
+        parallel processes with the non-interactive Agg backend. Figures whose
+        data has not changed since the last render are skipped. See
+        `monaco.plot_report.render_report`.
+
+        Parameters
+        ----------
+        outdir : str | pathlib.Path, default: None
+            The directory to write the report to. If None, uses
+            `resultsdir/{name}_report`.
+        plots : Iterable[monaco.ReportPlot], default: all
+            The kinds of figures to render: 'hist', 'cdf', 'grid', 'line', and
+            'sensitivities'.
+        formats : Iterable[str], default: ('png',)
+            The file formats to save each figure as, 'png' and/or 'svg'.
+        workers : int, default: None
+            The number of processes to render with. If 0, renders in this
+            process. If None, renders in this process if the sim is
+            singlethreaded, and otherwise with one process per CPU.
+        dpi : float, default: 100
+            The resolution of raster formats.
+        force : bool, default: False
+            Whether to rerender every figure, even if unchanged.
+
+        Returns
+        -------
+        index : dict[str, Any]
+            The report index, which is also saved to 'index.json' in `outdir`.
+        """
+        if outdir is None:
+            outdir = self.resultsdir / f'{self.name}_report'
+        if workers is None and self.singlethreaded:
+            workers = 0
+
+        vprint(self.verbose, f"Rendering plot report to '{outdir}'...", flush=True)
+        from monaco.plot_report import render_report
+        index = render_report(invars=self.invars, outvars=self.outvars, outdir=outdir,
+                              plots=plots, formats=formats, workers=workers, dpi=dpi,
+                              force=force, title=self.name, verbose=self.verbose)
+        nunchanged = len(index['figures']) - len(index['rendered'])
+        vprint(self.verbose, f"Rendered {len(index['rendered'])} figures, " +
+                             f"{nunchanged} unchanged", flush=True)
+        return index
+
+
     def clearResults(self) -> None:
         """Clear all the simulation results."""
         for varname in self.outvars.keys():
@@ -1070,9 +1615,10 @@ class Sim:
         self.casespreprocessed = set()
         self.casesrun = set()
         self.casespostprocessed = set()
-        self.corrcoeff = None
-        self.covcoeff = None
+        self.corrcoeffs = None
+        self.covs = None
         self.covvarlist = None
+        self.dataversion += 1
         self.endtime = None
         self.runtime = None
         self.runsimid = self.genID()
@@ -1128,8 +1674,9 @@ class Sim:
 
 
     def exportVars(self,
-                   vars : dict[str, InVar | OutVar],
-                   filename : Optional[str | pathlib.Path],
+                   vars      : dict[str, InVar | OutVar],
+                   filename  : Optional[str | pathlib.Path],
+                   chunksize : int = 10000,
                    ) -> pathlib.Path:
         """
         Export the nums for the selected to file for use externally.
@@ -1153,13 +1700,21 @@ class Sim:
                 ...
             }
 
+        The binary formats are '.npy' for a structured array with one field
+        per var, '.npz' for one array per var, and '.parquet' for one column
+        per var (requires pyarrow). These are much faster to write and read
+        for large sims, and can all be read back in with
+        `monaco.Sim.importVars`. See `monaco.results_store.export_var_arrays`.
+
         Parameters
         ----------
         vars : dict[str, InVar | OutVar]
             The vars to save to file. Will export the nums, not the vals.
         filename : Optional[str | pathlib.Path]
-            The file to save to. Must be a csv or json.
+            The file to save to. Must be a csv, json, npy, npz, or parquet.
             If a str, then will save in the resultsdir.
+        chunksize : int, default: 10000
+            The number of cases to format at once when writing a csv.
 
         Returns
         -------
@@ -1174,35 +1729,13 @@ class Sim:
         elif isinstance(filename, pathlib.Path):
             filepath = filename
 
-        if filepath.suffix.lower() not in ('.csv', '.json'):
-            raise ValueError(f"'{filename}' must be a .csv or .json file.")
+        if filepath.suffix.lower() not in EXPORT_FORMATS:
+            raise ValueError(f"'{filename}' must be one of {EXPORT_FORMATS} files.")
         if filepath.exists():
             vwarn(self.verbose, f'{filepath.name} already exists, overwriting.')
 
-        if filepath.suffix.lower() == '.csv':
-            varnames = list(vars.keys())
-            for i, var in enumerate(vars.values()):
-                if i == 0:
-                    data_csv = np.array(var.nums)
-                else:
-                    data_csv = np.vstack([data_csv, np.array(var.nums)])
-
-            with open(filepath, 'w', newline='') as f:
-                writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
-                writer.writerow(varnames)
-                for i in range(self.ncases):
-                    if len(data_csv.shape) == 1:
-                        writer.writerow((data_csv[i], ))
-                    else:
-                        writer.writerow(data_csv[:, i])
-
-        elif filepath.suffix.lower() == '.json':
-            data_json = dict()
-            for varname, var in vars.items():
-                data_json[varname] = np.array(var.nums).tolist()
-
-            with open(filepath, 'w', newline='') as f:
-                json.dump(data_json, f, indent=0)
+        arrays = {varname: np.asarray(var.nums) for varname, var in vars.items()}
+        export_var_arrays(filepath, arrays, chunksize=chunksize)
 
         return filepath
 
@@ -1217,7 +1750,7 @@ class Sim:
         Parameters
         ----------
         filename : Optional[str | pathlib.Path]
-            The file to save to. Must be a csv or json.
+            The file to save to. Must be a csv, json, npy, npz, or parquet.
             If a str, then will save in the resultsdir.
             If None, then will save to '{self.name}_invarnums.json'.
         """
@@ -1241,7 +1774,7 @@ class Sim:
         Parameters
         ----------
         filename : Optional[str | pathlib.Path]
-            The file to save to. Must be a csv or json.
+            The file to save to. Must be a csv, json, npy, npz, or parquet.
             If a str, then will save in the resultsdir.
             If None, then will save to '{self.name}_outvarnums.json'.
         """
@@ -1257,7 +1790,8 @@ class Sim:
 
     def importVars(self,
                    filepath : str | pathlib.Path,
-                   ) -> tuple[dict[str, list[Any]], pathlib.Path]:
+                   mmap     : bool = True,
+                   ) -> tuple[dict[str, np.ndarray | list[Any]], pathlib.Path]:
         """
         Import values from an external file.
 
@@ -1280,42 +1814,37 @@ class Sim:
                 ...
             }
 
+        The binary '.npy', '.npz', and '.parquet' formats written by
+        `monaco.Sim.exportVars` can also be loaded. All formats are read a
+        column at a time, see `monaco.results_store.import_var_arrays`.
+
         Parameters
         ----------
         filepath : str | pathlib.Path
-            The file to load from. Must be a csv or json.
+            The file to load from. Must be a csv, json, npy, npz, or parquet.
+        mmap : bool, default: True
+            Whether to memory-map '.npy' files rather than reading them into
+            memory.
 
         Returns
         -------
-        data : dict[str, Any]
+        data : dict[str, numpy.ndarray | list[Any]]
             A dictionary where the keys are the variable name and the values
-            are a list of the vals.
+            are an array of the vals, or a list of the vals if they are not
+            numeric.
         filepath : pathlib.Path
             The full filepath for the file which was loaded from.
         """
         if isinstance(filepath, str):
             filepath = pathlib.Path(filepath)
 
-        if filepath.suffix.lower() not in ('.csv', '.json'):
-            raise ValueError(f"'{filepath.name}' must be a .csv or .json file.")
+        if filepath.suffix.lower() not in EXPORT_FORMATS:
+            raise ValueError(f"'{filepath.name}' must be one of {EXPORT_FORMATS} files.")
 
         if self.cases == []:
             self.genCases()
 
-        data : dict[str, list] = dict()
-        if filepath.suffix.lower() == '.csv':
-            with open(filepath, 'r') as f:
-                reader = csv.reader(f, quoting=csv.QUOTE_NONNUMERIC)
-                headers = next(reader)
-                for outvalname in headers:
-                    data[outvalname] = []
-                for row in reader:
-                    for outvalname, vals in zip(headers, row):
-                        data[outvalname].append(vals)
-
-        elif filepath.suffix.lower() == '.json':
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+        data = import_var_arrays(filepath, mmap=mmap)
 
         for vals_list in data.values():
             if len(vals_list) != self.ncases:
@@ -1339,7 +1868,7 @@ class Sim:
         Parameters
         ----------
         filepath : str | pathlib.Path
-            The file to load from. Must be a csv or json.
+            The file to load from. Must be a csv, json, npy, npz, or parquet.
         dists : list[rv_discrete | rv_continuous], default: None
             A list of the distribution that was used for the draws. Needed if
             it is desired to plot the analytical distribution or run a DVARS
@@ -1388,15 +1917,14 @@ class Sim:
 
             self.addInVar(name=valname, dist=dists[i], distkwargs=distskwargs[i], nummap=nummaps[i],
                           seed=None, datasource=str(filepath.resolve()))
-            nums = [np.array(num) for num in nums]
-            self.invars[valname].nums = nums
+            self.invars[valname].nums = ColumnView(np.array(nums))
             self.invars[valname].pcts = pcts
             self.invars[valname].mapNums()
 
             for case in self.cases:
                 case.invars[valname] = self.invars[valname]
                 case.invals[valname] = self.invars[valname].getVal(case.ncase)
-
+        self.dataversion += 1
 
         vprint(self.verbose, f"InVals loaded from '{filepath.name}' and converted to variables",
                flush=True)
@@ -1407,13 +1935,16 @@ class Sim:
                       nummaps  : Optional[list[dict[float, Any]]] = None,
                       ) -> None:
         """
-        Import results from an external file as OutVals, convert to OutVars.
+        Import results from an external file as OutVars. Each numeric OutVar
+        keeps its column of data as the storage for its nums and vals, see
+        `monaco.mc_var.ColumnView`, and each case's OutVals for it are
+        generated the first time that case's outvals are accessed.
         See `monaco.Sim.importVars` docstring for csv and json formatting.
 
         Parameters
         ----------
         filepath : str | pathlib.Path
-            The file to load from. Must be a csv or json.
+            The file to load from. Must be a csv, json, npy, npz, or parquet.
         nummaps : list[dict[float, Any]], default: None
             A list of nummap dicts mapping numbers to nonnumeric values. Note
             that this is reversed from providing valmaps to OutVals.
@@ -1437,23 +1968,60 @@ class Sim:
             nummaps = [None for _ in range(len(data))]
             valmaps = [None for _ in range(len(data))]
 
+        datasource = str(filepath.resolve())
+        newoutvars = []
         for i, (valname, nums) in enumerate(data.items()):
+            if valname in self.invars.keys():
+                raise ValueError(f"'{valname}' is already a Variable")
             if nummaps[i] is None:
                 vals = nums
             else:
-                vals = [nummaps[i][num] for num in nums]
-            for case in self.cases:
-                case.addOutVal(valname, vals[case.ncase], valmap=valmaps[i])
+                vals = [nummaps[i][num] for num in np.asarray(nums).tolist()]
+
+            columns = {valname: vals}
+            # Split multidimensional values along their outermost dimension,
+            # the same as Case.addOutVal does
+            if len(vals) > 0 and np.ndim(vals[0]) > 1:
+                for j in range(np.shape(vals[0])[0]):
+                    if isinstance(vals, np.ndarray):
+                        columns[valname + f' [{j}]'] = vals[:, j]
+                    else:
+                        columns[valname + f' [{j}]'] = [val[j] for val in vals]
+
+            for name, column in columns.items():
+                # seed is dependent on the order added, used for bootstrapping
+                seed = (self.seed - 1 - len(self.outvarseeds)) % 2**32
+                self.outvarseeds.append(seed)
+
+                # Build each outvar straight from its column of data, rather
+                # than going through an OutVal for every case
+                outvar = OutVar(name=name, vals=column, valmap=valmaps[i],
+                                ndraws=self.ndraws, seed=seed,
+                                firstcaseismedian=self.firstcaseismedian,
+                                datasource=datasource)
+                self.outvars[name] = outvar
+                self.vars[name] = outvar
+                newoutvars.append(outvar)
+
+        for case in self.cases:
+            case.addLazyOutVals(newoutvars)
 
-        self.genOutVars(datasource=str(filepath.resolve()))
+        self.noutvars = len(self.outvars)
+        self.dataversion += 1
 
         vprint(self.verbose, f"OutVals loaded from '{filepath.name}' and converted to variables",
                flush=True)
 
 
     def saveSimToFile(self) -> None:
-        """Save the simulation to a .mcsim file"""
-        if self.savesimdata:
+        """
+        Save the simulation to a .mcsim file, or to a manifest if simstorage
+        is 'manifest'.
+        """
+        if self.savesimdata and self.simstorage == SimStorage.MANIFEST:
+            self.saveManifest()
+
+        elif self.savesimdata:
             vprint(self.verbose, 'Saving sim results to file...', flush=True)
 
             try:
@@ -1462,11 +2030,126 @@ class Sim:
                 pass
             self.filepath.touch()
             with open(self.filepath, 'wb') as file:
-                cloudpickle.dump(self, file)
+                dump_data(self, file, compression=self.compression)
 
             vprint(self.verbose, f"Sim results saved in '{self.filepath}'", flush=True)
 
 
+    def saveManifest(self) -> None:
+        """
+        Save the simulation as a JSON .mcmanifest file with the configuration,
+        seeds, and case status, along with the var arrays in the .mcvars file
+        and the python objects which JSON can't hold in the .mcobjects file.
+
+        Only the files whose contents changed since the last save are
+        rewritten, and each is written to a temporary file and then renamed.
+        The caseseeds are regenerated from the seed on load rather than saved.
+        Derived results such as varstats, sensitivities, and covariance
+        matrices are not saved. See `load_sim`.
+        """
+        vprint(self.verbose, 'Saving sim manifest to file...', flush=True)
+        if not os.path.exists(self.resultsdir):
+            os.makedirs(self.resultsdir)
+
+        # Only rewrite the bulk var data if it changed
+        if self.manifeststate.get('dataversion') != self.dataversion \
+           or not self.varsfilepath.exists():
+            save_vars_columns(self.varsfilepath, self.vars)
+            self.manifeststate['dataversion'] = self.dataversion
+            self.manifeststate['varcolumns'] = set(load_vars_columns(self.varsfilepath).keys())
+        varcolumns = self.manifeststate['varcolumns']
+
+        objects : dict[str, Any] = dict(
+            fcns=self.fcns, constvals=self.constvals, daskkwargs=self.daskkwargs,
+            invars={name: dict(dist=invar.dist, distkwargs=invar.distkwargs,
+                               nummap=invar.nummap)
+                    for name, invar in self.invars.items()},
+            outvars={name: dict(valmap=outvar.valmap,
+                                vals=None if self.outVarIsColumnar(outvar, varcolumns)
+                                else outvar.vals)
+                     for name, outvar in self.outvars.items()},
+        )
+        objectsdata = dumps_data(objects, compression=self.compression)
+        objectsdigest = hashlib.blake2b(objectsdata, digest_size=20).hexdigest()
+        if self.manifeststate.get('objectsdigest') != objectsdigest \
+           or not self.objectspath.exists():
+            tmppath = self.objectspath.with_name(self.objectspath.name + '.tmp')
+            with open(tmppath, 'wb') as file:
+                file.write(objectsdata)
+            os.replace(tmppath, self.objectspath)
+            self.manifeststate['objectsdigest'] = objectsdigest
+
+        config = dict(
+            name=self.name, ndraws=self.ndraws, firstcaseismedian=self.firstcaseismedian,
+            samplemethod=self.samplemethod, seed=int(self.seed),
+            singlethreaded=self.singlethreaded, verbose=self.verbose, debug=self.debug,
+            keepsiminput=self.keepsiminput, keepsimrawoutput=self.keepsimrawoutput,
+            savesimdata=self.savesimdata, savecasedata=self.savecasedata,
+            resultsdir=str(self.resultsdir), casestorage=self.casestorage,
+            lazyloadcases=self.lazyloadcases, cacheresults=self.cacheresults,
+            compression=self.compression, dedupcases=self.dedupcases,
+            simstorage=self.simstorage,
+        )
+        if self.resultcache is not None:
+            config['cachedir'] = str(self.resultcache.cachedir)
+            config['cachemaxbytes'] = self.resultcache.maxbytes
+
+        def isotime(time : datetime | None) -> str | None:
+            return None if time is None else time.isoformat()
+
+        manifest = dict(
+            version=1,
+            monacoversion=metadata.version('monaco'),
+            config=config,
+            rootdir=str(self.rootdir),
+            runsimid=self.runsimid,
+            inittime=isotime(self.inittime),
+            starttime=isotime(self.starttime),
+            endtime=isotime(self.endtime),
+            runtime=None if self.runtime is None else self.runtime.total_seconds(),
+            invarseeds=[int(seed) for seed in self.invarseeds],
+            outvarseeds=[int(seed) for seed in self.outvarseeds],
+            casespreprocessed=cases_to_ranges(self.casespreprocessed),
+            casesrun=cases_to_ranges(self.casesrun),
+            casespostprocessed=cases_to_ranges(self.casespostprocessed),
+            invars=[dict(name=name, seed=int(invar.seed), datasource=invar.datasource)
+                    for name, invar in self.invars.items()],
+            outvars=[dict(name=name, seed=int(outvar.seed), datasource=outvar.datasource)
+                     for name, outvar in self.outvars.items()],
+            varsfile=self.varsfilepath.name,
+            objectsfile=self.objectspath.name,
+        )
+        tmppath = self.filepath.with_name(self.filepath.name + '.tmp')
+        with open(tmppath, 'w') as file:
+            json.dump(manifest, file, indent=1)
+        os.replace(tmppath, self.filepath)
+
+        vprint(self.verbose, f"Sim manifest saved in '{self.filepath}'", flush=True)
+
+
+    def outVarIsColumnar(self,
+                         outvar     : OutVar,
+                         varcolumns : set[str],
+                         ) -> bool:
+        """
+        Check whether an outvar's vals can be rebuilt from its column in the
+        .mcvars file, which needs numeric vals without a valmap.
+
+        Parameters
+        ----------
+        outvar : monaco.mc_var.OutVar
+            The output variable.
+        varcolumns : set[str]
+            The names of the variables saved in the .mcvars file.
+
+        Returns
+        -------
+        iscolumnar : bool
+            Whether the vals can be rebuilt from the nums column.
+        """
+        return outvar.valmap is None and outvar.name in varcolumns
+
+
     def saveCasesToFile(self,
                         cases : None | int | Iterable[int] = None,
                         ) -> None:
@@ -1480,74 +2163,248 @@ class Sim:
         """
         cases_downselect = self.downselectCases(cases=cases)
 
-        if self.savecasedata:
+        if self.savecasedata and self.casestorage == CaseStorage.STORE:
+            vprint(self.verbose, 'Saving cases to file...', flush=True)
+
+            store = self.caseStore()
+            if set(store.ncases()) <= cases_downselect:
+                store.clear()  # start fresh rather than appending if replacing all the cases
+            for ncase in sorted(cases_downselect):
+                self.cases[ncase].filepath = self.casestorepath
+                store.append(self.cases[ncase])
+            store.writeIndex()
+
+            vprint(self.verbose, f"Raw case results saved in '{self.casestorepath}'",
+                   flush=True)
+
+        elif self.savecasedata:
             vprint(self.verbose, 'Saving cases to file...', flush=True)
 
             for ncase in cases_downselect:
-                filepath = self.resultsdir / f'{self.name}_{ncase}.mccase'
-                self.cases[ncase].filepath = filepath
-                try:
-                    filepath.unlink()
-                except FileNotFoundError:
-                    pass
-                with open(filepath, 'wb') as file:
-                    cloudpickle.dump(self.cases[ncase], file)
+                self.cases[ncase].filepath = self.resultsdir / self.caseFileName(ncase)
+                self.saveCase(self.cases[ncase])
 
             vprint(self.verbose, f"Raw case results saved in '{self.resultsdir}'",
                    flush=True)
 
 
-    def loadCases(self) -> None:
-        """Load the data for cases from file."""
+    def saveCase(self,
+                 case : Case,
+                 ) -> None:
+        """
+        Save a single case to file. The case's references to the sim's
+        variables are not saved, and are restored by `loadCase`.
+
+        With 'files' casestorage, the case is written to a temporary file
+        which is then renamed over the .mccase file, so an interrupted write
+        never leaves a corrupt file behind. With 'store' casestorage, the case
+        is appended to the .mccases store.
+
+        Parameters
+        ----------
+        case : monaco.mc_case.Case
+            The case to save.
+        """
+        if self.casestorage == CaseStorage.STORE:
+            self.caseStore().append(case)
+        else:
+            filepath = self.resultsdir / self.caseFileName(case.ncase)
+            tmppath = filepath.with_name(filepath.name + '.tmp')
+            with open(tmppath, 'wb') as file:
+                dump_data(strip_case(case), file, compression=self.compression)
+            os.replace(tmppath, filepath)
+
+
+    def persistCase(self,
+                    case : Case,
+                    ) -> None:
+        """
+        Hand a finished case to the background case writer, if the sim is
+        saving cases while running.
+
+        Parameters
+        ----------
+        case : monaco.mc_case.Case
+            The finished case.
+        """
+        if self.casewriter is not None:
+            if self.casestorage == CaseStorage.STORE:
+                case.filepath = self.casestorepath
+            else:
+                case.filepath = self.resultsdir / self.caseFileName(case.ncase)
+            self.casewriter.put(case)
+
+
+    def resumeFromJournal(self) -> None:
+        """
+        Pick up the cases listed in the journal of saved cases which are not
+        already in the sim, such as after a crash partway through a run. The
+        journal records whether each case was preprocessed, run, and
+        postprocessed, so the cases themselves are only checked to exist on
+        disk, and are loaded when they are first accessed.
+        """
+        journal = read_case_journal(self.journalpath)
+        if journal == dict():
+            return
+
+        if not isinstance(self.cases, LazyCaseList):
+            self.cases = LazyCaseList(self.cases, loader=self.loadCase)
+        present = set(self.cases.ncases())
+
+        nresumed = 0
+        for ncase, (_, haspreprocessed, hasrun, haspostprocessed) in sorted(journal.items()):
+            if ncase in present or ncase >= self.ncases or not self.caseOnDisk(ncase):
+                continue
+            self.cases.append(UnloadedCase(ncase))
+            nresumed += 1
+            if haspreprocessed:
+                self.casespreprocessed.add(ncase)
+            if hasrun:
+                self.casesrun.add(ncase)
+            if haspostprocessed:
+                self.casespostprocessed.add(ncase)
+        self.cases.sort(key=lambda case: case.ncase)
+        vprint(self.verbose, f'Resumed {nresumed} saved cases from ' +
+                             f"'{self.journalpath.name}'", flush=True)
+
+
+    def saveVarsToFile(self) -> None:
+        """
+        Save the nums and pcts of all the variables to a columnar .mcvars
+        file, which can be loaded with `loadVarArrays` without loading any of
+        the case data.
+        """
+        vprint(self.verbose, 'Saving vars to file...', flush=True)
+        save_vars_columns(self.varsfilepath, self.vars)
+        vprint(self.verbose, f"Vars saved in '{self.varsfilepath}'", flush=True)
+
+
+    def loadVarArrays(self,
+                      mmap : bool = True,
+                      ) -> dict[str, dict[str, Any]]:
+        """
+        Load the arrays of var data saved in the .mcvars file.
+
+        Parameters
+        ----------
+        mmap : bool, default: True
+            Whether to memory-map the arrays rather than reading them into
+            memory.
+
+        Returns
+        -------
+        vararrays : dict[str, dict[str, Any]]
+            For each variable name, a dict with its 'vartype' and its 'nums'
+            and 'pcts' arrays. See `monaco.results_store.load_vars_columns`.
+        """
+        return load_vars_columns(self.varsfilepath, mmap=mmap)
+
+
+    def loadCases(self,
+                  lazy          : bool | None = None,
+                  nthreads      : int | None = None,
+                  excludefields : Iterable[str] | None = None,
+                  ) -> None:
+        """
+        Load the data for cases from file.
+
+        Parameters
+        ----------
+        lazy : bool, default: None
+            Whether to only load each case when it is first accessed in
+            `sim.cases`. Lazy loading only checks that each case is on disk,
+            so cases which did not finish running or are stale are not warned
+            about until they are used. If None, uses `sim.lazyloadcases`.
+        nthreads : int, default: None
+            The number of threads to load cases with. If None, uses the
+            `concurrent.futures.ThreadPoolExecutor` default.
+        excludefields : Iterable[str], default: None
+            Case attributes to drop after loading to save memory, for example
+            `['siminput', 'simrawoutput']`. These are set to None.
+        """
+        if lazy is None:
+            lazy = self.lazyloadcases
         vprint(self.verbose, f'{self.filepath} indicates {len(self.casesrun)}/{self.ncases} ' +
                               'cases were run, attempting to load raw case data from disk...',
                              end='\n', flush=True)
         self.cases = []
+        self.casestore = None  # reread the store's index
         casesloaded = set()
         casesstale  = set()
         casesnotloaded        = self.allCases()
         casesnotpostprocessed = self.allCases()
+        excludefields = get_list(excludefields)
+
+        def load_case(ncase):
+            case = self.loadCase(ncase)
+            for field in excludefields:
+                setattr(case, field, None)
+            return case
+
+        if lazy:
+            self.cases = LazyCaseList(loader=load_case)
+            for ncase in sorted(self.casesrun):
+                if not self.caseOnDisk(ncase):
+                    vwarn(self.verbose, f'{self.caseFileName(ncase)} expected but not found')
+                    continue
+                self.cases.append(UnloadedCase(ncase))
+                casesloaded.add(ncase)
+                casesnotloaded.remove(ncase)
+                if ncase in self.casespostprocessed:
+                    casesnotpostprocessed.remove(ncase)
 
-        # pbar = tqdm(total=len(self.casesrun), unit=' cases', desc='Loading', position=0)
-
-        for ncase in self.casesrun:
-            filepath = self.resultsdir / f'{self.name}_{ncase}.mccase'
-            try:
-                with open(filepath, 'rb') as file:
-                    try:
-                        case = cloudpickle.load(file)
-                        if (not case.haspreprocessed) \
-                            or (not case.hasrun) \
-                            or (case.runtime is None):  # only load case if it completed running
-                            self.cases.append(None)
-                            vwarn(self.verbose, f'{filepath.name} did not finish running, ' +
-                                                 'not loaded')
-                        else:
-                            self.cases.append(case)
-
-                            if case.runsimid != self.runsimid:
-                                vwarn(self.verbose, f'{filepath.name} is not from the most ' +
-                                                     'recent run and may be stale')
-                                casesstale.add(ncase)
-                            casesloaded.add(ncase)
-                            casesnotloaded.remove(ncase)
-                            if ncase in self.casespostprocessed:
-                                casesnotpostprocessed.remove(ncase)
-
-                    except Exception:
-                        vwarn(self.verbose, f'Unknown error loading {filepath.name}')
+        else:
+            def try_load_case(ncase):
+                try:
+                    return load_case(ncase), None
+                except Exception as e:
+                    return None, e
+
+            if self.casestorage == CaseStorage.STORE:
+                self.caseStore()  # open the store before the threads share it
+            ncases = sorted(self.casesrun)
+            with ThreadPoolExecutor(max_workers=nthreads) as executor:
+                results = executor.map(try_load_case, ncases)
+                if self.verbose:
+                    results = tqdm(results, total=len(ncases), unit=' cases',
+                                   desc='Loading', position=0)
+                results = list(results)
+
+            for ncase, (case, exception) in zip(ncases, results):
+                filename = self.caseFileName(ncase)
+                if isinstance(exception, FileNotFoundError):
+                    vwarn(self.verbose, f'{filename} expected but not found')
+                    continue
+                elif exception is not None:
+                    vwarn(self.verbose, f'Unknown error loading {filename}')
+                    continue
+
+                if (not case.haspreprocessed) \
+                    or (not case.hasrun) \
+                    or (case.runtime is None):  # only load case if it completed running
+                    self.cases.append(None)
+                    vwarn(self.verbose, f'{filename} did not finish running, not loaded')
+                else:
+                    self.cases.append(case)
 
-            except FileNotFoundError:
-                vwarn(self.verbose, f'{filepath.name} expected but not found')
-            # pbar.update(1)
+                    if case.runsimid != self.runsimid:
+                        vwarn(self.verbose, f'{filename} is not from the most ' +
+                                             'recent run and may be stale')
+                        casesstale.add(ncase)
+                    casesloaded.add(ncase)
+                    casesnotloaded.remove(ncase)
+                    if ncase in self.casespostprocessed:
+                        casesnotpostprocessed.remove(ncase)
 
         self.casespreprocessed  = set(casesloaded)
         self.casesrun           = set(casesloaded)
         self.casespostprocessed = set(casesloaded) - casesnotpostprocessed
-        # pbar.refresh()
-        # pbar.close()
-        vprint(self.verbose, f'\nData for {len(casesloaded)}/{self.ncases} cases loaded from disk',
-               flush=True)
+        if lazy:
+            vprint(self.verbose, f'\nData for {len(casesloaded)}/{self.ncases} cases found ' +
+                                  'on disk, to be loaded on first access', flush=True)
+        else:
+            vprint(self.verbose, f'\nData for {len(casesloaded)}/{self.ncases} cases loaded ' +
+                                  'from disk', flush=True)
 
         if casesnotloaded != set():
             vwarn(self.verbose, 'The following cases were not loaded: ' +
@@ -1566,6 +2423,97 @@ class Sim:
                                f'up: [{", ".join([str(i) for i in sorted(extrafiles)])}]')
 
 
+    def loadCase(self,
+                 ncase : int,
+                 ) -> Case:
+        """
+        Load the data for a single case from file.
+
+        Parameters
+        ----------
+        ncase : int
+            The case number to load.
+
+        Returns
+        -------
+        case : monaco.mc_case.Case
+            The loaded case.
+        """
+        if self.casestorage == CaseStorage.STORE:
+            store = self.caseStore()
+            if ncase not in store:
+                raise FileNotFoundError(self.caseFileName(ncase))
+            case = store.load(ncase)
+            case.invars = self.invars
+            case.outvars = dict(self.outvars)
+        else:
+            filepath = self.resultsdir / self.caseFileName(ncase)
+            with open(filepath, 'rb') as file:
+                case = load_data(file)
+            if case.invars == dict():
+                case.invars = self.invars
+                case.outvars = dict(self.outvars)
+        return case
+
+
+    def caseOnDisk(self,
+                   ncase : int,
+                   ) -> bool:
+        """
+        Check whether the data for a case has been saved to file, without
+        loading it.
+
+        Parameters
+        ----------
+        ncase : int
+            The case number.
+
+        Returns
+        -------
+        ondisk : bool
+            Whether the case data is on disk.
+        """
+        if self.casestorage == CaseStorage.STORE:
+            return ncase in self.caseStore()
+        return (self.resultsdir / self.caseFileName(ncase)).exists()
+
+
+    def caseStore(self) -> CaseStore:
+        """
+        Get the store holding the case data, opening it if needed.
+
+        Returns
+        -------
+        casestore : monaco.results_store.CaseStore
+            The case store at casestorepath.
+        """
+        if self.casestore is None:
+            self.casestore = CaseStore(self.casestorepath, compression=self.compression)
+        return self.casestore
+
+
+    def caseFileName(self,
+                     ncase : int,
+                     ) -> str:
+        """
+        Get a name for where the data for a case is saved, for messages.
+
+        Parameters
+        ----------
+        ncase : int
+            The case number.
+
+        Returns
+        -------
+        filename : str
+            The .mccase filename, or a description of the case's location in
+            the .mccases store.
+        """
+        if self.casestorage == CaseStorage.STORE:
+            return f'Case {ncase} in {self.casestorepath.name}'
+        return f'{self.name}_{ncase}.mccase'
+
+
     def findExtraResultsFiles(self) -> set[str]:
         """
         Find .mcsim and .mccase files that we don't expect to see in the
@@ -1600,3 +2548,158 @@ class Sim:
         for file in extrafiles:
             filepath = self.resultsdir / file
             filepath.unlink()
+
+
+
+def compute_delayed(delayed : list[Any],
+                    verbose : bool,
+                    total   : int,
+                    desc    : str,
+                    unit    : str,
+                    ) -> list[Any] | tuple[Any, ...]:
+    """
+    Compute a list of dask delayed objects, showing a progress bar if
+    verbose. The progress bar needs dask.distributed, so it is only imported
+    here when first used.
+
+    Parameters
+    ----------
+    delayed : list[Any]
+        The dask delayed objects to compute.
+    verbose : bool
+        Whether to show a progress bar.
+    total : int
+        The number of tasks for the progress bar.
+    desc : str
+        The description for the progress bar.
+    unit : str
+        The unit for the progress bar.
+
+    Returns
+    -------
+    results : list[Any] | tuple[Any, ...]
+        The computed results, in the same order as `delayed`.
+    """
+    if not verbose:
+        return dask.compute(*delayed)
+    from monaco.tqdm_dask_distributed import tqdm_dask
+    x = dask.persist(delayed)
+    tqdm_dask(x, total=total, desc=desc, unit=unit, position=0)
+    return dask.compute(*x)[0]
+
+
+
+def load_sim(filepath : str | pathlib.Path) -> Sim:
+    """
+    Load a sim from a .mcsim file, whichever compression codec it was saved
+    with, or from a .mcmanifest file. If the sim saves case data, the cases
+    are loaded as well.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The .mcsim or .mcmanifest file to load.
+
+    Returns
+    -------
+    sim : monaco.mc_sim.Sim
+        The loaded sim.
+    """
+    filepath = pathlib.Path(filepath)
+    if filepath.suffix == '.mcmanifest':
+        return load_sim_manifest(filepath)
+
+    with open(filepath, 'rb') as file:
+        sim = load_data(file)
+    return sim
+
+
+def load_sim_manifest(filepath : str | pathlib.Path,
+                      mmap     : bool = True,
+                      ) -> Sim:
+    """
+    Load a sim from a .mcmanifest file saved by `monaco.Sim.saveManifest`.
+    The sim is rebuilt from its configuration, and the vars from the arrays
+    in the .mcvars file. Outvars without a valmap get float vals.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The .mcmanifest file to load.
+    mmap : bool, default: True
+        Whether to memory-map the .mcvars file rather than reading it into
+        memory.
+
+    Returns
+    -------
+    sim : monaco.mc_sim.Sim
+        The loaded sim.
+    """
+    filepath = pathlib.Path(filepath)
+    with open(filepath, 'r') as file:
+        manifest = json.load(file)
+    if manifest['version'] > 1:
+        raise ValueError(f"Manifest version {manifest['version']} is newer than the " +
+                         "supported version 1.")
+    with open(filepath.parent / manifest['objectsfile'], 'rb') as file:
+        objects = load_data(file)
+    columns = load_vars_columns(filepath.parent / manifest['varsfile'], mmap=mmap)
+
+    config = dict(manifest['config'])
+    config['resultsdir'] = filepath.parent
+    savecasedata = config.pop('savecasedata')
+    sim = Sim(fcns=objects['fcns'], daskkwargs=objects['daskkwargs'], savecasedata=False,
+              **config)
+    sim.savecasedata = savecasedata
+    sim.rootdir = pathlib.Path(manifest['rootdir'])
+    sim.constvals = objects['constvals']
+
+    for invarinfo in manifest['invars']:
+        name = invarinfo['name']
+        invarobjects = objects['invars'][name]
+        sim.addInVar(name=name, dist=invarobjects['dist'],
+                     distkwargs=invarobjects['distkwargs'], nummap=invarobjects['nummap'],
+                     seed=invarinfo['seed'], datasource=invarinfo['datasource'])
+        if name not in columns:
+            continue  # not drawn when the manifest was saved
+        invar = sim.invars[name]
+        invar.nums = list(columns[name]['nums'])
+        if 'pcts' in columns[name]:
+            invar.pcts = list(columns[name]['pcts'])
+        else:
+            invar.pcts = [None for _ in range(sim.ncases)]
+        invar.mapNums()
+
+    sim.outvarseeds = list(manifest['outvarseeds'])
+    for outvarinfo in manifest['outvars']:
+        name = outvarinfo['name']
+        outvarobjects = objects['outvars'][name]
+        vals = outvarobjects['vals']
+        if vals is None:
+            vals = np.array(columns[name]['nums'])
+        outvar = OutVar(name=name, vals=vals, valmap=outvarobjects['valmap'],
+                        ndraws=sim.ndraws, seed=outvarinfo['seed'],
+                        firstcaseismedian=sim.firstcaseismedian,
+                        datasource=outvarinfo['datasource'])
+        sim.outvars[name] = outvar
+        sim.vars[name] = outvar
+    sim.noutvars = len(sim.outvars)
+
+    def fromisotime(time : str | None) -> datetime | None:
+        return None if time is None else datetime.fromisoformat(time)
+
+    sim.runsimid = manifest['runsimid']
+    sim.inittime = fromisotime(manifest['inittime'])
+    sim.starttime = fromisotime(manifest['starttime'])
+    sim.endtime = fromisotime(manifest['endtime'])
+    if manifest['runtime'] is not None:
+        sim.runtime = timedelta(seconds=manifest['runtime'])
+    sim.casespreprocessed = ranges_to_cases(manifest['casespreprocessed'])
+    sim.casesrun = ranges_to_cases(manifest['casesrun'])
+    sim.casespostprocessed = ranges_to_cases(manifest['casespostprocessed'])
+    sim.genCaseSeeds()
+    sim.dataversion += 1
+
+    if sim.savecasedata:
+        sim.loadCases()
+    return sim
@@ -2,14 +2,10 @@
 from __future__ import annotations
 
 import numpy as np
-from monaco.helper_functions import is_num, hashable_val, flatten
+from monaco.helper_functions import is_num, hashable_val, flatten, loaded_module
 from typing import Any
 from scipy.stats import rv_discrete, rv_continuous
 from abc import ABC
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
 
 
 ### Val Base Class ###
@@ -192,6 +188,7 @@ class OutVal(Val):
         If the output value is a pandas dataseries or index, convert it to a
         format we understand.
         """
+        pd = loaded_module('pandas')
         if pd:
             if isinstance(self.val, pd.Series) or isinstance(self.val, pd.Index):
                 self.val = self.val.values
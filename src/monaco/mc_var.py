@@ -1,23 +1,84 @@
 # mc_var.py
 from __future__ import annotations
 
+# matplotlib is only imported when plotting
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from matplotlib.axes import Axes
+
 import numpy as np
 from scipy.stats import rv_continuous, rv_discrete, describe
 from scipy.stats.stats import DescribeResult
-from matplotlib.figure import Figure
-from matplotlib.axes import Axes
 from monaco.mc_val import Val, InVal, OutVal
 from monaco.mc_varstat import VarStat
-from monaco.mc_enums import SampleMethod, Sensitivities, VarStatType, InVarSpace
+from monaco.mc_enums import (SampleMethod, Sensitivities, VarStatType, InVarSpace,
+                              SensitivityMethod)
 from monaco.mc_sampling import sampling
-from monaco.mc_plot import plot, plot_sensitivities
-from monaco.helper_functions import empty_list, hashable_val
+from monaco.helper_functions import empty_list, hashable_val, is_numeric_array
 from copy import copy
 from typing import Any, Callable, Iterable, Optional
+from collections.abc import Sequence
 from warnings import warn
 from abc import ABC, abstractmethod
 
 
+### Column View ###
+class ColumnView(Sequence):
+    """
+    A read-only list of the rows of an array, used for the nums and vals of
+    variables built from a column of data. The array is kept as the storage
+    rather than an object per case, each row is only converted when it is
+    accessed, and `numpy.asarray` returns the array without a copy.
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        The data, with one row per case.
+    tolist : bool, default: False
+        Whether each row is returned as Python values with `tolist`, as for
+        vals, rather than as a numpy array, as for nums.
+    """
+    def __init__(self,
+                 array  : np.ndarray,
+                 tolist : bool = False,
+                 ):
+        self.array = array
+        self.tolist = tolist
+
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.array!r}, tolist={self.tolist})'
+
+
+    def __len__(self) -> int:
+        return self.array.shape[0]
+
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ColumnView(self.array[i], tolist=self.tolist)
+        if self.tolist:
+            return self.array[i].tolist()
+        return self.array[i, ...]
+
+
+    def __iter__(self):
+        if self.tolist:
+            return iter(self.array.tolist())
+        return (self.array[i, ...] for i in range(len(self)))
+
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.array, dtype=dtype)
+
+
 ### Var Base Class ###
 class Var(ABC):
     """
@@ -96,6 +157,24 @@ class Var(ABC):
         self.maxdim   : int
         self.isscalar : bool
         self.varstats : list[VarStat] = empty_list()
+        self.sortedcache : dict[str, tuple[list, np.ndarray]] = dict()
+        self.histcache : dict[tuple, tuple[list, np.ndarray, np.ndarray]] = dict()
+
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['sortedcache'] = dict()  # cheap to regenerate
+        state['histcache'] = dict()
+        return state
+
+
+    def __setstate__(self, state : dict) -> None:
+        self.__dict__.update(state)
+        # Fill in attributes missing from vars saved by older versions
+        defaults = dict(sortedcache=dict(), histcache=dict())
+        for attr, default in defaults.items():
+            if attr not in state:
+                setattr(self, attr, default)
 
 
     def setFirstCaseMedian(self,
@@ -130,6 +209,42 @@ class Var(ABC):
         return stats
 
 
+    def sortedNums(self,
+                   invar_space : InVarSpace = InVarSpace.NUMS,
+                   ) -> np.ndarray:
+        """
+        Get the nums (or pcts) of a scalar variable sorted in ascending order.
+        The sorted array is cached until `nums` or `pcts` is reassigned, so
+        repeated plots of large variables only sort once. Modifying the lists
+        in place does not invalidate the cache.
+
+        Parameters
+        ----------
+        invar_space : monaco.InVarSpace, default: 'nums'
+            Whether to sort the 'nums' or, for an InVar, the 'pcts'.
+
+        Returns
+        -------
+        sortednums : numpy.ndarray
+            The sorted values. This is a shared read-only array.
+        """
+        field = 'nums'
+        if invar_space == InVarSpace.PCTS and isinstance(self, InVar):
+            field = 'pcts'
+        points = getattr(self, field)
+
+        if not hasattr(self, 'sortedcache'):
+            self.sortedcache = dict()  # loaded from an older file
+        cached = self.sortedcache.get(field)
+        if cached is not None and cached[0] is points:
+            return cached[1]
+
+        sortednums = np.sort(np.asarray(points, dtype=float).ravel())
+        sortednums.flags.writeable = False
+        self.sortedcache[field] = (points, sortednums)
+        return sortednums
+
+
     def addVarStat(self,
                    stat        : VarStatType | Callable,
                    statkwargs  : dict[str, Any] | None = None,
@@ -187,6 +302,7 @@ class Var(ABC):
         Plot this variable, against other variables if desired.
         See monaco.mc_plot.plot() for API details.
         """
+        from monaco.mc_plot import plot
         fig, ax = plot(varx=self, vary=vary, varz=varz,
                        cases=cases, highlight_cases=highlight_cases,
                        rug_plot=rug_plot, cov_plot=cov_plot, cov_p=cov_p,
@@ -293,10 +409,10 @@ class InVar(Var):
         """
         Generate `vals` based on the drawn numbers and the nummap.
         """
-        self.vals = copy(self.nums)
-        if self.nummap is not None:
-            for i in range(self.ncases):
-                self.vals[i] = self.nummap[self.nums[i].item()]
+        if self.nummap is None:
+            self.vals = copy(self.nums)
+        else:
+            self.vals = [self.nummap[num.item()] for num in self.nums]
 
 
     def genValMap(self) -> None:
@@ -447,8 +563,9 @@ class OutVar(Var):
     ----------
     name : str
         The name of this value.
-    vals : list[Any]
-        The values returned from the simulation.
+    vals : list[Any] | numpy.ndarray
+        The values returned from the simulation. A numeric array, with cases
+        along the first axis, is converted to nums directly.
     valmap : dict, default: None
         A dictionary mapping nonnumeric values to numbers.
     ndraws : int
@@ -475,6 +592,22 @@ class OutVar(Var):
         `nums == list[np.array(vals)]`.
     varstats : list[moncao.VarStat.VarStat]
         A list of all the variable statistics for this variable.
+    sensitivity_indices : dict[str, float]
+        The sensitivity indices to each of the input variables, see
+        `monaco.mc_sim.Sim.calcSensitivities`.
+    sensitivity_ratios : dict[str, float]
+        The sensitivity ratios to each of the input variables.
+    sensitivity_indices_std : dict[str, float]
+        The standard deviations of the sensitivity indices, if they were
+        calculated over repeated approximations.
+    sensitivity_ratios_std : dict[str, float]
+        The standard deviations of the sensitivity ratios, if they were
+        calculated over repeated approximations.
+    sensitivity_phi : dict[str, float]
+        The learned D-VARS covariance hyperparameters for each of the input
+        variables, which can warm start a later calculation.
+    sensitivity_method : monaco.mc_enums.SensitivityMethod
+        The method used to calculate the sensitivity indices and ratios.
     """
     def __init__(self,
                  name              : str,
@@ -495,13 +628,35 @@ class OutVar(Var):
                          datasource=datasource)
         self.vals = vals
         self.valmap = valmap
-        if valmap is None:
-            self.extractValMap()
-        self.genNumMap()
-        self.mapVals()
+        if valmap is None and is_numeric_array(vals):
+            # Numeric arrays need no valmap, so keep the array as the storage
+            # for both nums and vals rather than an OutVal per case
+            nums = np.array(vals)
+            self.vals = ColumnView(nums, tolist=True)
+            self.nums = ColumnView(nums)
+            self.genNumMap()
+        else:
+            if valmap is None:
+                self.extractValMap()
+            self.genNumMap()
+            self.mapVals()
         self.genMaxDim()
         self.sensitivity_indices : None | dict = None
         self.sensitivity_ratios  : None | dict = None
+        self.sensitivity_indices_std : None | dict = None
+        self.sensitivity_ratios_std  : None | dict = None
+        self.sensitivity_phi         : None | dict = None
+        self.sensitivity_method      : None | SensitivityMethod = None
+
+
+    def __setstate__(self, state : dict) -> None:
+        super().__setstate__(state)
+        # Fill in attributes missing from outvars saved by older versions
+        defaults = dict(sensitivity_indices_std=None, sensitivity_ratios_std=None,
+                        sensitivity_phi=None, sensitivity_method=None)
+        for attr, default in defaults.items():
+            if attr not in state:
+                setattr(self, attr, default)
 
 
     def genMaxDim(self) -> None:
@@ -509,9 +664,12 @@ class OutVar(Var):
         Parse the output values to determine the maximum dimension of each of
         their shapes.
         """
-        self.maxdim = 0
-        for num in self.nums:
-            self.maxdim = max(self.maxdim, len(num.shape))
+        if isinstance(self.nums, ColumnView):
+            self.maxdim = self.nums.array.ndim - 1
+        else:
+            self.maxdim = 0
+            for num in self.nums:
+                self.maxdim = max(self.maxdim, len(num.shape))
 
         self.isscalar = False
         if self.maxdim == 0:
@@ -634,6 +792,7 @@ class OutVar(Var):
         Plot the sensitivity indices for this variable.
         See monaco.mc_plot.plot_sensitivities() for API details.
         """
+        from monaco.mc_plot import plot_sensitivities
         fig, ax = plot_sensitivities(outvar=self, sensitivities=sensitivities,
                                      ax=ax, title=title)
         return fig, ax
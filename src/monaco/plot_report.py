@@ -0,0 +1,441 @@
+# plot_report.py
+from __future__ import annotations
+
+import os
+import re
+import copy
+import json
+import html
+import hashlib
+import pathlib
+import numpy as np
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Iterable
+from tqdm import tqdm
+from monaco.mc_var import InVar, OutVar
+from monaco.mc_enums import ReportPlot
+from monaco.results_store import save_vars_columns, load_vars_columns
+
+REPORT_INDEX = 'index.json'
+REPORT_HTML = 'index.html'
+REPORT_VARS = 'report.mcvars'
+REPORT_VERSION = 1
+REPORT_FORMATS = ('png', 'svg')
+
+
+def strip_var(var : InVar | OutVar,
+              columnar : bool,
+              ) -> InVar | OutVar:
+    """
+    Make a lightweight copy of a variable to send to a rendering process,
+    without its per-case data if that can be read from the memory-mapped
+    .mcvars file instead.
+
+    Parameters
+    ----------
+    var : monaco.mc_var.InVar | monaco.mc_var.OutVar
+        The variable to copy.
+    columnar : bool
+        Whether the variable's nums and pcts are in the .mcvars file.
+
+    Returns
+    -------
+    stub : monaco.mc_var.InVar | monaco.mc_var.OutVar
+        The copied variable.
+    """
+    stub = copy.copy(var)
+    stub.vals = None
+    if columnar:
+        stub.nums = None
+        stub.pcts = None
+    stub.varstats = []
+    for varstat in var.varstats:
+        varstat = copy.copy(varstat)
+        varstat.var = None  # don't drag along the full variable
+        stub.varstats.append(varstat)
+    return stub
+
+
+def attach_columns(stub    : InVar | OutVar,
+                   columns : dict[str, dict[str, Any]],
+                   ) -> InVar | OutVar:
+    """
+    Reattach the nums and pcts of a variable stub from the .mcvars columns,
+    see `strip_var`.
+
+    Parameters
+    ----------
+    stub : monaco.mc_var.InVar | monaco.mc_var.OutVar
+        The stripped variable.
+    columns : dict[str, dict[str, Any]]
+        The columns loaded by `monaco.results_store.load_vars_columns`.
+
+    Returns
+    -------
+    var : monaco.mc_var.InVar | monaco.mc_var.OutVar
+        The variable, ready to plot.
+    """
+    if stub.nums is None:
+        column = columns[stub.name]
+        stub.nums = list(column['nums'])
+        if 'pcts' in column:
+            stub.pcts = list(column['pcts'])
+        elif isinstance(stub, InVar):
+            stub.pcts = [None for _ in range(stub.ncases)]
+    return stub
+
+
+def report_figure_specs(invars  : dict[str, InVar],
+                        outvars : dict[str, OutVar],
+                        plots   : Iterable[ReportPlot],
+                        ) -> list[dict[str, Any]]:
+    """
+    List the figures to render for a plot report. Each figure's name is used
+    for its file, and is made unique even when var names only differ in
+    characters which are not allowed in filenames, or in case.
+
+    Parameters
+    ----------
+    invars : dict[str, monaco.mc_var.InVar]
+        The sim's input variables.
+    outvars : dict[str, monaco.mc_var.OutVar]
+        The sim's output variables.
+    plots : Iterable[monaco.ReportPlot]
+        The kinds of figures to render.
+
+    Returns
+    -------
+    specs : list[dict[str, Any]]
+        For each figure, a dict with its 'name', 'kind', and 'vars'.
+    """
+    plots = [ReportPlot(plot) for plot in plots]
+    scalarvars = list(invars.values()) + [var for var in outvars.values() if var.isscalar]
+    specs = []
+    for kind in (ReportPlot.HIST, ReportPlot.CDF):
+        if kind in plots:
+            specs.extend(dict(kind=kind, vars=[var.name]) for var in scalarvars)
+    if ReportPlot.GRID in plots and invars and len(scalarvars) > len(invars):
+        specs.append(dict(kind=ReportPlot.GRID, vars=[var.name for var in scalarvars]))
+    if ReportPlot.LINE in plots:
+        specs.extend(dict(kind=ReportPlot.LINE, vars=[var.name])
+                     for var in outvars.values() if not var.isscalar)
+    if ReportPlot.SENSITIVITIES in plots:
+        specs.extend(dict(kind=ReportPlot.SENSITIVITIES, vars=[var.name])
+                     for var in outvars.values()
+                     if var.isscalar and var.sensitivity_ratios is not None)
+
+    # Var names which differ only in their special characters or case would
+    # otherwise render to the same file, so those get a hash of the var name
+    taken : set[str] = set()
+    for spec in specs:
+        if spec['kind'] == ReportPlot.GRID:
+            name = 'grid'
+        else:
+            slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', spec['vars'][0])
+            name = f"{spec['kind'].value}_{slug}"
+        if name.lower() in taken:
+            digest = hashlib.blake2b(spec['vars'][0].encode(), digest_size=4).hexdigest()
+            name = f'{name}_{digest}'
+        suffix = 1
+        unique = name
+        while unique.lower() in taken:
+            suffix += 1
+            unique = f'{name}_{suffix}'
+        spec['name'] = unique
+        taken.add(unique.lower())
+    return specs
+
+
+def hash_var(stub   : InVar | OutVar,
+             column : dict[str, Any] | None,
+             ) -> bytes:
+    """
+    Fingerprint the data a figure of a variable depends on, from its .mcvars
+    column arrays and a description of its stub. Only plain values and
+    numbers are hashed, so the fingerprint is the same in every process.
+
+    Parameters
+    ----------
+    stub : monaco.mc_var.InVar | monaco.mc_var.OutVar
+        The stripped variable, see `strip_var`.
+    column : dict[str, Any] | None
+        The variable's .mcvars column, or None if it is not columnar.
+
+    Returns
+    -------
+    digest : bytes
+        The fingerprint.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    dist = getattr(stub, 'dist', None)
+    distkwargs = getattr(stub, 'distkwargs', None) or dict()
+    description = dict(cls=type(stub).__name__,
+                       name=stub.name,
+                       ncases=stub.ncases,
+                       firstcaseismedian=stub.firstcaseismedian,
+                       dist=getattr(dist, 'name', repr(dist)),
+                       distkwargs=sorted((key, repr(val)) for key, val in distkwargs.items()),
+                       nummap=repr(stub.nummap),
+                       valmap=repr(getattr(stub, 'valmap', None)),
+                       sensitivity_method=str(getattr(stub, 'sensitivity_method', None)))
+    h.update(json.dumps(description, sort_keys=True).encode())
+
+    for field in ('sensitivity_indices', 'sensitivity_ratios',
+                  'sensitivity_indices_std', 'sensitivity_ratios_std'):
+        sensitivities = getattr(stub, field, None)
+        if sensitivities is not None:
+            h.update(field.encode())
+            h.update(json.dumps(sorted(sensitivities.keys())).encode())
+            hash_nums(h, [sensitivities[key] for key in sorted(sensitivities.keys())])
+
+    for varstat in stub.varstats:
+        h.update(f'varstat {varstat.name}'.encode())
+        for field in ('nums', 'confidence_interval_low_nums', 'confidence_interval_high_nums'):
+            hash_nums(h, getattr(varstat, field, None))
+
+    for field in ('nums', 'pcts'):
+        h.update(field.encode())
+        if column is not None and field in column:
+            hash_nums(h, column[field])
+        else:
+            hash_nums(h, getattr(stub, field))
+    return h.digest()
+
+
+def hash_nums(h    : Any,
+              nums : Any,
+              ) -> None:
+    """
+    Add numbers to a hash, including ragged lists of arrays and None.
+
+    Parameters
+    ----------
+    h : hashlib hash object
+        The hash to update.
+    nums : Any
+        The numbers to hash.
+    """
+    if nums is None:
+        h.update(b'None')
+        return
+    try:
+        nums = np.asarray(nums, dtype=float)
+    except (TypeError, ValueError):
+        h.update(f'list {len(nums)}'.encode())
+        for num in nums:
+            hash_nums(h, num)
+        return
+    h.update(repr(nums.shape).encode())
+    h.update(np.ascontiguousarray(nums).data)
+
+
+def render_report_figure(varsfilepath : str | pathlib.Path,
+                         stubs        : list[InVar | OutVar],
+                         spec         : dict[str, Any],
+                         outdir       : str | pathlib.Path,
+                         formats      : Iterable[str],
+                         dpi          : float,
+                         ) -> list[str]:
+    """
+    Render one figure of a plot report and save it to file. The variable data
+    is memory-mapped from the .mcvars file rather than sent to this process.
+
+    Parameters
+    ----------
+    varsfilepath : str | pathlib.Path
+        The .mcvars file with the variable columns.
+    stubs : list[monaco.mc_var.InVar | monaco.mc_var.OutVar]
+        The stripped variables to plot, see `strip_var`.
+    spec : dict[str, Any]
+        The figure spec, see `report_figure_specs`.
+    outdir : str | pathlib.Path
+        The directory to save the figure to.
+    formats : Iterable[str]
+        The file formats to save, for example ['png', 'svg'].
+    dpi : float
+        The resolution of raster formats.
+
+    Returns
+    -------
+    filenames : list[str]
+        The names of the files written.
+    """
+    import matplotlib.pyplot as plt
+    from monaco.mc_plot import plot, plot_hist, plot_cdf, plot_sensitivities
+    from monaco.mc_multi_plot import multi_plot_grid_rect
+
+    columns = load_vars_columns(varsfilepath, mmap=True)
+    vars = [attach_columns(stub, columns) for stub in stubs]
+    kind = spec['kind']
+    if kind == ReportPlot.HIST:
+        fig, _ = plot_hist(vars[0], title=vars[0].name)
+    elif kind == ReportPlot.CDF:
+        fig, _ = plot_cdf(vars[0], title=vars[0].name)
+    elif kind == ReportPlot.GRID:
+        invars = [var for var in vars if isinstance(var, InVar)]
+        outvars = [var for var in vars if isinstance(var, OutVar)]
+        fig, _ = multi_plot_grid_rect(varsx=invars, varsy=outvars)
+        fig.set_size_inches(2.5*(len(invars) + 1), 2.5*(len(outvars) + 1))
+    elif kind == ReportPlot.LINE:
+        fig, _ = plot(vars[0], title=vars[0].name)
+    elif kind == ReportPlot.SENSITIVITIES:
+        fig, _ = plot_sensitivities(vars[0])
+
+    filenames = []
+    for fmt in formats:
+        filename = f"{spec['name']}.{fmt}"
+        fig.savefig(pathlib.Path(outdir) / filename, format=fmt, dpi=dpi)
+        filenames.append(filename)
+    plt.close(fig)
+    return filenames
+
+
+def init_report_worker() -> None:
+    """Use the non-interactive Agg backend in report rendering processes."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_report(invars  : dict[str, InVar],
+                  outvars : dict[str, OutVar],
+                  outdir  : str | pathlib.Path,
+                  plots   : Iterable[ReportPlot] = tuple(ReportPlot),
+                  formats : Iterable[str] = ('png',),
+                  workers : int | None    = None,
+                  dpi     : float         = 100,
+                  force   : bool          = False,
+                  title   : str           = '',
+                  verbose : bool          = True,
+                  ) -> dict[str, Any]:
+    """
+    Render a report of figures for a set of variables to a directory, along
+    with an 'index.json' listing the figures and an 'index.html' showing them.
+
+    The variable arrays are saved once to a memory-mappable .mcvars file in
+    `outdir` which the rendering processes read from, so only small stripped
+    copies of the variables are pickled to each process. Each figure is
+    fingerprinted from the data it plots, and figures whose fingerprint and
+    files are unchanged since the last render are skipped.
+
+    Parameters
+    ----------
+    invars : dict[str, monaco.mc_var.InVar]
+        The input variables.
+    outvars : dict[str, monaco.mc_var.OutVar]
+        The output variables.
+    outdir : str | pathlib.Path
+        The directory to write the report to.
+    plots : Iterable[monaco.ReportPlot], default: all
+        The kinds of figures to render.
+    formats : Iterable[str], default: ('png',)
+        The file formats to save each figure as, 'png' and/or 'svg'.
+    workers : int, default: None
+        The number of processes to render with. If None, uses the number of
+        CPUs. If 0, renders in this process with the current backend.
+    dpi : float, default: 100
+        The resolution of raster formats.
+    force : bool, default: False
+        Whether to rerender every figure, even if unchanged.
+    title : str, default: ''
+        The title of the html index.
+    verbose : bool, default: True
+        Whether to show a progress bar.
+
+    Returns
+    -------
+    index : dict[str, Any]
+        The report index, as saved to 'index.json'.
+    """
+    outdir = pathlib.Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    formats = [fmt.lower() for fmt in formats]
+    for fmt in formats:
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f'{fmt=} must be one of {REPORT_FORMATS}')
+
+    vars : dict[str, InVar | OutVar] = {**invars, **outvars}
+    varsfilepath = outdir / REPORT_VARS
+    save_vars_columns(varsfilepath, vars)
+    columns = load_vars_columns(varsfilepath, mmap=True)
+    stubs = {name: strip_var(var, columnar=name in columns) for name, var in vars.items()}
+    vardigests = {name: hash_var(stub, columns.get(name)) for name, stub in stubs.items()}
+
+    oldfigures = dict()
+    indexpath = outdir / REPORT_INDEX
+    if indexpath.exists() and not force:
+        with open(indexpath, 'r') as file:
+            oldfigures = {figure['name']: figure for figure in json.load(file)['figures']}
+
+    figures = []
+    torender = []
+    for spec in report_figure_specs(invars, outvars, plots):
+        h = hashlib.blake2b(digest_size=20)
+        h.update(json.dumps([spec['kind'].value, spec['vars'], dpi]).encode())
+        for name in spec['vars']:
+            h.update(vardigests[name])
+        figure = dict(name=spec['name'], kind=spec['kind'].value, vars=spec['vars'],
+                      hash=h.hexdigest(),
+                      files=[f"{spec['name']}.{fmt}" for fmt in formats])
+        figures.append(figure)
+        old = oldfigures.get(spec['name'])
+        if old is None or old['hash'] != figure['hash'] \
+                or not all((outdir / filename).exists() for filename in figure['files']):
+            torender.append(spec)
+
+    def args(spec):
+        return (varsfilepath, [stubs[name] for name in spec['vars']], spec,
+                outdir, formats, dpi)
+
+    progress = tqdm(total=len(torender), unit=' figures', desc='Rendering',
+                    position=0, disable=not (verbose and torender))
+    if workers == 0:
+        for spec in torender:
+            render_report_figure(*args(spec))
+            progress.update(1)
+    elif torender:
+        context = multiprocessing.get_context('spawn')
+        nworkers = min(workers or os.cpu_count() or 1, len(torender))
+        with ProcessPoolExecutor(max_workers=nworkers, mp_context=context,
+                                 initializer=init_report_worker) as executor:
+            futures = [executor.submit(render_report_figure, *args(spec)) for spec in torender]
+            for future in as_completed(futures):
+                future.result()
+                progress.update(1)
+    progress.close()
+
+    index = dict(version=REPORT_VERSION, title=title, figures=figures,
+                 rendered=[spec['name'] for spec in torender])
+    write_report_index(outdir, index)
+    return index
+
+
+def write_report_index(outdir : str | pathlib.Path,
+                       index  : dict[str, Any],
+                       ) -> None:
+    """
+    Write the 'index.json' and 'index.html' files for a plot report.
+
+    Parameters
+    ----------
+    outdir : str | pathlib.Path
+        The report directory.
+    index : dict[str, Any]
+        The report index, see `render_report`.
+    """
+    outdir = pathlib.Path(outdir)
+    tmppath = outdir / (REPORT_INDEX + '.tmp')
+    with open(tmppath, 'w') as file:
+        json.dump(index, file, indent=2)
+    os.replace(tmppath, outdir / REPORT_INDEX)
+
+    title = html.escape(index['title'])
+    lines = ['<!DOCTYPE html>', '<html>', f'<head><meta charset="utf-8"><title>{title}</title>',
+             '</head>', '<body>', f'<h1>{title}</h1>']
+    for figure in index['figures']:
+        src = html.escape(figure['files'][0]) if figure['files'] else ''
+        lines.append(f"<h2>{html.escape(figure['name'])}</h2>")
+        lines.append(f'<img src="{src}" alt="{html.escape(figure["name"])}">')
+    lines.extend(['</body>', '</html>'])
+    with open(outdir / REPORT_HTML, 'w') as file:
+        file.write('\n'.join(lines) + '\n')
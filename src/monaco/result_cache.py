@@ -0,0 +1,356 @@
+# result_cache.py
+from __future__ import annotations
+
+import os
+import pickle
+import hashlib
+import pathlib
+import functools
+import threading
+import cloudpickle
+from typing import Any, Callable, Iterable
+from monaco.mc_case import Case
+
+CACHE_SUFFIX = '.mcresult'
+CACHE_PICKLE_PROTOCOL = 4  # fixed so that keys are stable across python versions
+
+
+def canonical_form(obj    : Any,
+                   active : frozenset[int] = frozenset(),
+                   ) -> Any:
+    """
+    Convert an object into an equivalent form which pickles and reprs the same
+    in every process. Set and frozenset elements are sorted, since their
+    iteration order depends on `PYTHONHASHSEED`, and functions are replaced by
+    their fingerprints, see `hash_callable`. Tuples, lists, and dicts are
+    converted recursively, and other objects are returned unchanged.
+
+    Parameters
+    ----------
+    obj : Any
+        The object to convert.
+    active : frozenset[int], default: frozenset()
+        The ids of the functions already being fingerprinted, so that
+        functions which refer to themselves through their closures are only
+        fingerprinted once.
+
+    Returns
+    -------
+    canonical : Any
+        The converted object.
+    """
+    if isinstance(obj, (set, frozenset)):
+        items = sorted((canonical_form(item, active) for item in obj), key=repr)
+        return (type(obj).__name__, tuple(items))
+    if type(obj) in (tuple, list):
+        return type(obj)(canonical_form(item, active) for item in obj)
+    if type(obj) is dict:
+        return {canonical_form(key, active): canonical_form(val, active)
+                for key, val in obj.items()}
+    if hasattr(obj, '__code__') or isinstance(obj, functools.partial):
+        if id(obj) in active:
+            return ('function', getattr(obj, '__qualname__', None))
+        return ('function', hash_callable(obj, active))
+    return obj
+
+
+def hash_code(code : Any) -> bytes:
+    """
+    Fingerprint a code object from its bytecode, constants, and names,
+    including any nested code objects such as inner functions and lambdas.
+
+    Parameters
+    ----------
+    code : types.CodeType
+        The code object to fingerprint.
+
+    Returns
+    -------
+    digest : bytes
+        The fingerprint.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            h.update(hash_code(const))
+        else:
+            h.update(repr(canonical_form(const)).encode())
+    return h.digest()
+
+
+def hash_callable(fcn    : Callable,
+                  active : frozenset[int] = frozenset(),
+                  ) -> bytes:
+    """
+    Fingerprint a function from its code, default arguments, and the values
+    captured in its closure. Functions it calls are not included, so the cache
+    should be cleared if they change.
+
+    `functools.partial` objects are fingerprinted from their function and
+    arguments, and other callables without their own code from their pickled
+    form. Set elements are sorted first, see `canonical_form`, so the
+    fingerprint does not change with `PYTHONHASHSEED`.
+
+    Parameters
+    ----------
+    fcn : Callable
+        The function to fingerprint.
+    active : frozenset[int], default: frozenset()
+        The ids of the functions already being fingerprinted, see
+        `canonical_form`.
+
+    Returns
+    -------
+    digest : bytes
+        The fingerprint.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    active = active | {id(fcn)}
+    if isinstance(fcn, functools.partial):
+        h.update(hash_callable(fcn.func, active))
+        extras : Any = (fcn.args, fcn.keywords)
+    elif hasattr(fcn, '__code__'):
+        h.update(hash_code(fcn.__code__))
+        closure = [cell.cell_contents for cell in (fcn.__closure__ or ())]
+        extras = (fcn.__defaults__, fcn.__kwdefaults__, closure)
+    else:
+        extras = (fcn, )
+    for extra in extras:
+        h.update(cloudpickle.dumps(canonical_form(extra, active),
+                                   protocol=CACHE_PICKLE_PROTOCOL))
+    return h.digest()
+
+
+def hash_fcns(fcns : Iterable[Callable]) -> bytes:
+    """
+    Combine the fingerprints of several functions, see `hash_callable`.
+
+    Parameters
+    ----------
+    fcns : Iterable[Callable]
+        The functions to fingerprint, in order.
+
+    Returns
+    -------
+    digest : bytes
+        The combined fingerprint.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    for fcn in fcns:
+        h.update(hash_callable(fcn))
+    return h.digest()
+
+
+def case_cache_key(case       : Case,
+                   fcnsdigest : bytes,
+                   ) -> str | None:
+    """
+    Generate the content-addressed cache key for a case, from the sim
+    functions, the case's invals, the constvals, and the case seed.
+
+    Parameters
+    ----------
+    case : monaco.mc_case.Case
+        The case to generate the key for.
+    fcnsdigest : bytes
+        The combined fingerprint of the sim functions, see `hash_callable`.
+
+    Returns
+    -------
+    key : str | None
+        The hex key, or None if the inputs could not be pickled, in which case
+        the case should not be cached.
+    """
+    invals = sorted((name, inval.val) for name, inval in case.invals.items())
+    constvals = sorted(case.constvals.items(), key=lambda item: item[0])
+    try:
+        inputs = cloudpickle.dumps(canonical_form((invals, constvals, int(case.seed))),
+                                   protocol=CACHE_PICKLE_PROTOCOL)
+    except Exception:
+        return None
+    h = hashlib.blake2b(fcnsdigest, digest_size=20)
+    h.update(inputs)
+    return h.hexdigest()
+
+
+class ResultCache():
+    """
+    An on-disk, content-addressed cache of case results, so that cases with
+    identical inputs are not rerun across sim runs. Each entry is a separate
+    file written atomically, so several processes can add entries at once.
+    The total size is bounded by evicting the least recently used entries.
+
+    Parameters
+    ----------
+    cachedir : str | pathlib.Path
+        The directory to store the cache entries in.
+    maxbytes : int, default: 2**30
+        The maximum total size of the cache entries. Enforced by `evict`.
+
+    Attributes
+    ----------
+    hits : int
+        The number of lookups which found an entry.
+    misses : int
+        The number of lookups which did not find an entry.
+    nevicted : int
+        The number of entries evicted.
+    """
+    def __init__(self,
+                 cachedir : str | pathlib.Path,
+                 maxbytes : int = 2**30,
+                 ):
+        self.cachedir = pathlib.Path(cachedir)
+        self.maxbytes = maxbytes
+        self.hits : int = 0
+        self.misses : int = 0
+        self.nevicted : int = 0
+
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}('{self.cachedir}', maxbytes={self.maxbytes}, " +
+                f"hits={self.hits}, misses={self.misses}, nevicted={self.nevicted})")
+
+
+    def entryPath(self, key : str) -> pathlib.Path:
+        """
+        Get the filepath for a cache entry.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+
+        Returns
+        -------
+        filepath : pathlib.Path
+            The filepath for the entry.
+        """
+        return self.cachedir / f'{key}{CACHE_SUFFIX}'
+
+
+    def get(self, key : str) -> Any | None:
+        """
+        Look up an entry, marking it as recently used. Entries which cannot be
+        loaded, for example because they refer to a class which has since been
+        renamed, count as misses and are deleted.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+
+        Returns
+        -------
+        value : Any | None
+            The cached value, or None on a miss.
+        """
+        filepath = self.entryPath(key)
+        try:
+            with open(filepath, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(filepath)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            self.misses += 1
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+            return None
+        self.hits += 1
+        return value
+
+
+    def put(self, key : str, value : Any) -> None:
+        """
+        Add an entry to the cache. The entry is written to a temporary file
+        and then moved into place, so readers never see a partial entry.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+        value : Any
+            The value to cache. Must be picklable with cloudpickle.
+        """
+        self.cachedir.mkdir(parents=True, exist_ok=True)
+        filepath = self.entryPath(key)
+        tmppath = filepath.with_name(f'{filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            with open(tmppath, 'wb') as f:
+                cloudpickle.dump(value, f)
+            os.replace(tmppath, filepath)
+        finally:
+            tmppath.unlink(missing_ok=True)
+
+
+    def entries(self) -> list[os.DirEntry]:
+        """
+        List the cache entries.
+
+        Returns
+        -------
+        entries : list[os.DirEntry]
+            The entries in the cache directory.
+        """
+        if not self.cachedir.exists():
+            return []
+        with os.scandir(self.cachedir) as it:
+            return [entry for entry in it if entry.name.endswith(CACHE_SUFFIX)]
+
+
+    def size(self) -> int:
+        """
+        Get the total size of the cache entries in bytes.
+
+        Returns
+        -------
+        nbytes : int
+            The total size.
+        """
+        return sum(entry.stat().st_size for entry in self.entries())
+
+
+    def evict(self) -> int:
+        """
+        Delete the least recently used entries until the total size is within
+        `maxbytes`.
+
+        Returns
+        -------
+        nevicted : int
+            The number of entries deleted.
+        """
+        entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                   for entry in self.entries()]
+        total = sum(size for _, size, _ in entries)
+        nevicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.maxbytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            nevicted += 1
+        self.nevicted += nevicted
+        return nevicted
+
+
+    def clear(self) -> None:
+        """Delete all the cache entries."""
+        for entry in self.entries():
+            os.remove(entry.path)
+
+
+    def resetStats(self) -> None:
+        """Reset the hit, miss, and eviction counters."""
+        self.hits = 0
+        self.misses = 0
+        self.nevicted = 0
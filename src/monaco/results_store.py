@@ -0,0 +1,1165 @@
+# results_store.py
+from __future__ import annotations
+
+import os
+import bz2
+import csv
+import json
+import lzma
+import zlib
+import copy
+import queue
+import pickle
+import struct
+import threading
+import pathlib
+import cloudpickle
+import numpy as np
+from typing import Any, Callable, Iterable
+from monaco.mc_case import Case
+from monaco.mc_var import InVar, OutVar
+from monaco.mc_enums import Compression
+from monaco.helper_functions import import_optional
+
+# Optional imports, pandas and pyarrow are heavier and imported when needed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame as lz4frame
+except ImportError:
+    lz4frame = None
+
+VARS_MAGIC = b'MCVARS01'
+VARS_ALIGNMENT = 64
+CASE_RECORD = struct.Struct('<4sqQ')  # magic, ncase, payload length
+CASE_MAGIC = b'MCCR'
+DATA_HEADER = struct.Struct('<4sBBI')  # magic, version, codec, number of buffers
+DATA_FRAME = struct.Struct('<Q')  # compressed frame length
+DATA_MAGIC = b'MCPK'
+DATA_VERSION = 1
+# The codec byte written for each codec. These are part of the file format,
+# so existing IDs must never change
+DATA_CODECS = {Compression.NONE: 0, Compression.ZLIB: 1, Compression.LZMA: 2,
+               Compression.BZ2: 3, Compression.ZSTD: 4, Compression.LZ4: 5}
+DECOMPRESS_CHUNK = 2**20  # bytes of output per step when streaming decompression
+
+
+def compress_bytes(data        : bytes | memoryview,
+                   compression : Compression,
+                   level       : int | None = None,
+                   ) -> bytes:
+    """
+    Compress bytes with one of the supported codecs.
+
+    Parameters
+    ----------
+    data : bytes | memoryview
+        The data to compress.
+    compression : monaco.mc_enums.Compression
+        The codec to use.
+    level : int, default: None
+        The compression level. If None, uses the codec's default.
+
+    Returns
+    -------
+    compressed : bytes
+        The compressed data.
+    """
+    if compression == Compression.NONE:
+        return bytes(data)
+    elif compression == Compression.ZLIB:
+        return zlib.compress(data, -1 if level is None else level)
+    elif compression == Compression.LZMA:
+        return lzma.compress(data, preset=level)
+    elif compression == Compression.BZ2:
+        return bz2.compress(data, 9 if level is None else level)
+    elif compression == Compression.ZSTD:
+        if zstandard is None:
+            raise ImportError("zstandard must be installed to use 'zstd' compression.")
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+    elif compression == Compression.LZ4:
+        if lz4frame is None:
+            raise ImportError("lz4 must be installed to use 'lz4' compression.")
+        return lz4frame.compress(data, compression_level=0 if level is None else level)
+    raise ValueError(f'{compression=} must be one of {[c.value for c in Compression]}')
+
+
+def decompress_bytes(data        : bytes | memoryview,
+                     compression : Compression,
+                     ) -> bytes:
+    """
+    Decompress bytes compressed by `compress_bytes`.
+
+    Parameters
+    ----------
+    data : bytes | memoryview
+        The compressed data.
+    compression : monaco.mc_enums.Compression
+        The codec used to compress the data.
+
+    Returns
+    -------
+    decompressed : bytes
+        The decompressed data.
+    """
+    if compression == Compression.NONE:
+        return bytes(data)
+    elif compression == Compression.ZLIB:
+        return zlib.decompress(data)
+    elif compression == Compression.LZMA:
+        return lzma.decompress(data)
+    elif compression == Compression.BZ2:
+        return bz2.decompress(data)
+    elif compression == Compression.ZSTD:
+        if zstandard is None:
+            raise ImportError("zstandard must be installed to read 'zstd' compressed data.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    elif compression == Compression.LZ4:
+        if lz4frame is None:
+            raise ImportError("lz4 must be installed to read 'lz4' compressed data.")
+        return lz4frame.decompress(data)
+    raise ValueError(f'{compression=} must be one of {[c.value for c in Compression]}')
+
+
+def decompress_bytearray(data        : bytes | memoryview,
+                         compression : Compression,
+                         ) -> bytearray:
+    """
+    Decompress bytes compressed by `compress_bytes` into a writeable
+    bytearray. The output is streamed into the bytearray in chunks of
+    `DECOMPRESS_CHUNK` bytes, rather than decompressed in full and then
+    copied.
+
+    Parameters
+    ----------
+    data : bytes | memoryview
+        The compressed data.
+    compression : monaco.mc_enums.Compression
+        The codec used to compress the data.
+
+    Returns
+    -------
+    decompressed : bytearray
+        The decompressed data.
+    """
+    out = bytearray()
+    if compression == Compression.NONE:
+        out += data
+    elif compression == Compression.ZLIB:
+        zdecompressor = zlib.decompressobj()
+        while data:
+            out += zdecompressor.decompress(data, DECOMPRESS_CHUNK)
+            data = zdecompressor.unconsumed_tail
+        out += zdecompressor.flush()
+    elif compression in (Compression.LZMA, Compression.BZ2):
+        decompressor = (lzma.LZMADecompressor() if compression == Compression.LZMA
+                        else bz2.BZ2Decompressor())
+        while not decompressor.eof:
+            if decompressor.needs_input and not data:
+                raise ValueError(f'Truncated {Compression(compression).value} data.')
+            out += decompressor.decompress(data, max_length=DECOMPRESS_CHUNK)
+            data = b''
+    elif compression == Compression.ZSTD:
+        if zstandard is None:
+            raise ImportError("zstandard must be installed to read 'zstd' compressed data.")
+        with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+            while chunk := reader.read(DECOMPRESS_CHUNK):
+                out += chunk
+    elif compression == Compression.LZ4:
+        if lz4frame is None:
+            raise ImportError("lz4 must be installed to read 'lz4' compressed data.")
+        out = lz4frame.decompress(data, return_bytearray=True)
+    else:
+        raise ValueError(f'{compression=} must be one of {[c.value for c in Compression]}')
+    return out
+
+
+def iter_data_frames(obj         : Any,
+                     compression : Compression,
+                     level       : int | None = None,
+                     ) -> Iterable[bytes]:
+    """
+    Serialize an object, yielding the pieces of the compressed data format.
+
+    The object is pickled with protocol 5, so that large contiguous buffers
+    such as numpy array data are passed out-of-band rather than copied into
+    the pickle stream. The header records the format version, codec, and
+    number of buffers, then the pickle stream and each buffer follow as
+    separately compressed frames, each prefixed by its length.
+
+    Parameters
+    ----------
+    obj : Any
+        The object to serialize.
+    compression : monaco.mc_enums.Compression
+        The codec to use. Must not be 'none'.
+    level : int, default: None
+        The compression level. If None, uses the codec's default.
+
+    Yields
+    ------
+    piece : bytes
+        The next piece of the serialized data.
+    """
+    buffers : list[pickle.PickleBuffer] = []
+    stream = cloudpickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    yield DATA_HEADER.pack(DATA_MAGIC, DATA_VERSION, DATA_CODECS[Compression(compression)],
+                           len(buffers))
+    for frame in [stream] + [buffer.raw() for buffer in buffers]:
+        compressed = compress_bytes(frame, compression, level)
+        yield DATA_FRAME.pack(len(compressed))
+        yield compressed
+
+
+def dumps_data(obj         : Any,
+               compression : Compression = Compression.NONE,
+               level       : int | None = None,
+               ) -> bytes:
+    """
+    Serialize an object to bytes, optionally compressed. With 'none'
+    compression this is plain cloudpickle data. See `iter_data_frames` for
+    the compressed format.
+
+    Parameters
+    ----------
+    obj : Any
+        The object to serialize.
+    compression : monaco.mc_enums.Compression, default: 'none'
+        The codec to use.
+    level : int, default: None
+        The compression level. If None, uses the codec's default.
+
+    Returns
+    -------
+    data : bytes
+        The serialized data.
+    """
+    if compression == Compression.NONE:
+        return cloudpickle.dumps(obj)
+    return b''.join(iter_data_frames(obj, compression, level))
+
+
+def dump_data(obj         : Any,
+              file        : Any,
+              compression : Compression = Compression.NONE,
+              level       : int | None = None,
+              ) -> None:
+    """
+    Serialize an object to an open binary file, optionally compressed. See
+    `dumps_data`.
+
+    Parameters
+    ----------
+    obj : Any
+        The object to serialize.
+    file : file object
+        The binary file to write to.
+    compression : monaco.mc_enums.Compression, default: 'none'
+        The codec to use.
+    level : int, default: None
+        The compression level. If None, uses the codec's default.
+    """
+    if compression == Compression.NONE:
+        cloudpickle.dump(obj, file)
+    else:
+        for piece in iter_data_frames(obj, compression, level):
+            file.write(piece)
+
+
+def loads_data(data : bytes) -> Any:
+    """
+    Deserialize an object from bytes written by `dumps_data`, picking the
+    decoder from the header. Data without a header is read as plain
+    cloudpickle data, so files saved by older versions still load.
+
+    Parameters
+    ----------
+    data : bytes
+        The serialized data.
+
+    Returns
+    -------
+    obj : Any
+        The deserialized object.
+    """
+    if data[:len(DATA_MAGIC)] != DATA_MAGIC:
+        return cloudpickle.loads(data)
+
+    view = memoryview(data)
+    _, version, codec, nbuffers = DATA_HEADER.unpack_from(view)
+    if version > DATA_VERSION:
+        raise ValueError(f'Data format version {version} is newer than the ' +
+                         f'supported version {DATA_VERSION}.')
+    compressions = {codec_id: compression for compression, codec_id in DATA_CODECS.items()}
+    if codec not in compressions:
+        raise ValueError(f'Unknown compression codec {codec}.')
+    compression = compressions[codec]
+    frames : list[bytes | bytearray] = []
+    offset = DATA_HEADER.size
+    for i in range(nbuffers + 1):
+        (length, ) = DATA_FRAME.unpack_from(view, offset)
+        offset += DATA_FRAME.size
+        frame = view[offset:offset+length]
+        if i == 0:
+            frames.append(decompress_bytes(frame, compression))
+        else:
+            # Buffers must be writeable for the arrays built on them to be writeable
+            frames.append(decompress_bytearray(frame, compression))
+        offset += length
+    return pickle.loads(frames[0], buffers=frames[1:])
+
+
+def load_data(file : Any) -> Any:
+    """
+    Deserialize an object from an open binary file written by `dump_data`.
+    See `loads_data`.
+
+    Parameters
+    ----------
+    file : file object
+        The binary file to read from.
+
+    Returns
+    -------
+    obj : Any
+        The deserialized object.
+    """
+    return loads_data(file.read())
+
+
+def save_vars_columns(filepath : str | pathlib.Path,
+                      vars     : dict[str, InVar | OutVar],
+                      ) -> None:
+    """
+    Save the nums and pcts of variables to a single columnar binary file.
+
+    The file is a short JSON header describing each column, followed by the
+    raw column arrays aligned so that they can be memory-mapped. Variables
+    whose nums do not all have the same shape, or which have not been drawn,
+    are skipped. The file is written
+    to a temporary path and then renamed, so a partially written file never
+    replaces a good one.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The file to save to, conventionally with a '.mcvars' extension.
+    vars : dict[str, monaco.mc_var.InVar | monaco.mc_var.OutVar]
+        The variables to save.
+    """
+    filepath = pathlib.Path(filepath)
+
+    arrays = []
+    columns = []
+    for var in vars.values():
+        if not hasattr(var, 'nums'):
+            continue  # invars which have not been drawn yet
+        fields = dict(nums=var.nums)
+        if isinstance(var, InVar) and not any(pct is None for pct in var.pcts):
+            fields['pcts'] = var.pcts
+        for field, data in fields.items():
+            try:
+                array = np.asarray(data, dtype=float)
+            except ValueError:
+                continue  # ragged nums can't be stored as a column
+            columns.append(dict(name=var.name, vartype=type(var).__name__, field=field,
+                                dtype=array.dtype.str, shape=list(array.shape)))
+            arrays.append(array)
+
+    # Column offsets are relative to the aligned start of the data section
+    offset = 0
+    for column, array in zip(columns, arrays):
+        column['offset'] = offset
+        offset = aligned(offset + array.nbytes)
+    header = json.dumps(dict(version=1, columns=columns)).encode()
+    datastart = aligned(len(VARS_MAGIC) + 8 + len(header))
+
+    tmppath = filepath.with_name(filepath.name + '.tmp')
+    with open(tmppath, 'wb') as file:
+        file.write(VARS_MAGIC)
+        file.write(struct.pack('<Q', len(header)))
+        file.write(header)
+        for column, array in zip(columns, arrays):
+            file.write(b'\0'*(datastart + column['offset'] - file.tell()))
+            file.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmppath, filepath)
+
+
+def load_vars_columns(filepath : str | pathlib.Path,
+                      mmap     : bool = True,
+                      ) -> dict[str, dict[str, Any]]:
+    """
+    Load the variable columns saved by `save_vars_columns`, without touching
+    any of the case data.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The '.mcvars' file to load.
+    mmap : bool, default: True
+        Whether to memory-map the column arrays rather than reading them into
+        memory.
+
+    Returns
+    -------
+    columns : dict[str, dict[str, Any]]
+        For each variable name, a dict with its 'vartype' and its 'nums' and
+        'pcts' arrays, where they were saved.
+    """
+    filepath = pathlib.Path(filepath)
+    with open(filepath, 'rb') as file:
+        if file.read(len(VARS_MAGIC)) != VARS_MAGIC:
+            raise ValueError(f"'{filepath}' is not a monaco vars file")
+        headerlen = struct.unpack('<Q', file.read(8))[0]
+        header = json.loads(file.read(headerlen))
+    datastart = aligned(len(VARS_MAGIC) + 8 + headerlen)
+
+    columns : dict[str, dict[str, Any]] = dict()
+    for column in header['columns']:
+        shape = tuple(column['shape'])
+        if mmap and np.prod(shape) > 0:
+            array = np.memmap(filepath, dtype=column['dtype'], mode='r',
+                              offset=datastart + column['offset'], shape=shape)
+        else:
+            count = int(np.prod(shape))
+            array = np.fromfile(filepath, dtype=column['dtype'], count=count,
+                                offset=datastart + column['offset']).reshape(shape)
+        var = columns.setdefault(column['name'], dict(vartype=column['vartype']))
+        var[column['field']] = array
+    return columns
+
+
+def cases_to_ranges(cases : Iterable[int]) -> list[list[int]]:
+    """
+    Compress a set of case numbers to a list of contiguous ranges, for
+    compact storage.
+
+    Parameters
+    ----------
+    cases : Iterable[int]
+        The case numbers.
+
+    Returns
+    -------
+    ranges : list[list[int]]
+        The sorted [start, stop) ranges covering the case numbers.
+    """
+    ranges : list[list[int]] = []
+    for ncase in sorted(cases):
+        if ranges and ranges[-1][1] == ncase:
+            ranges[-1][1] = ncase + 1
+        else:
+            ranges.append([ncase, ncase + 1])
+    return ranges
+
+
+def ranges_to_cases(ranges : Iterable[Iterable[int]]) -> set[int]:
+    """
+    Expand the ranges from `cases_to_ranges` back to a set of case numbers.
+
+    Parameters
+    ----------
+    ranges : Iterable[Iterable[int]]
+        The [start, stop) ranges.
+
+    Returns
+    -------
+    cases : set[int]
+        The case numbers.
+    """
+    cases : set[int] = set()
+    for start, stop in ranges:
+        cases.update(range(start, stop))
+    return cases
+
+
+EXPORT_FORMATS = ('.csv', '.json', '.npy', '.npz', '.parquet')
+
+
+def export_var_arrays(filepath  : str | pathlib.Path,
+                      arrays    : dict[str, np.ndarray],
+                      chunksize : int = 10000,
+                      ) -> None:
+    """
+    Export arrays of variable data to a file, with the format set by the
+    file extension.
+
+    - '.csv' files have a header row of quoted names, then one row per case.
+      They are streamed out in chunks of cases, so only a chunk of rows is
+      ever formatted at once. Only scalar variables can be saved to csv.
+    - '.json' files hold a dict from names to lists of values.
+    - '.npy' files hold a structured array with one field per variable,
+      written through a memory map so that the full table is never held in
+      memory. They can be memory-mapped again on import.
+    - '.npz' files hold one array per variable.
+    - '.parquet' files hold one column per variable, and need pyarrow.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The file to save to.
+    arrays : dict[str, numpy.ndarray]
+        The data for each variable, with cases along the first axis.
+    chunksize : int, default: 10000
+        The number of cases to format at once for csv files.
+    """
+    filepath = pathlib.Path(filepath)
+    suffix = filepath.suffix.lower()
+    if suffix not in EXPORT_FORMATS:
+        raise ValueError(f"'{filepath.name}' must be one of {EXPORT_FORMATS} files.")
+    names = list(arrays.keys())
+    ncases = len(arrays[names[0]]) if names else 0
+
+    if suffix == '.csv':
+        for name, array in arrays.items():
+            if array.ndim != 1:
+                raise ValueError(f"'{name}' must be scalar to export to a .csv file.")
+        with open(filepath, 'w', newline='') as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+            writer.writerow(names)
+            for start in range(0, ncases, chunksize):
+                chunk = np.column_stack([arrays[name][start:start+chunksize] for name in names])
+                # repr of python numbers matches what csv.writer writes
+                f.write(''.join(','.join(map(repr, row)) + '\r\n' for row in chunk.tolist()))
+
+    elif suffix == '.json':
+        with open(filepath, 'w', newline='') as f:
+            json.dump({name: array.tolist() for name, array in arrays.items()}, f)
+
+    elif suffix == '.npy':
+        dtype = np.dtype([(name, array.dtype, array.shape[1:])
+                          for name, array in arrays.items()])
+        table = np.lib.format.open_memmap(filepath, mode='w+', dtype=dtype, shape=(ncases,))
+        for name, array in arrays.items():
+            table[name] = array
+        table.flush()
+        del table
+
+    elif suffix == '.npz':
+        with open(filepath, 'wb') as f:
+            np.savez(f, **arrays)
+
+    elif suffix == '.parquet':
+        pa = import_optional('pyarrow')
+        pq = import_optional('pyarrow.parquet')
+        if pa is None:
+            raise ImportError('pyarrow must be installed to export to .parquet files.')
+        table = pa.table({name: list(array) if array.ndim > 1 else array
+                          for name, array in arrays.items()})
+        pq.write_table(table, filepath)
+
+
+def import_var_arrays(filepath : str | pathlib.Path,
+                      mmap     : bool = True,
+                      ) -> dict[str, np.ndarray | list[Any]]:
+    """
+    Import arrays of variable data from a file, in any of the formats written
+    by `export_var_arrays`.
+
+    Numeric csv files are parsed in one pass with pandas if it is installed,
+    and with numpy otherwise. Csv and json files which hold nonnumeric data
+    fall back to returning lists of the values.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The file to load from.
+    mmap : bool, default: True
+        Whether to memory-map '.npy' files rather than reading them into
+        memory.
+
+    Returns
+    -------
+    arrays : dict[str, numpy.ndarray | list[Any]]
+        The data for each variable, with cases along the first axis.
+    """
+    filepath = pathlib.Path(filepath)
+    suffix = filepath.suffix.lower()
+
+    if suffix == '.csv':
+        arrays = import_csv_columns(filepath)
+
+    elif suffix == '.json':
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        arrays = dict()
+        for name, vals in data.items():
+            try:
+                arrays[name] = np.asarray(vals, dtype=float)
+            except (ValueError, TypeError):
+                arrays[name] = vals
+
+    elif suffix == '.npy':
+        table = np.load(filepath, mmap_mode='r' if mmap else None)
+        if table.dtype.names is None:
+            raise ValueError(f"'{filepath.name}' must hold a structured array with " +
+                             "one field per variable.")
+        arrays = {name: table[name] for name in table.dtype.names}
+
+    elif suffix == '.npz':
+        with np.load(filepath) as data:
+            arrays = {name: data[name] for name in data.files}
+
+    elif suffix == '.parquet':
+        pa = import_optional('pyarrow')
+        pq = import_optional('pyarrow.parquet')
+        if pa is None:
+            raise ImportError('pyarrow must be installed to import .parquet files.')
+        table = pq.read_table(filepath)
+        arrays = {name: np.array(table.column(name).to_pylist())
+                  if pa.types.is_list(table.schema.field(name).type)
+                  else table.column(name).to_numpy()
+                  for name in table.column_names}
+
+    else:
+        raise ValueError(f"'{filepath.name}' must be one of {EXPORT_FORMATS} files.")
+
+    return arrays
+
+
+def import_csv_columns(filepath : str | pathlib.Path,
+                       ) -> dict[str, np.ndarray | list[Any]]:
+    """
+    Import the columns of a csv file with a header row of quoted names.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The csv file to load from.
+
+    Returns
+    -------
+    columns : dict[str, numpy.ndarray | list[Any]]
+        The data in each column. These are float arrays if all the data is
+        numeric, and otherwise lists of the values as read by
+        `csv.QUOTE_NONNUMERIC`.
+    """
+    with open(filepath, 'r', newline='') as f:
+        names = next(csv.reader(f))
+
+    pd = import_optional('pandas')
+    try:
+        if pd is not None:
+            table = pd.read_csv(filepath, dtype=float, float_precision='round_trip').to_numpy()
+        else:
+            table = np.loadtxt(filepath, delimiter=',', skiprows=1, ndmin=2)
+        return {name: table[:, i] for i, name in enumerate(names)}
+
+    except ValueError:
+        columns : dict[str, list[Any]] = {name: [] for name in names}
+        with open(filepath, 'r', newline='') as f:
+            reader = csv.reader(f, quoting=csv.QUOTE_NONNUMERIC)
+            next(reader)
+            for row in reader:
+                for name, val in zip(names, row):
+                    columns[name].append(val)
+        return columns
+
+
+def aligned(offset : int) -> int:
+    """
+    Round a byte offset up to the next multiple of the column alignment.
+
+    Parameters
+    ----------
+    offset : int
+        The byte offset.
+
+    Returns
+    -------
+    offset : int
+        The aligned byte offset.
+    """
+    return -(-offset // VARS_ALIGNMENT) * VARS_ALIGNMENT
+
+
+class UnloadedCase():
+    """
+    A placeholder for a case in a `LazyCaseList` which has not been loaded
+    from file yet.
+
+    Parameters
+    ----------
+    ncase : int
+        The number of the case.
+    """
+    def __init__(self,
+                 ncase : int,
+                 ):
+        self.ncase = ncase
+
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(ncase={self.ncase})"
+
+
+class LazyCaseList(list):
+    """
+    A list of cases which loads each case from file the first time it is
+    accessed, and then keeps it in place of its `UnloadedCase` placeholder.
+
+    Parameters
+    ----------
+    iterable : Iterable[Case | UnloadedCase], default: ()
+        The initial cases and placeholders.
+    loader : Callable[[int], Case], default: None
+        The function to load a case by its case number.
+    """
+    def __init__(self,
+                 iterable : Iterable[Case | UnloadedCase] = (),
+                 loader   : Callable[[int], Case] | None = None,
+                 ):
+        super().__init__(iterable)
+        self.loader = loader
+
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.resolve(j) for j in range(*i.indices(len(self)))]
+        return self.resolve(i)
+
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.resolve(i)
+
+
+    def resolve(self,
+                i : int,
+                ) -> Case:
+        """
+        Get the case at an index, loading it if needed.
+
+        Parameters
+        ----------
+        i : int
+            The list index.
+
+        Returns
+        -------
+        case : monaco.mc_case.Case
+            The loaded case.
+        """
+        case = super().__getitem__(i)
+        if isinstance(case, UnloadedCase):
+            case = self.loader(case.ncase)
+            super().__setitem__(i, case)
+        return case
+
+
+    def ncases(self) -> list[int]:
+        """
+        Get the case numbers in the list, without loading any cases.
+
+        Returns
+        -------
+        ncases : list[int]
+            The case numbers.
+        """
+        return [case.ncase for case in super().__iter__() if case is not None]
+
+
+    def drop(self,
+             ncases : Iterable[int],
+             ) -> None:
+        """
+        Remove cases from the list by their case numbers, without loading
+        any of them.
+
+        Parameters
+        ----------
+        ncases : Iterable[int]
+            The case numbers to remove.
+        """
+        ncases = set(ncases)
+        entries = [case for case in super().__iter__()
+                   if case is not None and case.ncase not in ncases]
+        super().__setitem__(slice(None), entries)
+
+
+    def nloaded(self) -> int:
+        """
+        Get the number of cases which have been loaded.
+
+        Returns
+        -------
+        nloaded : int
+            The number of loaded cases.
+        """
+        return sum(not isinstance(case, UnloadedCase) for case in super().__iter__())
+
+
+def strip_case(case : Case) -> Case:
+    """
+    Make a shallow copy of a case without its references to the sim's
+    variables, which would otherwise be pickled in full along with every
+    case.
+
+    Parameters
+    ----------
+    case : monaco.mc_case.Case
+        The case to strip.
+
+    Returns
+    -------
+    case : monaco.mc_case.Case
+        The stripped copy of the case.
+    """
+    stripped = copy.copy(case)
+    stripped.invars = dict()
+    stripped.outvars = dict()
+    return stripped
+
+
+class CaseStore():
+    """
+    An append-only file holding the pickled data for many cases, with an
+    index from case number to the location of its latest record.
+
+    Each record is a small header with the case number and payload length,
+    followed by the payload. The index is saved to a sidecar '.mcindex' file,
+    and if that is missing or out of date the records past its end are
+    scanned to rebuild it. Rewriting a case appends a new record, and the
+    space taken by old records can be reclaimed with `compact`.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The store file, conventionally with a '.mccases' extension.
+    compression : monaco.mc_enums.Compression, default: 'none'
+        The codec to compress appended cases with. Records with any codec can
+        be read back, so this can change between appends.
+
+    Attributes
+    ----------
+    indexpath : pathlib.Path
+        The sidecar index file.
+    index : dict[int, tuple[int, int]]
+        For each case number, the offset and length of its latest payload.
+    end : int
+        The byte offset of the end of the last complete record.
+    """
+    def __init__(self,
+                 filepath    : str | pathlib.Path,
+                 compression : Compression = Compression.NONE,
+                 ):
+        self.filepath = pathlib.Path(filepath)
+        self.compression = compression
+        self.indexpath = self.filepath.with_suffix('.mcindex')
+        self.index : dict[int, tuple[int, int]] = dict()
+        self.end : int = 0
+        self.readIndex()
+
+
+    def __contains__(self, ncase : int) -> bool:
+        return ncase in self.index
+
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+    def readIndex(self) -> None:
+        """Read the sidecar index, and scan any records written after it."""
+        self.index = dict()
+        self.end = 0
+        scanfrom = 0
+        if self.indexpath.exists() and self.filepath.exists():
+            indexdata = np.load(self.indexpath)
+            end = int(indexdata[0, 0])
+            if end <= self.filepath.stat().st_size:
+                for ncase, offset, length in indexdata[1:]:
+                    self.index[int(ncase)] = (int(offset), int(length))
+                scanfrom = end
+        self.scan(start=scanfrom)
+
+
+    def scan(self,
+             start : int = 0,
+             ) -> None:
+        """
+        Scan the records in the store to add them to the index. Scanning stops
+        at the first incomplete record, such as one left by a crash, which is
+        then overwritten by the next append.
+
+        Parameters
+        ----------
+        start : int, default: 0
+            The byte offset to start scanning from.
+        """
+        self.end = start
+        if not self.filepath.exists():
+            return
+        size = self.filepath.stat().st_size
+        with open(self.filepath, 'rb') as file:
+            offset = start
+            while offset + CASE_RECORD.size <= size:
+                file.seek(offset)
+                magic, ncase, length = CASE_RECORD.unpack(file.read(CASE_RECORD.size))
+                payloadoffset = offset + CASE_RECORD.size
+                if magic != CASE_MAGIC or payloadoffset + length > size:
+                    break
+                self.index[ncase] = (payloadoffset, length)
+                offset = payloadoffset + length
+        self.end = offset
+
+
+    def writeIndex(self) -> None:
+        """Save the index to the sidecar file."""
+        indexdata = np.array([(self.end, 0, 0)] +
+                             [(ncase, offset, length)
+                              for ncase, (offset, length) in sorted(self.index.items())],
+                             dtype=np.int64)
+        tmppath = self.indexpath.with_name(self.indexpath.name + '.tmp')
+        with open(tmppath, 'wb') as file:
+            np.save(file, indexdata)
+        os.replace(tmppath, self.indexpath)
+
+
+    def appendBytes(self,
+                    ncase   : int,
+                    payload : bytes,
+                    ) -> None:
+        """
+        Append a record with an already serialized payload for a case.
+
+        Parameters
+        ----------
+        ncase : int
+            The case number.
+        payload : bytes
+            The serialized case data.
+        """
+        mode = 'r+b' if self.filepath.exists() else 'wb'
+        with open(self.filepath, mode) as file:
+            file.seek(self.end)
+            file.truncate()
+            file.write(CASE_RECORD.pack(CASE_MAGIC, ncase, len(payload)))
+            file.write(payload)
+            self.end = file.tell()
+        self.index[ncase] = (self.end - len(payload), len(payload))
+
+
+    def append(self,
+               case : Case,
+               ) -> None:
+        """
+        Append a record for a case. The references to the sim's variables are
+        not saved.
+
+        Parameters
+        ----------
+        case : monaco.mc_case.Case
+            The case to save.
+        """
+        self.appendBytes(case.ncase, dumps_data(strip_case(case), self.compression))
+
+
+    def readBytes(self,
+                  ncase : int,
+                  ) -> bytes:
+        """
+        Read the serialized payload for a case.
+
+        Parameters
+        ----------
+        ncase : int
+            The case number.
+
+        Returns
+        -------
+        payload : bytes
+            The serialized case data.
+        """
+        offset, length = self.index[ncase]
+        with open(self.filepath, 'rb') as file:
+            file.seek(offset)
+            payload = file.read(length)
+        return payload
+
+
+    def load(self,
+             ncase : int,
+             ) -> Case:
+        """
+        Load a case from the store.
+
+        Parameters
+        ----------
+        ncase : int
+            The case number.
+
+        Returns
+        -------
+        case : monaco.mc_case.Case
+            The loaded case, without references to the sim's variables.
+        """
+        return loads_data(self.readBytes(ncase))
+
+
+    def ncases(self) -> list[int]:
+        """
+        Get the case numbers held in the store.
+
+        Returns
+        -------
+        ncases : list[int]
+            The sorted case numbers.
+        """
+        return sorted(self.index.keys())
+
+
+    def compact(self,
+                ncases : Iterable[int] | None = None,
+                ) -> None:
+        """
+        Rewrite the store with only the latest record for each case.
+
+        Parameters
+        ----------
+        ncases : Iterable[int], default: None
+            The case numbers to keep. If None, keeps all cases.
+        """
+        if ncases is None:
+            ncases = self.ncases()
+        ncases = [ncase for ncase in ncases if ncase in self.index]
+        payloads = {ncase: self.readBytes(ncase) for ncase in ncases}
+
+        tmppath = self.filepath.with_name(self.filepath.name + '.tmp')
+        tmppath.unlink(missing_ok=True)
+        tmppath.with_suffix('.mcindex').unlink(missing_ok=True)
+        tmpstore = CaseStore(tmppath)
+        for ncase, payload in payloads.items():
+            tmpstore.appendBytes(ncase, payload)
+        os.replace(tmppath, self.filepath)
+        self.index = tmpstore.index
+        self.end = tmpstore.end
+        self.writeIndex()
+
+
+    def clear(self) -> None:
+        """Delete the store and its index."""
+        self.filepath.unlink(missing_ok=True)
+        self.indexpath.unlink(missing_ok=True)
+        self.index = dict()
+        self.end = 0
+
+
+class CaseWriter():
+    """
+    A background thread which saves cases to disk as they finish, so that a
+    crash partway through a sim does not lose the finished cases and there is
+    no long serial save at the end.
+
+    Cases are handed over through a bounded queue, so a slow disk holds up the
+    sim rather than letting unsaved cases pile up in memory. After each case
+    is saved, a line with its case number, sim run ID, and status is appended
+    to a journal, which can be read back with `read_case_journal` to see
+    which cases finished without loading any of them.
+
+    Parameters
+    ----------
+    save : Callable[[Case], None]
+        The function which saves a case to disk.
+    journalpath : str | pathlib.Path
+        The journal file, conventionally with a '.mcjournal' extension.
+    maxqueue : int, default: 64
+        The maximum number of cases waiting to be saved.
+
+    Attributes
+    ----------
+    nsaved : int
+        The number of cases saved so far.
+    exception : Exception
+        The first error raised while saving a case, if any.
+    """
+    def __init__(self,
+                 save        : Callable[[Case], None],
+                 journalpath : str | pathlib.Path,
+                 maxqueue    : int = 64,
+                 ):
+        self.save = save
+        self.journalpath = pathlib.Path(journalpath)
+        self.queue : queue.Queue = queue.Queue(maxsize=maxqueue)
+        self.nsaved : int = 0
+        self.exception : Exception | None = None
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+
+    def put(self,
+            case : Case,
+            ) -> None:
+        """
+        Queue a case to be saved. The case is copied without its references
+        to the sim's variables, so the sim can keep modifying them.
+
+        Parameters
+        ----------
+        case : monaco.mc_case.Case
+            The case to save.
+        """
+        if self.exception is not None:
+            raise self.exception
+        self.queue.put(strip_case(case))
+
+
+    def work(self) -> None:
+        """Save the queued cases until the writer is closed."""
+        with open(self.journalpath, 'a') as journal:
+            while True:
+                case = self.queue.get()
+                if case is None:
+                    break
+                if self.exception is not None:
+                    continue  # keep draining so that put() never blocks forever
+                try:
+                    self.save(case)
+                    journal.write(f'{case.ncase} {case.runsimid} {int(case.haspreprocessed)} ' +
+                                  f'{int(case.hasrun)} {int(case.haspostprocessed)}\n')
+                    journal.flush()
+                    self.nsaved += 1
+                except Exception as e:
+                    self.exception = e
+
+
+    def close(self) -> None:
+        """Wait for all the queued cases to be saved and stop the thread."""
+        self.queue.put(None)
+        self.thread.join()
+        if self.exception is not None:
+            raise self.exception
+
+
+def read_case_journal(journalpath : str | pathlib.Path,
+                      ) -> dict[int, tuple[int | None, bool, bool, bool]]:
+    """
+    Read the cases saved by a `CaseWriter` from its journal.
+
+    Parameters
+    ----------
+    journalpath : str | pathlib.Path
+        The journal file.
+
+    Returns
+    -------
+    journal : dict[int, tuple[int | None, bool, bool, bool]]
+        For each saved case number, the sim run ID and whether it was
+        preprocessed, run, and postprocessed, from its latest entry. A
+        partially written last line is ignored.
+    """
+    journal : dict[int, tuple[int | None, bool, bool, bool]] = dict()
+    journalpath = pathlib.Path(journalpath)
+    if not journalpath.exists():
+        return journal
+    with open(journalpath, 'r') as file:
+        for line in file:
+            if not line.endswith('\n'):
+                break
+            ncase, runsimid, haspreprocessed, hasrun, haspostprocessed = line.split()
+            journal[int(ncase)] = (None if runsimid == 'None' else int(runsimid),
+                                   bool(int(haspreprocessed)), bool(int(hasrun)),
+                                   bool(int(haspostprocessed)))
+    return journal
@@ -0,0 +1,240 @@
+# screening_sensitivity.py
+from __future__ import annotations
+
+import numpy as np
+from scipy.stats import rankdata
+from monaco.mc_enums import SensitivityMethod
+
+
+def calc_sensitivities_screening(X      : np.ndarray,
+                                 Y      : np.ndarray,
+                                 method : SensitivityMethod,
+                                 ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates cheap global sensitivity measures from a set of given data,
+    without any new model runs. These scale as O(n log n) in the number of
+    cases and linearly in the number of input variables, so they can be used
+    to screen out unimportant input variables before running D-VARS.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    Y : numpy.ndarray
+        The state matrix for the output variables nums.
+    method : monaco.mc_enums.SensitivityMethod
+        The sensitivity method to use. Must not be 'dvars'.
+
+    Returns
+    -------
+    sensitivities : numpy.ndarray
+        The sensitivity measures for each of the input variables. These are
+        signed correlation coefficients for 'spearman' and 'prcc', and
+        first-order sensitivity index estimates for 'easi' and 'binned'.
+    ratios : numpy.ndarray
+        The sensitivity ratios for each of the input variables, normalized to
+        sum to 1. For 'spearman' and 'prcc', these use the squared
+        coefficients.
+    """
+    if method == SensitivityMethod.SPEARMAN:
+        sensitivities = calc_spearman(X, Y)
+        weights = sensitivities**2
+    elif method == SensitivityMethod.PRCC:
+        sensitivities = calc_prcc(X, Y)
+        weights = sensitivities**2
+    elif method == SensitivityMethod.EASI:
+        sensitivities = calc_easi(X, Y)
+        weights = np.maximum(sensitivities, 0)
+    elif method == SensitivityMethod.BINNED:
+        sensitivities = calc_binned_first_order(X, Y)
+        weights = np.maximum(sensitivities, 0)
+    else:
+        raise ValueError(f'{method=} must be one of {SensitivityMethod.SPEARMAN}, ' +
+                         f'{SensitivityMethod.PRCC}, {SensitivityMethod.EASI}, ' +
+                         f'or {SensitivityMethod.BINNED}')
+
+    total = np.sum(weights)
+    if total > 0:
+        ratios = weights/total
+    else:
+        ratios = np.zeros(len(weights))
+
+    return sensitivities, ratios
+
+
+def calc_spearman(X : np.ndarray,
+                  Y : np.ndarray,
+                  ) -> np.ndarray:
+    """
+    Calculates the Spearman rank correlation coefficient between the output
+    and each of the input variables. This measures monotonic dependence.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    Y : numpy.ndarray
+        The state matrix for the output variables nums.
+
+    Returns
+    -------
+    rho : numpy.ndarray
+        The rank correlation coefficients for each of the input variables.
+    """
+    ranks = rank_states(X, Y)
+    corr = np.corrcoef(ranks, rowvar=False)
+    rho = np.nan_to_num(corr[-1, :-1])
+    return rho
+
+
+def calc_prcc(X : np.ndarray,
+              Y : np.ndarray,
+              ) -> np.ndarray:
+    """
+    Calculates the partial rank correlation coefficient (PRCC) between the
+    output and each of the input variables. This is the rank correlation after
+    removing the linear effects of all the other input variables on the ranks,
+    and is read off the inverse of the rank correlation matrix.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    Y : numpy.ndarray
+        The state matrix for the output variables nums.
+
+    Returns
+    -------
+    prcc : numpy.ndarray
+        The partial rank correlation coefficients for each of the input
+        variables.
+    """
+    ranks = rank_states(X, Y)
+    corr = np.corrcoef(ranks, rowvar=False)
+    precision = np.linalg.pinv(np.nan_to_num(corr))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prcc = -precision[-1, :-1] / np.sqrt(precision[-1, -1]*np.diag(precision)[:-1])
+    prcc = np.nan_to_num(prcc)
+    return prcc
+
+
+def calc_easi(X           : np.ndarray,
+              Y           : np.ndarray,
+              nharmonics  : int = 6,
+              ) -> np.ndarray:
+    """
+    Calculates first-order sensitivity indices with the Effective Algorithm
+    for computing global Sensitivity Indices (EASI) as described in Reference
+    [1]_. For each input variable, the output is reordered so that the input
+    runs up and then back down, which makes the reordered output periodic.
+    The fraction of its spectral power in the lowest harmonics estimates the
+    fraction of the output variance explained by that input variable.
+
+    The estimates are biased upwards by roughly 2*nharmonics/ncases for input
+    variables which have no effect.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    Y : numpy.ndarray
+        The state matrix for the output variables nums.
+    nharmonics : int, default: 6
+        The number of harmonics to sum the power over.
+
+    Returns
+    -------
+    S : numpy.ndarray
+        The first-order sensitivity index estimates for each of the input
+        variables.
+
+    References
+    ----------
+    .. [1] Plischke, Elmar. "An effective algorithm for computing global
+           sensitivity indices (EASI)." Reliability Engineering & System
+           Safety 95.4 (2010): 354-360.
+    """
+    m, ninvars = X.shape
+    y = Y[:, 0] - np.mean(Y[:, 0])
+    orders = np.argsort(X, axis=0, kind='stable')
+    # Odd ranks going up, then even ranks coming back down
+    zigzag = np.concatenate((orders[0::2, :], orders[1::2, :][::-1, :]), axis=0)
+
+    spectrum = np.abs(np.fft.rfft(y[zigzag], axis=0))**2
+    # Each harmonic below the Nyquist frequency is mirrored in the full
+    # spectrum, so the total power over all harmonics is m*sum(y**2)
+    total = m*np.sum(y**2)
+    if total == 0:
+        return np.zeros(ninvars)
+    S = 2*np.sum(spectrum[1:nharmonics+1, :], axis=0) / total
+    return S
+
+
+def calc_binned_first_order(X     : np.ndarray,
+                            Y     : np.ndarray,
+                            nbins : int | None = None,
+                            ) -> np.ndarray:
+    """
+    Calculates first-order sensitivity indices by binning each input variable
+    into equal-count bins, and taking the variance of the conditional means of
+    the output over the bins as a fraction of the total output variance. This
+    is also known as the correlation ratio.
+
+    The estimates are biased upwards by roughly (nbins - 1)/ncases for input
+    variables which have no effect.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    Y : numpy.ndarray
+        The state matrix for the output variables nums.
+    nbins : int, default: None
+        The number of bins for each input variable. If None, uses the square
+        root of the number of cases.
+
+    Returns
+    -------
+    S : numpy.ndarray
+        The first-order sensitivity index estimates for each of the input
+        variables.
+    """
+    m, ninvars = X.shape
+    if nbins is None:
+        nbins = max(1, int(np.sqrt(m)))
+    y = Y[:, 0]
+    variance = np.var(y)
+    if variance == 0:
+        return np.zeros(ninvars)
+
+    S = np.zeros(ninvars)
+    for j in range(ninvars):
+        bins = np.zeros(m, dtype=int)
+        bins[np.argsort(X[:, j], kind='stable')] = np.arange(m)*nbins // m
+        counts = np.bincount(bins, minlength=nbins)
+        means = np.bincount(bins, weights=y, minlength=nbins) / np.maximum(counts, 1)
+        S[j] = np.sum(counts*(means - np.mean(y))**2) / m / variance
+    return S
+
+
+def rank_states(X : np.ndarray,
+                Y : np.ndarray,
+                ) -> np.ndarray:
+    """
+    Rank each column of the input and output states, with ties given their
+    average rank.
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        The state matrix for all the input variables percentiles.
+    Y : numpy.ndarray
+        The state matrix for the output variables nums.
+
+    Returns
+    -------
+    ranks : numpy.ndarray
+        The ranks of the states, with the output ranks in the last column.
+    """
+    ranks = rankdata(np.hstack((X, Y)), axis=0)
+    return ranks
@@ -0,0 +1,54 @@
+# test_covariance_statistics.py
+
+import pytest
+import numpy as np
+from scipy.stats import spearmanr, kendalltau
+from monaco.covariance_statistics import (calc_comoments, update_comoments,
+                                          comoments_to_cov_corr, calc_rank_corrcoeffs)
+
+
+@pytest.fixture
+def data():
+    generator = np.random.RandomState(74494861)
+    data = generator.randn(1000, 4)
+    data[:, 1] += 2*data[:, 0] + 100
+    return data
+
+
+@pytest.mark.parametrize("chunksize", [10000, 7])
+def test_calc_comoments(data, chunksize):
+    n, mean, M2 = calc_comoments(data, chunksize=chunksize)
+    covs, corrcoeffs = comoments_to_cov_corr(n, M2)
+    assert n == 1000
+    assert np.allclose(mean, np.mean(data, axis=0))
+    assert np.allclose(covs, np.cov(data.T))
+    assert np.allclose(corrcoeffs, np.corrcoef(data.T))
+
+
+def test_update_comoments(data):
+    n, mean, M2 = calc_comoments(data[:600, :])
+    n, mean, M2 = update_comoments(n, mean, M2, data[600:, :])
+    _, mean_full, M2_full = calc_comoments(data)
+    assert n == 1000
+    assert np.allclose(mean, mean_full)
+    assert np.allclose(M2, M2_full)
+
+
+def test_comoments_to_cov_corr_constant():
+    data = np.array([[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]])
+    n, _, M2 = calc_comoments(data)
+    _, corrcoeffs = comoments_to_cov_corr(n, M2)
+    assert corrcoeffs[0, 0] == pytest.approx(1)
+    assert np.isnan(corrcoeffs[0, 1])
+
+
+def test_calc_rank_corrcoeffs(data):
+    spearman = calc_rank_corrcoeffs(data, 'spearman')
+    assert np.allclose(spearman, spearmanr(data).statistic)
+
+    kendall = calc_rank_corrcoeffs(data, 'kendall')
+    assert kendall[1, 0] == pytest.approx(kendalltau(data[:, 1], data[:, 0]).statistic)
+    assert np.allclose(np.diag(kendall), 1)
+
+    with pytest.raises(ValueError):
+        calc_rank_corrcoeffs(data, 'pearson')
@@ -1,9 +1,12 @@
 # test_dvars_sensitivity.py
 
+import pytest
 import monaco as mc
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.optimize import approx_fprime, check_grad
 from scipy.stats import uniform
+from scipy.sparse import triu
 
 np.set_printoptions(suppress=True, precision=6)
 
@@ -36,6 +39,10 @@ def vars_run(x1, x2, x3, x4, x5, x6):
 def vars_postprocess(case, f):
     case.addOutVal(name='f', val=f)
 
+def vars_postprocess_multi(case, f):
+    case.addOutVal(name='f', val=f)
+    case.addOutVal(name='f_squared', val=f**2)
+
 
 def plot_gs():
     dx = 0.001
@@ -76,9 +83,158 @@ def test_calc_sensitivities(ndraws=32, show=False):
     calculated_ratios = list(sim.outvars['f'].sensitivity_ratios.values())
 
     if ndraws == 32:
-        expected_ratios = [0.448420, 0.474647, 0.038287, 0.038644, 0.0, 0.0]
+        expected_ratios = [0.338861, 0.373321, 0.100031, 0.091466, 0.040273, 0.056048]
         assert np.allclose(calculated_ratios, expected_ratios, atol=1e-5)
 
 
+def test_calc_L_sparse():
+    generator = np.random.RandomState(74494861)
+    X = generator.rand(200, 3)
+    Y = (np.sin(np.pi*X[:, 0]) + X[:, 1]**2).reshape(-1, 1)
+    phi = np.array([8.0, 6.0, 0.0])
+
+    R_dense = mc.calc_R(phi, X)
+    R_sparse = mc.calc_R_sparse(phi, X)
+    assert np.allclose(R_dense, R_sparse.toarray())
+    assert mc.calc_R_density(phi, X) == R_sparse.nnz / 200**2
+
+    L_dense, dL_dense = mc.calc_L(phi, X, Y, sparse=False)
+    L_sparse, dL_sparse = mc.calc_L(phi, X, Y, sparse=True)
+    assert np.isclose(L_dense, L_sparse)
+    assert np.allclose(dL_dense, dL_sparse)
+
+
+def test_calc_L_sparse_tree(monkeypatch):
+    import monaco.dvars_sensitivity
+    generator = np.random.RandomState(74494861)
+    X = generator.rand(200, 3)
+    Y = X[:, [0]]
+    phi = np.array([8.0, 6.0, 4.0])
+
+    trees = []
+    cKDTree = monaco.dvars_sensitivity.cKDTree
+    monkeypatch.setattr(monaco.dvars_sensitivity, 'cKDTree',
+                        lambda data: trees.append(data) or cKDTree(data))
+    mc.calc_L(phi, X, Y)
+    assert len(trees) == 1
+
+
+def test_calc_Rinv_pairs():
+    generator = np.random.RandomState(74494861)
+    X = generator.rand(500, 3)
+    phi = np.array([6.0, 5.0, 4.0])
+
+    R = mc.calc_R_sparse(phi, X)
+    R_upper = triu(R, k=1).tocoo()
+    _, lu = mc.factor_R_sparse(R)
+    Rinv_uw = mc.calc_Rinv_pairs(lu, R_upper.row, R_upper.col)
+    Rinv = np.linalg.inv(R.toarray())
+    assert np.allclose(Rinv_uw, Rinv[R_upper.row, R_upper.col], rtol=1e-8, atol=1e-10)
+
+
+def test_calc_L_sparse_check_grad():
+    generator = np.random.RandomState(74494861)
+    X = generator.rand(400, 3)
+    Y = (np.sin(np.pi*X[:, 0]) + X[:, 1]**2).reshape(-1, 1)
+    phi = np.array([7.0, 5.0, 3.0])
+    assert mc.calc_R_density(phi, X) <= mc.SPARSE_DENSITY_MAX
+
+    def L(p):
+        return mc.calc_L(p, X, Y, sparse=True)[0]
+
+    def dL(p):
+        return mc.calc_L(p, X, Y, sparse=True)[1]
+
+    err = check_grad(L, dL, phi, epsilon=1e-7)
+    assert err < 1e-4*np.linalg.norm(dL(phi))
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("ncases", [8, 100])
+def test_calc_L_gradient(sparse, ncases):
+    generator = np.random.RandomState(74494861)
+    X = generator.rand(ncases, 3)
+    Y = (np.sin(np.pi*X[:, 0]) + X[:, 1]**2).reshape(-1, 1)
+    phi = np.array([4.0, 3.0, 0.5])
+
+    _, dL = mc.calc_L(phi, X, Y, sparse=sparse)
+    dL_numerical = approx_fprime(phi, lambda p: mc.calc_L(p, X, Y, sparse=sparse)[0], 1e-7)
+    assert np.allclose(dL, dL_numerical, rtol=1e-4, atol=1e-4)
+
+
+def test_calc_L_nystrom_gradient():
+    generator = np.random.RandomState(74494861)
+    X = generator.rand(100, 3)
+    Y = (np.sin(np.pi*X[:, 0]) + X[:, 1]**2).reshape(-1, 1)
+    Xi = mc.inducing_points(ninvars=3, ninducing=20, seed=3462356)
+    phi = np.array([4.0, 3.0, 0.5])
+
+    _, dL = mc.calc_L_nystrom(phi, X, Y, Xi)
+    dL_numerical = approx_fprime(phi, lambda p: mc.calc_L_nystrom(p, X, Y, Xi)[0], 1e-7)
+    assert np.allclose(dL, dL_numerical, rtol=1e-4, atol=1e-4)
+
+
+def test_stratified_subsample():
+    Y = np.arange(100, dtype=float)[::-1].reshape(-1, 1)
+    subsample = mc.stratified_subsample(Y, nsamples=10, seed=3462356)
+    assert len(subsample) == 10
+    # One case from each decile of the output
+    assert np.array_equal(np.sort(Y[subsample, 0]) // 10, np.arange(10))
+    assert np.array_equal(mc.stratified_subsample(Y, nsamples=200, seed=0), np.arange(100))
+
+
+@pytest.mark.parametrize("approximation", ['subsample', 'nystrom'])
+def test_calc_sensitivities_approximation(approximation):
+    fcns = {'preprocess' : vars_preprocess,
+            'run'        : vars_run,
+            'postprocess': vars_postprocess}
+
+    sim = mc.Sim(name='dvars', ndraws=64, fcns=fcns, firstcaseismedian=False,
+                 seed=3462356, singlethreaded=True, daskkwargs=dict(), samplemethod='random',
+                 savecasedata=False, savesimdata=False, verbose=False, debug=True)
+    for varname in ['x1', 'x2', 'x3', 'x4', 'x5', 'x6']:
+        sim.addInVar(name=varname, dist=uniform, distkwargs={'loc': 0, 'scale': 1})
+    sim.runSim()
+
+    sim.calcSensitivities('f', approximation=approximation, nsamples=32, nrepeats=2,
+                          ninducing=16)
+    ratios = np.array(list(sim.outvars['f'].sensitivity_ratios.values()))
+    ratios_std = np.array(list(sim.outvars['f'].sensitivity_ratios_std.values()))
+    assert np.isclose(np.sum(ratios), 1)
+    assert all(ratios_std >= 0)
+    sim.outvars['f'].plotSensitivities()
+
+    _, _, sensitivities_std, ratios_std = mc.calc_sensitivities_std(
+        sim, 'f', approximation=approximation, nsamples=32, nrepeats=2, ninducing=16)
+    assert sensitivities_std.shape == ratios_std.shape == (6,)
+
+
+@pytest.mark.parametrize("singlethreaded", [True, False])
+def test_calc_sensitivities_multi(singlethreaded):
+    fcns = {'preprocess' : vars_preprocess,
+            'run'        : vars_run,
+            'postprocess': vars_postprocess_multi}
+
+    sim = mc.Sim(name='dvars', ndraws=32, fcns=fcns, firstcaseismedian=False,
+                 seed=3462356, singlethreaded=singlethreaded, daskkwargs=dict(n_workers=2),
+                 samplemethod='random', savecasedata=False, savesimdata=False,
+                 verbose=False, debug=True)
+    for varname in ['x1', 'x2', 'x3', 'x4', 'x5', 'x6']:
+        sim.addInVar(name=varname, dist=uniform, distkwargs={'loc': 0, 'scale': 1})
+    sim.runSim()
+
+    sim.calcSensitivities()
+    ratios_f = list(sim.outvars['f'].sensitivity_ratios.values())
+    expected_ratios_f = [0.338861, 0.373321, 0.100031, 0.091466, 0.040273, 0.056048]
+    assert np.allclose(ratios_f, expected_ratios_f, atol=1e-5)
+    assert sim.outvars['f_squared'].sensitivity_ratios is not None
+
+    # Warm starting from the converged hyperparameters should stay put
+    phi_f = list(sim.outvars['f'].sensitivity_phi.values())
+    sim.calcSensitivities('f', warmstart=True)
+    assert np.allclose(list(sim.outvars['f'].sensitivity_phi.values()), phi_f, rtol=1e-3)
+    assert np.allclose(list(sim.outvars['f'].sensitivity_ratios.values()), ratios_f, atol=1e-3)
+
+
 if __name__ == '__main__':
     test_calc_sensitivities(ndraws=128, show=True)
@@ -50,6 +50,12 @@ def plot_testing(show=False):
                                     cov_plot=True, cov_p=0.95,
                                     title='test')  # multi_plot_grid_rect
 
+    fig, axs = multi_plot_grid_rect([invars['norm1'], invars['norm2']], invars['norm3'],
+                                    highlight_cases=range(10, 30),
+                                    cov_plot=True, cov_p=0.95,
+                                    scatter_mode='density',
+                                    title='test')  # multi_plot_grid_rect, density
+
     if show:
         plt.show(block=True)
 
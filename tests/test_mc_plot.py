@@ -1,8 +1,13 @@
 # test_mc_plot.py
 
 import pytest
-from monaco.mc_plot import get_cases, manage_invar_space, plot_2d_scatter
-from monaco.mc_enums import InVarSpace
+import numpy as np
+from monaco.mc_plot import (get_cases, manage_invar_space, plot_2d_scatter,
+                            get_line_vertices, decimate_indices, minmax_indices,
+                            plot_rug_marks, use_density, DENSITY_MIN_POINTS, get_quantile_bands,
+                            get_ecdf_points, dkw_epsilon, plot_ecdf, get_histogram,
+                            plot_hist, HIST_CACHE_SIZE)
+from monaco.mc_enums import InVarSpace, PlotOrientation, ScatterMode
 
 @pytest.mark.parametrize("ncases, cases, ans", [
     (3,   None, (0, 1, 2)),
@@ -21,6 +26,177 @@ def test_manage_invar_space():
         manage_invar_space(invar_space=['pcts', 'nums'], nvars=3)
 
 
+def test_get_line_vertices():
+    x = [np.arange(5), np.arange(5), np.arange(5)]
+    y = [np.arange(5)*i for i in range(3)]
+    lines = get_line_vertices((x, y), cases=[2, 0])
+    assert lines.shape == (2, 5, 2)
+    assert np.array_equal(lines[0, :, 1], y[2])
+
+    lines = get_line_vertices((x, y), cases=[1], maxvertices=4)
+    assert np.array_equal(lines[0], [[0, 0], [0, 0], [0, 0], [4, 4], [4, 4], [4, 4]])
+
+    x[1] = np.arange(3)
+    y[1] = np.arange(3)
+    lines = get_line_vertices((x, y), cases=[0, 1])
+    assert [line.shape for line in lines] == [(5, 2), (3, 2)]
+
+    z = [7, 8, 9]
+    lines = get_line_vertices((x, y, z), cases=[0, 2], maxvertices=3)
+    assert lines.shape == (2, 8, 3)
+    assert np.array_equal(lines[1, :, 2], [9]*8)
+    lines = get_line_vertices((x, y, z), cases=[0, 1])
+    assert np.array_equal(lines[1][:, 2], [8, 8, 8])
+    assert z == [7, 8, 9]
+
+
+def test_decimate_indices():
+    assert decimate_indices(10, None) == slice(None)
+    assert decimate_indices(10, 10) == slice(None)
+    inds = decimate_indices(1000, 7)
+    assert len(inds) == 7
+    assert (inds[0], inds[-1]) == (0, 999)
+
+
+def test_minmax_indices():
+    lines = np.zeros((3, 1000, 2))
+    assert minmax_indices(lines[:, :10], None) == slice(None)
+    assert minmax_indices(lines[:, :10], 10) == slice(None)
+    inds = minmax_indices(lines, 60)
+    assert inds.shape == (3, 60)
+    assert (inds[0, 0], inds[0, -1]) == (0, 999)
+    assert np.all(np.diff(inds, axis=-1) >= 0)
+
+
+def test_decimate_spike():
+    import matplotlib.pyplot as plt
+    from monaco.mc_var import OutVar
+    from monaco.mc_plot import plot_2d_line
+    rng = np.random.default_rng(0)
+    vals = [0.01*rng.standard_normal(100000) for _ in range(3)]
+    vals[1][12345] = 100
+    varx = OutVar('x', vals=[np.arange(100000)]*3)
+    vary = OutVar('y', vals=vals)
+    fig, ax = plot_2d_line(varx, vary)
+    assert ax.get_ylim()[1] > 100
+    plt.close(fig)
+
+def test_plot_2d_line_plotkwargs():
+    import matplotlib.pyplot as plt
+    from monaco.mc_var import OutVar
+    from monaco.mc_plot import plot_2d_line
+    varx = OutVar('x', vals=[np.arange(10)]*3)
+    vary = OutVar('y', vals=[np.arange(10)*i for i in range(3)])
+    fig, ax = plot_2d_line(varx, vary, plotkwargs={'lw': 3})
+    assert len(ax.collections) == 1 and not ax.lines
+    assert ax.collections[0].get_linewidth() == [3]
+    plt.close(fig)
+
+    fig, ax = plot_2d_line(varx, vary, plotkwargs={'marker': 'o'})
+    assert len(ax.lines) == 3 and not ax.collections
+    assert ax.lines[0].get_marker() == 'o'
+    plt.close(fig)
+
+
+def test_plot_rug_marks():
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+    ax.set_ylim(5, 10)
+    nums = np.arange(101.0)[::-1]
+    plot_rug_marks(ax, orientation=PlotOrientation.VERTICAL, nums=nums)
+    plot_rug_marks(ax, orientation=PlotOrientation.HORIZONTAL, nums=nums, maxmarks=11)
+    assert len(ax.collections) == 2
+    assert len(ax.collections[0].get_segments()) == 101
+    marks = ax.collections[1].get_segments()
+    assert [mark[0, 1] for mark in marks] == list(np.arange(0, 101, 10))
+    assert ax.get_ylim() == (5, 10)
+    plt.close(fig)
+
+
+def test_use_density():
+    assert not use_density(ScatterMode.AUTO, DENSITY_MIN_POINTS)
+    assert use_density(ScatterMode.AUTO, DENSITY_MIN_POINTS + 1)
+    assert use_density('density', 1)
+    assert not use_density('points', 10**9)
+    with pytest.raises(ValueError):
+        use_density('hexbin', 1)
+
+
+def test_get_quantile_bands():
+    points = [np.arange(4)*i for i in range(5)]
+    bands = get_quantile_bands(points, cases=range(5), quantiles=[1, 0, 0.5])
+    assert np.array_equal(bands, [[0, 0, 0, 0], [0, 2, 4, 6], [0, 4, 8, 12]])
+
+    points[0] = np.arange(2)
+    bands = get_quantile_bands(points, cases=range(5), quantiles=[0, 1])
+    assert np.array_equal(bands, [[0, 1, 2, 3], [0, 4, 8, 12]])
+
+
+def test_get_ecdf_points():
+    x, y = get_ecdf_points(np.array([1., 2, 2, 3]), None)
+    assert np.array_equal(x, [1, 1, 2, 2, 3])
+    assert np.array_equal(y, [0, 0.25, 0.75, 0.75, 1])
+
+    sortednums = np.arange(1001, dtype=float)
+    x, y = get_ecdf_points(sortednums, 11)
+    assert np.array_equal(x, [0] + list(range(0, 1001, 100)))
+    assert np.array_equal(y, (x + 1)/1001*np.array([0] + [1]*11))
+
+
+def test_dkw_epsilon():
+    assert dkw_epsilon(100, 0.95) == pytest.approx(0.1358, abs=1e-4)
+    with pytest.raises(ValueError):
+        dkw_epsilon(100, 1)
+
+
+def test_plot_ecdf():
+    import matplotlib.pyplot as plt
+    from scipy.stats import norm
+    from monaco.mc_var import InVar
+    invar = InVar('norm', ndraws=10000, dist=norm, distkwargs={'loc': 0, 'scale': 1},
+                  seed=0, samplemethod='random', firstcaseismedian=False)
+    fig, ax = plt.subplots(figsize=(4, 3), dpi=100)
+    plot_ecdf(invar, dkw_conf=0.95, ax=ax)
+    ecdf = ax.lines[0]
+    assert len(ecdf.get_xdata()) <= 2*400 + 1
+    assert ecdf.get_ydata()[0] == 0 and ecdf.get_ydata()[-1] == 1
+    assert len(ax.collections) == 2  # dkw band and rug marks
+    plt.close(fig)
+
+
+def test_get_histogram():
+    from monaco.mc_var import OutVar
+    outvar = OutVar('test', [0, 1, 1, 2, 2, 2, 3])
+    counts, bins = get_histogram(outvar, cases=None, bins=3, invar_space='nums')
+    assert np.array_equal(bins, [-0.5, 0.5, 1.5, 2.5, 3.5])
+    assert np.array_equal(counts, [1, 2, 3, 1])
+    assert get_histogram(outvar, cases=None, bins=3, invar_space='nums')[0] is counts
+
+    counts, _ = get_histogram(outvar, cases=[0, 1], bins=3, invar_space='nums')
+    assert counts.sum() == 2
+    assert len(outvar.histcache) == 2
+
+    outvar.nums = [0, 0, 1]
+    counts, _ = get_histogram(outvar, cases=None, bins=3, invar_space='nums')
+    assert counts.sum() == 3
+    assert len(outvar.histcache) == 1
+
+    for nbins in range(2*HIST_CACHE_SIZE):
+        get_histogram(outvar, cases=None, bins=nbins + 1, invar_space='nums')
+    assert len(outvar.histcache) == HIST_CACHE_SIZE
+
+
+def test_plot_hist_plotkwargs():
+    import matplotlib.pyplot as plt
+    from monaco.mc_var import OutVar
+    outvar = OutVar('test', [0, 1, 1, 2, 2, 2, 3])
+    plotkwargs = {'bins': 3}
+    fig, ax = plot_hist(outvar, plotkwargs=plotkwargs)
+    assert plotkwargs == {'bins': 3}
+    assert len(ax.patches) == 4
+    plt.close(fig)
+
+
 # Does not test the plot appearances, but does check that the codepaths can run
 def test_gen_plots():
     plot_testing(show=False)
@@ -68,6 +244,7 @@ def plot_testing(show=False):
     plot_hist(outvars['test'], orientation='horizontal', rug_plot=False)  # plot_hist
     plot_cdf(invars['norm'], orientation='horizontal')                    # plot_cdf
     plot_cdf(outvars['test'])                                             # plot_cdf
+    plot_cdf(outvars['test'], ecdf=True, dkw_conf=0.9, highlight_cases=0)  # plot_ecdf
 
     plot_sensitivities(outvars['test'], sensitivities='ratios', sort=True)  # plot_sensitivities
 
@@ -77,6 +254,10 @@ def plot_testing(show=False):
     plot(invars['randint'], invars['norm'], invars['norm2'],
          cases=[], highlight_cases=range(10, 30))  # plot_3d_scatter
     plot_2d_scatter(invars['randint'], invars['norm'], invars['norm2'])  # plot_2d_scatter
+    plot(invars['randint'], invars['norm'], highlight_cases=range(10, 30),
+         cov_plot=True, scatter_mode='density')  # plot_2d_scatter, density
+    plot(invars['randint'], invars['norm'], invars['norm2'],
+         highlight_cases=range(10, 30), scatter_mode='density')  # plot_3d_scatter, density
 
     v = np.array([-2, -1, 2, 3, 4, 5])
     var0 = OutVar(name='testscalar', vals=[1, 2, 3, 4, 5], firstcaseismedian=True)
@@ -90,9 +271,11 @@ def plot_testing(show=False):
 
     plot(var2, highlight_cases=None)               # plot_2d_line
     plot(var1, var2, highlight_cases=[0, 1])       # plot_2d_line
+    plot(var1, var2, highlight_cases=[0], line_mode='fan')  # plot_2d_line, fan
     plot(var0, var1)                               # plot_2p5d_line
     plot(var1, var2, var3, highlight_cases=[0, ])  # plot_3d_line
     plot(var0, var1, var2)                         # plot_2p5d_line
+    assert var0.nums == [1, 2, 3, 4, 5] and var0.maxdim == 0
 
     m = np.eye(3)
     var4 = OutVar(name='testm', vals=[1*m, 2*m, 0*m, -1*m, -2*m])
@@ -107,6 +107,65 @@ def test_sim_corr_cov(sim_singlethreaded, sim_parallel, sim_parallel_expanded):
                                        [-1.3125   , -0.35929331, 25.5]]))
 
 
+def test_sim_corr_cache(sim_singlethreaded):
+    sim = sim_singlethreaded
+    corrcoeffs, covvarlist = sim.corr()
+    # Cached until the data version changes
+    assert sim.corr()[0] is corrcoeffs
+    assert sim.cov()[0] is sim.covs
+
+    spearman = sim.corr(method='spearman')[0]
+    assert spearman.shape == corrcoeffs.shape
+    assert np.allclose(np.diag(spearman), 1)
+    assert sim.corr(method='spearman')[0] is spearman
+    assert np.allclose(np.diag(sim.corr(method='kendall')[0]), 1)
+
+    # Replacing a var's nums invalidates the cache without a dataversion bump
+    version = sim.dataversion
+    assert 'data' not in sim.covcache
+    outvar = sim.outvars['casenum_out']
+    outvar.nums = [num*2 for num in outvar.nums]
+    _, data = sim.scalarVarData()
+    assert np.allclose(sim.cov()[0], np.cov(data.T))
+    assert sim.dataversion == version
+
+    sim.clearResults()
+    assert sim.dataversion > version
+    assert sim.corrcoeffs is None
+
+
+def test_sim_render_report(sim_singlethreaded, tmp_path):
+    sim = sim_singlethreaded
+    index = sim.renderReport(outdir=tmp_path, plots=['hist', 'grid'])
+    assert [figure['name'] for figure in index['figures']] \
+        == ['hist_Var1', 'hist_Var2', 'hist_casenum_out', 'grid']
+    assert (tmp_path / 'grid.png').exists()
+    assert sim.renderReport(outdir=tmp_path, plots=['hist', 'grid'])['rendered'] == []
+
+
+def sim_testing_preprocess_dedup(case):
+    return ([case.invals['Var1'].val, ])
+
+@pytest.mark.parametrize("singlethreaded", [True, False])
+def test_sim_dedup_cases(singlethreaded):
+    fcns = sim_testing_fcns()
+    fcns[SimFunctions.PREPROCESS] = sim_testing_preprocess_dedup
+    sim = Sim(name='Sim dedup', ndraws=32, fcns=fcns, firstcaseismedian=True,
+              verbose=False, samplemethod=SampleMethod.RANDOM, seed=74494861,
+              debug=True, singlethreaded=singlethreaded, dedupcases=True)
+    sim.addInVar(name='Var1', dist=randint, distkwargs={'low': 1, 'high': 4})
+    sim.runSim()
+
+    assert len(sim.duplicatecases) == sim.ncases - 3
+    assert sim.casespostprocessed == sim.allCases()
+    assert sim.casesrun == sim.allCases()
+    for case in sim.cases:
+        assert case.outvals['casenum_out'].val == case.invals['Var1'].val
+    for ncase, nsourcecase in sim.duplicatecases.items():
+        assert sim.cases[ncase].invals['Var1'].val == sim.cases[nsourcecase].invals['Var1'].val
+        assert nsourcecase < ncase
+
+
 def test_sim_preprocess_failure(sim_singlethreaded, sim_parallel, sim_parallel_expanded):
     for sim in (sim_singlethreaded, sim_parallel, sim_parallel_expanded):
         fcns = {SimFunctions.PREPROCESS : sim_testing_preprocess_failure,
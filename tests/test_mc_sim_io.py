@@ -7,7 +7,7 @@ import warnings
 import csv
 import json
 import numpy as np
-from monaco.mc_sim import Sim
+from monaco.mc_sim import Sim, load_sim
 from monaco.mc_enums import SimFunctions
 from scipy.stats import norm, randint
 
@@ -123,6 +123,115 @@ def test_sim_remove_extra_files(sim_with_extra_files):
             assert not log
 
 
+@pytest.fixture
+def sim_store(tmp_path):
+    def testing_preprocess(case):
+        return ([True, ])
+
+    def testing_run(inputs):
+        return (True)
+
+    def testing_postprocess(case, output):
+        case.addOutVal('casenum', case.ncase)
+
+    fcns = {SimFunctions.PREPROCESS : testing_preprocess,
+            SimFunctions.RUN        : testing_run,
+            SimFunctions.POSTPROCESS: testing_postprocess}
+    sim = Sim(name='sim_io_test', ndraws=ndraws, fcns=fcns,
+              firstcaseismedian=False, seed=seed, singlethreaded=True,
+              savecasedata=True, savesimdata=True, casestorage='store',
+              verbose=False, resultsdir=tmp_path)
+    sim.addInVar(name='Var1', dist=randint, distkwargs={'low': 1, 'high': 6})
+    sim.addInVar(name='Var2', dist=norm, distkwargs={'loc': 10, 'scale': 4})
+    sim.runSim()
+    return sim
+
+
+def test_sim_store(sim_store):
+    sim = sim_store
+    assert not list(sim.resultsdir.glob('*.mccase'))
+    assert sim.casestorepath.exists()
+
+    vararrays = sim.loadVarArrays()
+    assert np.allclose(vararrays['Var2']['nums'], expected_data['Var2'])
+    assert np.array_equal(vararrays['casenum']['nums'], expected_data['casenum'])
+
+    with open(sim.filepath, 'rb') as file:
+        sim_loaded = cloudpickle.load(file)
+    assert sim_loaded.casesrun == set(range(ndraws))
+    assert sim_loaded.cases[3].outvals['casenum'].val == 3
+    assert sim_loaded.cases[3].invars['Var2'] is sim_loaded.invars['Var2']
+
+    sim_loaded.runSim([1, 2])
+    assert len(sim_loaded.caseStore()) == ndraws
+
+
+@pytest.mark.parametrize("simfixture", ['sim', 'sim_store'])
+def test_sim_load_lazy(request, simfixture):
+    sim = request.getfixturevalue(simfixture)
+    sim.lazyloadcases = True
+    sim.saveSimToFile()
+    with open(sim.filepath, 'rb') as file:
+        sim_loaded = cloudpickle.load(file)
+    assert sim_loaded.cases.nloaded() == 0
+    assert sim_loaded.cases[5].outvals['casenum'].val == 5
+    assert sim_loaded.cases.nloaded() == 1
+
+    sim_loaded.runSim([1, 2])
+    assert sim_loaded.casespostprocessed == set(range(ndraws))
+    assert sim_loaded.outvars['casenum'].nums[1] == 1
+
+
+def test_sim_load_exclude_fields(sim):
+    sim.loadCases(nthreads=2, excludefields=['siminput', 'simrawoutput'])
+    assert len(sim.cases) == ndraws
+    assert sim.cases[3].simrawoutput is None
+    assert sim.cases[3].outvals['casenum'].val == 3
+
+
+class SimCrash(BaseException):
+    pass
+
+
+@pytest.mark.parametrize("casestorage", ['files', 'store'])
+def test_sim_resume_after_crash(tmp_path, casestorage):
+    def testing_preprocess(case):
+        return ([True, ])
+
+    def testing_run(inputs):
+        return (True)
+
+    def testing_postprocess(case, output):
+        case.addOutVal('casenum', case.ncase)
+
+    def testing_postprocess_crash(case, output):
+        if case.ncase == 10:
+            raise SimCrash()
+        testing_postprocess(case, output)
+
+    fcns = {SimFunctions.PREPROCESS : testing_preprocess,
+            SimFunctions.RUN        : testing_run,
+            SimFunctions.POSTPROCESS: testing_postprocess_crash}
+    sim = Sim(name='sim_io_test', ndraws=ndraws, fcns=fcns,
+              firstcaseismedian=False, seed=seed, singlethreaded=True,
+              savecasedata=True, savesimdata=True, casestorage=casestorage,
+              verbose=False, resultsdir=tmp_path)
+    sim.addInVar(name='Var1', dist=randint, distkwargs={'low': 1, 'high': 6})
+    with pytest.raises(SimCrash):
+        sim.runSim()
+
+    # The sim file is from the start of the run, so the finished cases are
+    # only known from the journal
+    with open(sim.filepath, 'rb') as file:
+        sim_loaded = cloudpickle.load(file)
+    assert sim_loaded.casespostprocessed == set()
+    sim_loaded.fcns[SimFunctions.POSTPROCESS] = testing_postprocess
+    sim_loaded.runIncompleteSim()
+    assert sim_loaded.casespostprocessed == set(range(ndraws))
+    assert np.array_equal(sim_loaded.outvars['casenum'].nums, range(ndraws))
+    assert all(case.runsimid != sim_loaded.runsimid for case in sim_loaded.cases[:10])
+
+
 def test_sim_export_csv(sim):
     with pytest.raises(ValueError):
         sim.exportInVars('invars')
@@ -176,7 +285,8 @@ def test_sim_export_json(sim):
     np.testing.assert_allclose(outvars['casenum'], expected_data['casenum'])
 
 
-@pytest.mark.parametrize("filename", ['invars.csv', 'invars.json'])
+@pytest.mark.parametrize("filename", ['invars.csv', 'invars.json', 'invars.npy',
+                                      'invars.npz'])
 def test_sim_import_invars(sim, filename):
     filepath = sim.resultsdir / filename
     var1 = sim.invars['Var1']
@@ -202,7 +312,8 @@ def test_sim_import_invars(sim, filename):
     assert sim.outvars['casenum'].vals == list(range(sim.ncases))
 
 
-@pytest.mark.parametrize("filename", ['invars.csv', 'invars.json'])
+@pytest.mark.parametrize("filename", ['invars.csv', 'invars.json', 'invars.npy',
+                                      'invars.npz'])
 def test_sim_import_outvars(sim, filename):
     filepath = sim.resultsdir / filename
     var1 = sim.invars['Var1']
@@ -220,3 +331,107 @@ def test_sim_import_outvars(sim, filename):
     assert sim.outvars['Var1'].vals == var1.vals
     assert sim.outvars['Var2'].vals == var2.vals
     assert sim.outvars['Var1'].datasource == str(filepath.resolve())
+
+    case = sim.cases[1]
+    assert case.outvals['Var1'].val == var1.vals[1]
+    assert case.outvals['Var2'].val == var2.vals[1]
+    assert isinstance(sim.outvars['Var2'].nums[0], np.ndarray)
+
+
+def test_sim_import_outvars_split(sim):
+    filepath = sim.resultsdir / 'outvars.npz'
+    y = np.arange(sim.ncases*6, dtype=float).reshape(sim.ncases, 2, 3)
+    np.savez(filepath, y=y)
+
+    sim.reset()
+    sim.importOutVars(filepath)
+    assert sim.outvars['y [1]'].vals == y[:, 1, :].tolist()
+    case = cloudpickle.loads(cloudpickle.dumps(sim.cases[2]))
+    assert case.pendingoutvals == []
+    assert np.array_equal(case.outvals['y'].val, y[2])
+    assert np.array_equal(case.outvals['y [0]'].val, y[2, 0])
+
+
+def test_sim_export_npy_mmap(sim):
+    sim.exportInVars('invars.npy')
+    table = np.load(sim.resultsdir / 'invars.npy', mmap_mode='r')
+    assert table.dtype.names == ('Var1', 'Var2')
+    assert np.array_equal(table['Var2'], np.array(sim.invars['Var2'].nums))
+
+
+def test_sim_export_csv_chunked(sim):
+    sim.exportVars(sim.invars, 'invars_chunk1.csv', chunksize=1)
+    sim.exportVars(sim.invars, 'invars.csv')
+    with open(sim.resultsdir / 'invars_chunk1.csv') as f1, \
+         open(sim.resultsdir / 'invars.csv') as f2:
+        assert f1.read() == f2.read()
+
+
+def test_sim_export_parquet(sim):
+    pytest.importorskip('pyarrow')
+    filepath = sim.resultsdir / 'invars.parquet'
+    sim.exportInVars(filepath)
+    data, _ = sim.importVars(filepath)
+    assert data['Var2'] == [float(num) for num in sim.invars['Var2'].nums]
+
+
+@pytest.mark.parametrize("casestorage", ['files', 'store'])
+def test_sim_compression(tmp_path, casestorage):
+    def compression_run(inputs):
+        return (np.arange(1000.0)*inputs[0], )
+
+    def compression_postprocess(case, output):
+        case.addOutVal('total', np.sum(output))
+
+    fcns = {SimFunctions.PREPROCESS : lambda case: ([case.ncase], ),
+            SimFunctions.RUN        : compression_run,
+            SimFunctions.POSTPROCESS: compression_postprocess}
+    sim = Sim(name='Sim', ndraws=ndraws, fcns=fcns, firstcaseismedian=False, seed=seed,
+              singlethreaded=True, verbose=False, savesimdata=True, savecasedata=True,
+              resultsdir=tmp_path, casestorage=casestorage, compression='zlib')
+    sim.addInVar(name='Var1', dist=randint, distkwargs={'low': 1, 'high': 6})
+    sim.runSim()
+
+    sim_loaded = load_sim(sim.filepath)
+    assert sim_loaded.compression == 'zlib'
+    assert np.array_equal(sim_loaded.cases[3].simrawoutput[0], np.arange(1000.0)*3)
+    assert sim_loaded.outvars['total'].vals == sim.outvars['total'].vals
+
+
+def test_sim_manifest(tmp_path):
+    def manifest_postprocess(case, output):
+        case.addOutVal('casenum', case.ncase)
+        case.addOutVal('parity', 'even' if case.ncase % 2 == 0 else 'odd')
+
+    fcns = {SimFunctions.PREPROCESS : lambda case: ([case.ncase], ),
+            SimFunctions.RUN        : lambda inputs: (inputs, ),
+            SimFunctions.POSTPROCESS: manifest_postprocess}
+    sim = Sim(name='Sim', ndraws=ndraws, fcns=fcns, firstcaseismedian=False, seed=seed,
+              singlethreaded=True, verbose=False, savesimdata=True, savecasedata=True,
+              resultsdir=tmp_path, simstorage='manifest')
+    sim.addInVar(name='Var1', dist=randint, distkwargs={'low': 1, 'high': 6},
+                 nummap={1: 'a', 2: 'b', 3: 'c', 4: 'd', 5: 'e'})
+    sim.addInVar(name='Var2', dist=norm, distkwargs={'loc': 10, 'scale': 4})
+    sim.addConstVal('const', 3)
+    sim.runSim()
+    assert sim.filepath.suffix == '.mcmanifest'
+    assert not (tmp_path / 'Sim.mcsim').exists()
+
+    # Saving again without changes doesn't rewrite the bulk data
+    mtime = sim.varsfilepath.stat().st_mtime_ns
+    sim.saveSimToFile()
+    assert sim.varsfilepath.stat().st_mtime_ns == mtime
+
+    sim_loaded = load_sim(sim.filepath)
+    assert sim_loaded.casespostprocessed == set(range(ndraws))
+    assert sim_loaded.invars['Var1'].vals == sim.invars['Var1'].vals
+    assert sim_loaded.invars['Var2'].nums == sim.invars['Var2'].nums
+    assert np.allclose(sim_loaded.invars['Var2'].pcts, sim.invars['Var2'].pcts)
+    assert sim_loaded.outvars['casenum'].vals == expected_data['casenum']
+    assert sim_loaded.outvars['parity'].vals == sim.outvars['parity'].vals
+    assert sim_loaded.constvals == {'const': 3}
+    assert sim_loaded.caseseeds == sim.caseseeds
+    assert sim_loaded.cases[3].outvals['casenum'].val == 3
+
+    sim_loaded.runSim([1, 2])
+    assert sim_loaded.outvars['casenum'].vals == expected_data['casenum']
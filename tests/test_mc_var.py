@@ -3,7 +3,8 @@
 import pytest
 import numpy as np
 from scipy.stats import rv_discrete
-from monaco.mc_var import InVar, OutVar
+import pickle
+from monaco.mc_var import ColumnView, InVar, OutVar
 from monaco.mc_enums import SampleMethod
 import matplotlib.pyplot as plt
 
@@ -79,6 +80,19 @@ def test_invar_nummap():
     assert invar.vals == ['f', 'e', 'f', 'f', 'a', 'e', 'e', 'a', 'e', 'e']
 
 
+def test_var_sortednums(invar_norm_random):
+    sortednums = invar_norm_random.sortedNums()
+    assert np.array_equal(sortednums, np.sort(invar_norm_random.nums))
+    assert invar_norm_random.sortedNums() is sortednums
+    assert not sortednums.flags.writeable
+    assert np.array_equal(invar_norm_random.sortedNums('pcts'), np.sort(invar_norm_random.pcts))
+
+    outvar = OutVar('test', [1, 0, 2, 2])
+    assert np.array_equal(outvar.sortedNums(), [0, 1, 2, 2])
+    outvar.nums = [3, 1]
+    assert np.array_equal(outvar.sortedNums(), [1, 3])
+
+
 def test_outvar():
     outvar = OutVar('test', [1, 0, 2, 2], firstcaseismedian=True)
     assert outvar.getVal(1).val == 0
@@ -97,6 +111,48 @@ def test_outvar_genMaxDim(vals, maxdim):
     outvar = OutVar('test', vals)
     assert outvar.maxdim == maxdim
 
+def test_outvar_numeric_array():
+    vals = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+    outvar = OutVar('test', vals)
+    assert outvar.vals == vals.tolist()
+    assert outvar.valmap is None
+    assert outvar.maxdim == 1
+    assert np.array_equal(np.array(outvar.nums), vals)
+    assert outvar.getVal(1).val == [3.0, 4.0]
+    assert isinstance(outvar.nums, ColumnView)
+    assert np.asarray(outvar.nums) is outvar.nums.array
+    assert pickle.loads(pickle.dumps(outvar)).vals == outvar.vals
+
+    outvar = OutVar('test', np.array([True, False]))
+    assert outvar.valmap == {True: 1, False: 0}
+
+def test_column_view():
+    array = np.array([1.0, 2.0, 3.0])
+    nums = ColumnView(array)
+    vals = ColumnView(array, tolist=True)
+    assert len(nums) == 3
+    assert nums[1].shape == () and nums[1] == 2.0
+    assert vals[1] == 2.0 and isinstance(vals[1], float)
+    assert list(vals) == [1.0, 2.0, 3.0]
+    assert nums == [1.0, 2.0, 3.0] and [1.0, 2.0, 3.0] == nums
+    assert nums != [1.0, 2.0]
+    assert isinstance(nums[1:], ColumnView) and nums[1:] == [2.0, 3.0]
+    assert np.array(nums, dtype=int).tolist() == [1, 2, 3]
+
+# Simulates unpickling an outvar saved by an older version
+def test_outvar_setstate_old():
+    state = OutVar('test', [0, 1, 2]).__getstate__()
+    for attr in ('sortedcache', 'histcache', 'sensitivity_method',
+                 'sensitivity_indices_std', 'sensitivity_ratios_std', 'sensitivity_phi'):
+        del state[attr]
+    outvar = OutVar.__new__(OutVar)
+    outvar.__setstate__(state)
+    assert outvar.sensitivity_method is None
+    assert outvar.sensitivity_indices_std is None and outvar.sensitivity_ratios_std is None
+    assert outvar.sensitivity_phi is None
+    assert outvar.sortedcache == dict() and outvar.histcache == dict()
+
+
 def test_outvar_extractValMap():
     outvar = OutVar('test', ['a', 'b', 'c', ['b']], firstcaseismedian=True)
     assert outvar.valmap == {'a': 0, 'b': 1, 'c': 2}
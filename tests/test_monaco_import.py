@@ -0,0 +1,74 @@
+# test_monaco_import.py
+
+import ast
+import sys
+import pathlib
+import subprocess
+import pytest
+import monaco
+
+HEAVY_MODULES = ('matplotlib', 'distributed', 'tornado', 'numba', 'pandas', 'pyarrow')
+
+
+def public_names(module_path):
+    tree = ast.parse(module_path.read_text())
+    names = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            names.append(node.name)
+        elif isinstance(node, ast.Assign):
+            names.extend(target.id for target in node.targets if isinstance(target, ast.Name))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            names.append(node.target.id)
+    return [name for name in names if not name.startswith('_')]
+
+
+def test_exports_match_modules():
+    package_dir = pathlib.Path(monaco.__file__).parent
+    module_paths = {path.stem: path for path in package_dir.glob('*.py')
+                    if path.stem != '__init__'}
+    assert set(monaco._exports) == set(module_paths)
+    for module, names in monaco._exports.items():
+        assert names == public_names(module_paths[module]), module
+
+
+def test_lazy_attributes():
+    assert monaco.InVar is monaco.mc_var.InVar
+    assert 'plot_hist' in dir(monaco)
+    assert 'plot_hist' in monaco.__all__
+    with pytest.raises(AttributeError):
+        monaco.not_a_name
+
+
+# Guards against import time regressions, by checking that the heavy
+# dependencies stay unloaded until they are used
+def test_import_heavy_modules():
+    code = f"""
+import sys
+import monaco
+from scipy.stats import norm
+heavy = {HEAVY_MODULES!r}
+assert not [m for m in heavy if m in sys.modules], 'import monaco'
+
+def preprocess(case):
+    return (case.invals['x'].val, )
+
+def run(x):
+    return x
+
+def postprocess(case, x):
+    case.addOutVal('y', x)
+
+fcns = {{monaco.SimFunctions.PREPROCESS: preprocess,
+        monaco.SimFunctions.RUN: run,
+        monaco.SimFunctions.POSTPROCESS: postprocess}}
+sim = monaco.Sim(name='lazy', ndraws=8, fcns=fcns, singlethreaded=True, verbose=False)
+sim.addInVar(name='x', dist=norm, distkwargs={{'loc': 0, 'scale': 1}})
+sim.runSim()
+assert not [m for m in heavy if m in sys.modules], 'runSim'
+
+sim.outvars['y'].plot()
+assert 'matplotlib' in sys.modules
+"""
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,103 @@
+# test_plot_report.py
+
+import sys
+import json
+import pytest
+import subprocess
+import numpy as np
+from scipy.stats import norm
+from monaco.mc_var import InVar, OutVar
+from monaco.mc_enums import ReportPlot
+from monaco.plot_report import render_report, report_figure_specs, strip_var
+
+
+@pytest.fixture
+def vars():
+    invar = InVar('Var 1', ndraws=50, dist=norm, distkwargs={'loc': 10, 'scale': 4},
+                  seed=74494861, samplemethod='random')
+    outvar = OutVar('Var2', vals=[2*num for num in invar.nums])
+    outvar.sensitivity_ratios = {'Var 1': 1.0}
+    outvar.sensitivity_indices = {'Var 1': 1.0}
+    linevar = OutVar('Var3', vals=[np.arange(5)*num for num in invar.nums])
+    return {'Var 1': invar}, {'Var2': outvar, 'Var3': linevar}
+
+
+def test_report_figure_specs(vars):
+    invars, outvars = vars
+    specs = report_figure_specs(invars, outvars, plots=list(ReportPlot))
+    assert [spec['name'] for spec in specs] == ['hist_Var_1', 'hist_Var2', 'cdf_Var_1',
+                                                'cdf_Var2', 'grid', 'line_Var3',
+                                                'sensitivities_Var2']
+    specs = report_figure_specs(invars, outvars, plots=['grid'])
+    assert specs == [dict(kind=ReportPlot.GRID, vars=['Var 1', 'Var2'], name='grid')]
+
+    # Var names which slug to the same filename get unique names
+    invars = {name: InVar(name, ndraws=5, dist=norm, distkwargs={'loc': 0, 'scale': 1},
+                                 seed=74494861, samplemethod='random')
+              for name in ('a b', 'a_b', 'a/b', 'A_B')}
+    specs = report_figure_specs(invars, dict(), plots=['hist'])
+    names = [spec['name'] for spec in specs]
+    assert names[0] == 'hist_a_b'
+    assert len({name.lower() for name in names}) == 4
+    assert names == [spec['name'] for spec in report_figure_specs(invars, dict(), plots=['hist'])]
+
+
+def test_strip_var(vars):
+    invars, _ = vars
+    stub = strip_var(invars['Var 1'], columnar=True)
+    assert stub.nums is None and stub.pcts is None
+    assert invars['Var 1'].nums is not None
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_render_report(tmp_path, vars, workers):
+    invars, outvars = vars
+    index = render_report(invars, outvars, tmp_path, plots=['hist', 'grid', 'line'],
+                          formats=['png', 'svg'], workers=workers, verbose=False)
+    assert index['rendered'] == ['hist_Var_1', 'hist_Var2', 'grid', 'line_Var3']
+    for figure in index['figures']:
+        for filename in figure['files']:
+            assert (tmp_path / filename).stat().st_size > 0
+    assert (tmp_path / 'index.json').exists()
+    assert 'grid.png' in (tmp_path / 'index.html').read_text()
+
+    # Only figures whose data changed are rerendered
+    outvars['Var2'] = OutVar('Var2', vals=[3*num for num in invars['Var 1'].nums])
+    index = render_report(invars, outvars, tmp_path, plots=['hist', 'grid', 'line'],
+                          formats=['png', 'svg'], workers=workers, verbose=False)
+    assert index['rendered'] == ['hist_Var2', 'grid']
+
+    (tmp_path / 'line_Var3.svg').unlink()
+    index = render_report(invars, outvars, tmp_path, plots=['hist', 'grid', 'line'],
+                          formats=['png', 'svg'], workers=workers, verbose=False)
+    assert index['rendered'] == ['line_Var3']
+
+
+# Figures are only rerendered if their data changed, even across processes
+def test_render_report_subprocess(tmp_path):
+    code = f"""
+import json
+from scipy.stats import norm
+from monaco.mc_var import InVar, OutVar
+from monaco.plot_report import render_report
+invar = InVar('Var1', ndraws=50, dist=norm, distkwargs={{'loc': 10, 'scale': 4}},
+              seed=74494861, samplemethod='random')
+invar.addVarStat('mean')
+outvar = OutVar('Var2', vals=[2*num for num in invar.nums])
+outvar.sensitivity_ratios = {{'Var1': 1.0}}
+index = render_report({{'Var1': invar}}, {{'Var2': outvar}}, {str(tmp_path)!r},
+                      plots=['hist', 'sensitivities'], formats=['svg'], workers=0,
+                      verbose=False)
+print(json.dumps(index['rendered']))
+"""
+    rendered = []
+    for _ in range(2):
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        rendered.append(json.loads(result.stdout.splitlines()[-1]))
+    assert rendered == [['hist_Var1', 'hist_Var2', 'sensitivities_Var2'], []]
+
+
+def test_render_report_bad_format(tmp_path, vars):
+    with pytest.raises(ValueError):
+        render_report(*vars, tmp_path, formats=['bmp'], workers=0)
@@ -0,0 +1,166 @@
+# test_result_cache.py
+
+import os
+import sys
+import time
+import pickle
+import subprocess
+import pytest
+from scipy.stats import randint
+from monaco.mc_sim import Sim
+from monaco.mc_enums import SimFunctions
+from monaco.result_cache import ResultCache, hash_callable, canonical_form
+
+
+def test_hash_callable():
+    def fcn_a(x):
+        return x + 1
+
+    def fcn_b(x):
+        return x + 2
+
+    def make_fcn(n):
+        def fcn(x):
+            return x + n
+        return fcn
+
+    assert hash_callable(fcn_a) == hash_callable(fcn_a)
+    assert hash_callable(fcn_a) != hash_callable(fcn_b)
+    assert hash_callable(make_fcn(1)) == hash_callable(make_fcn(1))
+    assert hash_callable(make_fcn(1)) != hash_callable(make_fcn(2))
+
+
+def test_hash_callable_recursive():
+    def make_fcn():
+        def fcn(x):
+            return fcn(x - 1) if x > 0 else x
+        return fcn
+
+    assert hash_callable(make_fcn()) == hash_callable(make_fcn())
+
+
+def test_canonical_form():
+    assert canonical_form({'b', 'a'}) == ('set', ('a', 'b'))
+    assert canonical_form(({'b', 'a'}, [frozenset({2, 1})])) \
+        == (('set', ('a', 'b')), [('frozenset', (1, 2))])
+
+
+def test_cache_key_hash_seed():
+    code = """
+from scipy.stats import randint
+from monaco.mc_sim import Sim
+from monaco.mc_enums import SimFunctions
+from monaco.result_cache import hash_fcns, case_cache_key
+
+LABELS = {'alpha', 'beta', 'gamma', 'delta'}
+
+def make_fcn(names):
+    def fcn(x, extra=frozenset({'eps', 'zeta', 'eta'})):
+        return x in {'one', 'two', 'three'} or x in names or x in extra or x in LABELS
+    return fcn
+
+fcn = make_fcn({'theta', 'iota', 'kappa'})
+fcns = {SimFunctions.PREPROCESS: fcn, SimFunctions.RUN: fcn, SimFunctions.POSTPROCESS: fcn}
+sim = Sim(name='seed', ndraws=1, fcns=fcns, seed=5, singlethreaded=True, verbose=False)
+sim.addInVar(name='Var1', dist=randint, distkwargs={'low': 1, 'high': 6})
+sim.addConstVal('names', {'lambda', 'mu', 'nu', 'xi'})
+sim.drawVars()
+sim.genCases()
+print(case_cache_key(sim.cases[0], hash_fcns([fcn])))
+"""
+    keys = []
+    for seed in ('1', '2', '3'):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                                text=True, env=env)
+        assert result.returncode == 0, result.stderr
+        keys.append(result.stdout.strip())
+    assert keys[0] == keys[1] == keys[2]
+
+
+class Unpicklable():
+    def __reduce__(self):
+        raise pickle.PicklingError('unpicklable')
+
+
+def test_result_cache_bad_entries(tmp_path):
+    cache = ResultCache(tmp_path / 'cache')
+    cache.put('a', 1)
+    with open(cache.entryPath('a'), 'wb') as f:
+        f.write(b'cno_such_module\nThing\n.')
+    assert cache.get('a') is None
+    assert cache.misses == 1
+    assert not cache.entryPath('a').exists()
+
+    with pytest.raises(pickle.PicklingError):
+        cache.put('b', Unpicklable())
+    assert list((tmp_path / 'cache').iterdir()) == []
+
+
+def test_result_cache(tmp_path):
+    cache = ResultCache(tmp_path / 'cache', maxbytes=1000)
+    assert cache.get('a') is None
+    cache.put('a', [1, 2, 3])
+    assert cache.get('a') == [1, 2, 3]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.put('b', b'x'*600)
+    cache.put('c', b'x'*600)
+    past = time.time() - 100
+    os.utime(cache.entryPath('b'), (past, past))
+    assert cache.evict() == 1
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
+    assert cache.nevicted == 1
+
+    cache.clear()
+    assert cache.size() == 0
+
+
+nruns = 0
+
+
+def cache_preprocess(case):
+    return (case.invals['Var1'].val, )
+
+
+def cache_run(x):
+    global nruns
+    nruns += 1
+    return x*2
+
+
+def cache_postprocess(case, y):
+    case.addOutVal('y', y)
+
+
+def test_sim_result_cache(tmp_path):
+    global nruns
+    fcns = {SimFunctions.PREPROCESS: cache_preprocess,
+            SimFunctions.RUN: cache_run,
+            SimFunctions.POSTPROCESS: cache_postprocess}
+
+    def make_sim():
+        sim = Sim(name='cache', ndraws=8, fcns=fcns, seed=5, singlethreaded=True,
+                  verbose=False, resultsdir=tmp_path, cacheresults=True)
+        sim.addInVar(name='Var1', dist=randint, distkwargs={'low': 1, 'high': 6})
+        return sim
+
+    nruns = 0
+    sim = make_sim()
+    sim.runSim()
+    assert nruns == 8
+    assert (sim.resultcache.hits, sim.resultcache.misses) == (0, 8)
+    ys = sim.outvars['y'].nums
+
+    sim = make_sim()
+    sim.runSim()
+    assert nruns == 8
+    assert sim.resultcache.hits == 8
+    assert sim.outvars['y'].nums == ys
+    assert sim.casesrun == set(range(8))
+
+    sim = make_sim()
+    sim.addConstVal('offset', 1)
+    sim.runSim()
+    assert nruns == 16
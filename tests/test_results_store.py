@@ -0,0 +1,197 @@
+# test_results_store.py
+
+import pytest
+import numpy as np
+from scipy.stats import norm
+from monaco.mc_var import InVar, OutVar
+from monaco.mc_case import Case
+from monaco.mc_enums import Compression
+from monaco.results_store import (CaseStore, LazyCaseList, UnloadedCase, CaseWriter,
+                                  read_case_journal,
+                                  save_vars_columns, load_vars_columns,
+                                  export_var_arrays, import_var_arrays,
+                                  dumps_data, loads_data, DATA_MAGIC, DATA_HEADER,
+                                  CASE_RECORD, compress_bytes, decompress_bytearray)
+
+
+@pytest.fixture
+def vars():
+    invar = InVar('Var1', ndraws=15, dist=norm, distkwargs={'loc': 10, 'scale': 4},
+                  seed=74494861, firstcaseismedian=True, samplemethod='random')
+    outvar = OutVar('Var2', vals=[[i, 2*i] for i in range(16)])
+    return {'Var1': invar, 'Var2': outvar}
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_vars_columns(tmp_path, vars, mmap):
+    filepath = tmp_path / 'test.mcvars'
+    save_vars_columns(filepath, vars)
+    columns = load_vars_columns(filepath, mmap=mmap)
+
+    assert columns['Var1']['vartype'] == 'InVar'
+    assert np.array_equal(columns['Var1']['nums'], np.array(vars['Var1'].nums))
+    assert np.array_equal(columns['Var1']['pcts'], vars['Var1'].pcts)
+    assert columns['Var2']['nums'].shape == (16, 2)
+    assert 'pcts' not in columns['Var2']
+    if mmap:
+        assert isinstance(columns['Var1']['nums'], np.memmap)
+
+
+def test_vars_columns_bad_file(tmp_path):
+    filepath = tmp_path / 'test.mcvars'
+    filepath.write_bytes(b'not a vars file')
+    with pytest.raises(ValueError):
+        load_vars_columns(filepath)
+
+
+def make_case(ncase):
+    case = Case(ncase=ncase, ismedian=False, invars=dict(), seed=ncase)
+    case.simrawoutput = (np.arange(ncase),)
+    return case
+
+
+def test_case_store(tmp_path):
+    filepath = tmp_path / 'test.mccases'
+    store = CaseStore(filepath)
+    for ncase in range(4):
+        store.append(make_case(ncase))
+    store.writeIndex()
+    store.append(make_case(5))  # not in the saved index
+
+    store = CaseStore(filepath)
+    assert store.ncases() == [0, 1, 2, 3, 5]
+    assert np.array_equal(store.load(3).simrawoutput[0], np.arange(3))
+
+    # Rewriting a case appends a new record, which compacting removes
+    case = make_case(1)
+    case.seed = 100
+    store.append(case)
+    assert store.load(1).seed == 100
+    size = filepath.stat().st_size
+    store.compact()
+    assert filepath.stat().st_size < size
+    assert CaseStore(filepath).load(1).seed == 100
+
+    store.clear()
+    assert len(CaseStore(filepath)) == 0
+
+
+def test_case_store_torn_record(tmp_path):
+    filepath = tmp_path / 'test.mccases'
+    store = CaseStore(filepath)
+    store.append(make_case(0))
+    store.append(make_case(1))
+    end = store.end
+    with open(filepath, 'ab') as file:
+        file.write(CASE_RECORD.pack(b'MCCR', 2, 1000) + b'partial')
+
+    store = CaseStore(filepath)
+    assert store.ncases() == [0, 1]
+    assert store.end == end
+    store.append(make_case(3))
+    assert CaseStore(filepath).ncases() == [0, 1, 3]
+
+
+def test_lazy_case_list():
+    loaded = []
+
+    def loader(ncase):
+        loaded.append(ncase)
+        return make_case(ncase)
+
+    cases = LazyCaseList([UnloadedCase(2), UnloadedCase(0), UnloadedCase(1)], loader=loader)
+    cases.sort(key=lambda case: case.ncase)
+    assert loaded == []
+    assert cases[1].ncase == 1
+    assert cases[1] is cases[1]
+    assert loaded == [1]
+    assert cases.nloaded() == 1
+
+    cases.drop([0])
+    assert [case.ncase for case in cases] == [1, 2]
+    assert loaded == [1, 2]
+
+
+def test_case_writer(tmp_path):
+    journalpath = tmp_path / 'test.mcjournal'
+    store = CaseStore(tmp_path / 'test.mccases')
+    writer = CaseWriter(save=store.append, journalpath=journalpath, maxqueue=2)
+    for ncase in range(5):
+        case = make_case(ncase)
+        case.haspreprocessed = case.hasrun = True
+        case.haspostprocessed = ncase != 3
+        writer.put(case)
+    writer.close()
+    assert writer.nsaved == 5
+    assert store.ncases() == list(range(5))
+
+    with open(journalpath, 'a') as file:
+        file.write('5 None 1 1')  # partially written line
+    journal = read_case_journal(journalpath)
+    assert sorted(journal.keys()) == list(range(5))
+    assert journal[3] == (None, True, True, False)
+    assert journal[4] == (None, True, True, True)
+
+
+def test_case_writer_error(tmp_path):
+    def save(case):
+        raise OSError('disk full')
+    writer = CaseWriter(save=save, journalpath=tmp_path / 'test.mcjournal')
+    writer.put(make_case(0))
+    with pytest.raises(OSError, match='disk full'):
+        writer.close()
+    assert read_case_journal(tmp_path / 'test.mcjournal') == dict()
+
+
+@pytest.mark.parametrize("filename", ['vars.csv', 'vars.json', 'vars.npy', 'vars.npz'])
+def test_export_import_var_arrays(tmp_path, filename):
+    arrays = {'a': np.array([0.1, 1/3, 2.0]), 'b b': np.array([1e-300, -4.5, 7.0])}
+    export_var_arrays(tmp_path / filename, arrays)
+    loaded = import_var_arrays(tmp_path / filename)
+    assert list(loaded.keys()) == ['a', 'b b']
+    for name, array in arrays.items():
+        assert np.array_equal(loaded[name], array)
+
+
+def test_import_var_arrays_nonnumeric(tmp_path):
+    filepath = tmp_path / 'vars.csv'
+    filepath.write_text('"a","b"\n1,"x"\n2,"y"\n')
+    loaded = import_var_arrays(filepath)
+    assert loaded == {'a': [1.0, 2.0], 'b': ['x', 'y']}
+
+
+@pytest.mark.parametrize("compression", list(Compression))
+def test_dumps_loads_data(compression):
+    if compression == Compression.ZSTD:
+        pytest.importorskip('zstandard')
+    elif compression == Compression.LZ4:
+        pytest.importorskip('lz4')
+    obj = {'array': np.zeros((100, 100)), 'list': [1, 'a', None]}
+    data = dumps_data(obj, compression=compression)
+    assert data.startswith(DATA_MAGIC) == (compression != Compression.NONE)
+    if compression != Compression.NONE:
+        assert len(data) < obj['array'].nbytes / 10
+    loaded = loads_data(data)
+    assert np.array_equal(loaded['array'], obj['array'])
+    assert loaded['array'].flags.writeable
+    assert loaded['list'] == obj['list']
+
+
+@pytest.mark.parametrize("compression", ['none', 'zlib', 'lzma', 'bz2'])
+def test_decompress_bytearray(monkeypatch, compression):
+    import monaco.results_store
+    monkeypatch.setattr(monaco.results_store, 'DECOMPRESS_CHUNK', 1000)
+    data = np.arange(10000).tobytes()
+    decompressed = decompress_bytearray(compress_bytes(data, compression), compression)
+    assert isinstance(decompressed, bytearray)
+    assert decompressed == data
+
+
+def test_data_codec_ids():
+    # The codec byte is part of the file format, and must not change
+    _, _, codec, _ = DATA_HEADER.unpack_from(dumps_data([1], compression='lzma'))
+    assert codec == 2
+    data = bytearray(dumps_data([1], compression='zlib'))
+    data[5] = 99
+    with pytest.raises(ValueError):
+        loads_data(bytes(data))
@@ -0,0 +1,81 @@
+# test_screening_sensitivity.py
+
+import pytest
+import monaco as mc
+import numpy as np
+from scipy.stats import uniform
+from monaco.screening_sensitivity import (calc_spearman, calc_prcc, calc_easi,
+                                          calc_binned_first_order)
+
+
+@pytest.fixture
+def linear_states():
+    generator = np.random.RandomState(74494861)
+    X = generator.rand(2000, 3)
+    # Analytic first-order indices for uniform inputs are [0.8, 0.2, 0]
+    Y = (2*X[:, 0] - X[:, 1]).reshape(-1, 1)
+    return X, Y
+
+
+def test_calc_spearman(linear_states):
+    X, Y = linear_states
+    rho = calc_spearman(X, Y)
+    assert rho[0] > 0.8
+    assert rho[1] < -0.3
+    assert abs(rho[2]) < 0.05
+
+
+def test_calc_prcc(linear_states):
+    X, Y = linear_states
+    prcc = calc_prcc(X, Y)
+    assert abs(prcc[0]) > abs(prcc[1]) > abs(prcc[2])
+    assert np.sign(prcc[1]) == -1
+    assert abs(prcc[2]) < 0.1
+
+
+@pytest.mark.parametrize("calc_S", [calc_easi, calc_binned_first_order])
+def test_calc_first_order(linear_states, calc_S):
+    X, Y = linear_states
+    S = calc_S(X, Y)
+    assert np.allclose(S, [0.8, 0.2, 0.0], atol=0.05)
+
+
+def test_calc_first_order_nonmonotonic():
+    # A symmetric effect has no rank correlation but a large first-order index
+    generator = np.random.RandomState(74494861)
+    X = generator.rand(2000, 2)
+    Y = ((X[:, 0] - 0.5)**2).reshape(-1, 1)
+    assert abs(calc_spearman(X, Y)[0]) < 0.1
+    assert calc_easi(X, Y)[0] > 0.9
+    assert calc_binned_first_order(X, Y)[0] > 0.9
+
+
+def vars_preprocess(case):
+    return (case.invals['x1'].val, case.invals['x2'].val, case.invals['x3'].val)
+
+def vars_run(x1, x2, x3):
+    return (2*x1 - x2,)
+
+def vars_postprocess(case, f):
+    case.addOutVal(name='f', val=f)
+
+
+@pytest.mark.parametrize("method", ['spearman', 'prcc', 'easi', 'binned'])
+def test_calc_sensitivities_method(method):
+    fcns = {'preprocess' : vars_preprocess,
+            'run'        : vars_run,
+            'postprocess': vars_postprocess}
+    sim = mc.Sim(name='screening', ndraws=256, fcns=fcns, firstcaseismedian=False,
+                 seed=3462356, singlethreaded=True, samplemethod='random',
+                 savecasedata=False, savesimdata=False, verbose=False, debug=True)
+    for varname in ['x1', 'x2', 'x3']:
+        sim.addInVar(name=varname, dist=uniform, distkwargs={'loc': 0, 'scale': 1})
+    sim.runSim()
+
+    sim.calcSensitivities('f', method=method)
+    outvar = sim.outvars['f']
+    ratios = outvar.sensitivity_ratios
+    assert outvar.sensitivity_method == mc.SensitivityMethod(method)
+    assert np.isclose(sum(ratios.values()), 1)
+    assert ratios['x1'] > ratios['x2'] > ratios['x3']
+    outvar.plotSensitivities()